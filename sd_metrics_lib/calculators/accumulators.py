@@ -0,0 +1,276 @@
+import math
+import struct
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Type, TypeVar
+
+A = TypeVar('A', bound='MergeableAccumulator')
+
+
+class ExactSum:
+    __slots__ = ('_partials',)
+
+    def __init__(self, values: Iterable[float] = ()) -> None:
+        self._partials: List[float] = []
+        for value in values:
+            self.add(value)
+
+    def add(self, value: float) -> 'ExactSum':
+        # Shewchuk's algorithm: partials hold the exact sum as non-overlapping floats, so the total
+        # does not depend on the order values were added or merged in
+        x = float(value)
+        partials = self._partials
+        i = 0
+        for y in partials:
+            if abs(x) < abs(y):
+                x, y = y, x
+            hi = x + y
+            lo = y - (hi - x)
+            if lo:
+                partials[i] = lo
+                i += 1
+            x = hi
+        partials[i:] = [x]
+        return self
+
+    def merge(self, other: 'ExactSum') -> 'ExactSum':
+        for partial in other._partials:
+            self.add(partial)
+        return self
+
+    @property
+    def value(self) -> float:
+        return math.fsum(self._partials)
+
+    @property
+    def partials(self) -> List[float]:
+        return list(self._partials)
+
+    def copy(self) -> 'ExactSum':
+        result = ExactSum()
+        result._partials = list(self._partials)
+        return result
+
+    def __float__(self) -> float:
+        return self.value
+
+    def __repr__(self) -> str:
+        return f"ExactSum({self.value!r})"
+
+
+class MergeableAccumulator(ABC):
+    MAGIC = b'SDMA'
+    FORMAT_VERSION = 1
+    TYPE_CODE = b'?'
+
+    @abstractmethod
+    def merge(self: A, other: A) -> A:
+        pass
+
+    @abstractmethod
+    def _write_payload(self, writer: 'BinaryWriter'):
+        pass
+
+    @classmethod
+    @abstractmethod
+    def _read_payload(cls: Type[A], reader: 'BinaryReader') -> A:
+        pass
+
+    def to_bytes(self) -> bytes:
+        writer = BinaryWriter()
+        writer.write_raw(self.MAGIC + bytes([self.FORMAT_VERSION]) + self.TYPE_CODE)
+        self._write_payload(writer)
+        return writer.getvalue()
+
+    @classmethod
+    def from_bytes(cls: Type[A], data: bytes) -> A:
+        reader = BinaryReader(data)
+        header = reader.read_raw(len(cls.MAGIC) + 2)
+        if header[:len(cls.MAGIC)] != cls.MAGIC:
+            raise ValueError("Not a serialized accumulator")
+        if header[len(cls.MAGIC)] != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported accumulator format version {header[len(cls.MAGIC)]}")
+        if header[-1:] != cls.TYPE_CODE:
+            raise ValueError(f"Serialized accumulator is not a {cls.__name__}")
+        accumulator = cls._read_payload(reader)
+        reader.ensure_consumed()
+        return accumulator
+
+    def __reduce__(self):
+        return self.__class__.from_bytes, (self.to_bytes(),)
+
+    @classmethod
+    def merge_all(cls: Type[A], accumulators: Iterable[A]) -> A:
+        result = cls()
+        for accumulator in accumulators:
+            result.merge(accumulator)
+        return result
+
+
+class UserVelocityAccumulator(MergeableAccumulator):
+    TYPE_CODE = b'U'
+
+    def __init__(self) -> None:
+        self.story_points_per_user: Dict[str, ExactSum] = {}
+        self.spent_seconds_per_user: Dict[str, ExactSum] = {}
+
+    def add(self, user: str, story_points: float, spent_seconds: float) -> 'UserVelocityAccumulator':
+        self._story_points_sum(user).add(story_points)
+        self._spent_seconds_sum(user).add(spent_seconds)
+        return self
+
+    def merge(self, other: 'UserVelocityAccumulator') -> 'UserVelocityAccumulator':
+        for user in other.users():
+            if user in other.story_points_per_user:
+                self._story_points_sum(user).merge(other.story_points_per_user[user])
+            if user in other.spent_seconds_per_user:
+                self._spent_seconds_sum(user).merge(other.spent_seconds_per_user[user])
+        return self
+
+    def discard_user_if_empty(self, user: str):
+        if self._is_zero(self.story_points_per_user.get(user)) and self._is_zero(self.spent_seconds_per_user.get(user)):
+            self.story_points_per_user.pop(user, None)
+            self.spent_seconds_per_user.pop(user, None)
+
+    @staticmethod
+    def _is_zero(total: Optional[ExactSum]) -> bool:
+        return total is None or total.value == 0
+
+    def users(self) -> List[str]:
+        users = list(self.story_points_per_user.keys())
+        users.extend(user for user in self.spent_seconds_per_user.keys() if user not in self.story_points_per_user)
+        return users
+
+    def get_story_points_per_user(self) -> Dict[str, float]:
+        return {user: total.value for user, total in self.story_points_per_user.items()}
+
+    def get_spent_seconds_per_user(self) -> Dict[str, float]:
+        return {user: total.value for user, total in self.spent_seconds_per_user.items()}
+
+    def _story_points_sum(self, user: str) -> ExactSum:
+        total = self.story_points_per_user.get(user)
+        if total is None:
+            total = ExactSum()
+            self.story_points_per_user[user] = total
+        return total
+
+    def _spent_seconds_sum(self, user: str) -> ExactSum:
+        total = self.spent_seconds_per_user.get(user)
+        if total is None:
+            total = ExactSum()
+            self.spent_seconds_per_user[user] = total
+        return total
+
+    def _write_payload(self, writer: 'BinaryWriter'):
+        users = self.users()
+        writer.write_uint32(len(users))
+        for user in users:
+            writer.write_str(user)
+            writer.write_exact_sum(self.story_points_per_user.get(user, ExactSum()))
+            writer.write_exact_sum(self.spent_seconds_per_user.get(user, ExactSum()))
+
+    @classmethod
+    def _read_payload(cls, reader: 'BinaryReader') -> 'UserVelocityAccumulator':
+        accumulator = cls()
+        for _ in range(reader.read_uint32()):
+            user = reader.read_str()
+            accumulator.story_points_per_user[user] = reader.read_exact_sum()
+            accumulator.spent_seconds_per_user[user] = reader.read_exact_sum()
+        return accumulator
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, UserVelocityAccumulator):
+            return NotImplemented
+        return (self.get_story_points_per_user() == other.get_story_points_per_user()
+                and self.get_spent_seconds_per_user() == other.get_spent_seconds_per_user())
+
+
+class TeamVelocityAccumulator(MergeableAccumulator):
+    TYPE_CODE = b'T'
+
+    def __init__(self) -> None:
+        self.story_points = ExactSum()
+        self.spent_seconds = ExactSum()
+
+    def add(self, story_points: float, spent_seconds: float) -> 'TeamVelocityAccumulator':
+        self.story_points.add(story_points)
+        self.spent_seconds.add(spent_seconds)
+        return self
+
+    def merge(self, other: 'TeamVelocityAccumulator') -> 'TeamVelocityAccumulator':
+        self.story_points.merge(other.story_points)
+        self.spent_seconds.merge(other.spent_seconds)
+        return self
+
+    def _write_payload(self, writer: 'BinaryWriter'):
+        writer.write_exact_sum(self.story_points)
+        writer.write_exact_sum(self.spent_seconds)
+
+    @classmethod
+    def _read_payload(cls, reader: 'BinaryReader') -> 'TeamVelocityAccumulator':
+        accumulator = cls()
+        accumulator.story_points = reader.read_exact_sum()
+        accumulator.spent_seconds = reader.read_exact_sum()
+        return accumulator
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TeamVelocityAccumulator):
+            return NotImplemented
+        return (self.story_points.value == other.story_points.value
+                and self.spent_seconds.value == other.spent_seconds.value)
+
+
+class BinaryWriter:
+    _UINT32 = struct.Struct('<I')
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def write_raw(self, data: bytes):
+        self._chunks.append(data)
+
+    def write_uint32(self, value: int):
+        self._chunks.append(self._UINT32.pack(value))
+
+    def write_str(self, value: str):
+        encoded = value.encode('utf-8')
+        self.write_uint32(len(encoded))
+        self._chunks.append(encoded)
+
+    def write_exact_sum(self, value: ExactSum):
+        partials = value.partials
+        self.write_uint32(len(partials))
+        self._chunks.append(struct.pack(f'<{len(partials)}d', *partials))
+
+    def getvalue(self) -> bytes:
+        return b''.join(self._chunks)
+
+
+class BinaryReader:
+    _UINT32 = struct.Struct('<I')
+
+    def __init__(self, data: bytes) -> None:
+        self._data = memoryview(data)
+        self._offset = 0
+
+    def read_raw(self, size: int) -> bytes:
+        if self._offset + size > len(self._data):
+            raise ValueError("Serialized accumulator is truncated")
+        chunk = bytes(self._data[self._offset:self._offset + size])
+        self._offset += size
+        return chunk
+
+    def read_uint32(self) -> int:
+        return self._UINT32.unpack(self.read_raw(self._UINT32.size))[0]
+
+    def read_str(self) -> str:
+        return self.read_raw(self.read_uint32()).decode('utf-8')
+
+    def read_exact_sum(self) -> ExactSum:
+        count = self.read_uint32()
+        result = ExactSum()
+        result._partials = list(struct.unpack(f'<{count}d', self.read_raw(8 * count)))
+        return result
+
+    def ensure_consumed(self):
+        if self._offset != len(self._data):
+            raise ValueError("Serialized accumulator has trailing data")
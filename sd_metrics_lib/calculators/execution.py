@@ -0,0 +1,118 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, Optional, TypeVar
+
+from sd_metrics_lib.sources.abstract_worklog import AbstractStatusChangeWorklogExtractor
+
+R = TypeVar('R')
+
+
+class ExtractionEngine(ABC):
+
+    def __init__(self, chunk_size: int = 100) -> None:
+        self.chunk_size = max(1, chunk_size)
+
+    @abstractmethod
+    def map_chunks(self, func: Callable[[list], R], tasks: Iterable) -> Iterator[R]:
+        pass
+
+    def _iter_chunks(self, tasks: Iterable) -> Iterator[list]:
+        iterator = iter(tasks)
+        while True:
+            chunk = list(islice(iterator, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+class SerialExtractionEngine(ExtractionEngine):
+
+    def map_chunks(self, func: Callable[[list], R], tasks: Iterable) -> Iterator[R]:
+        for chunk in self._iter_chunks(tasks):
+            yield func(chunk)
+
+
+class ExecutorExtractionEngine(ExtractionEngine):
+
+    def __init__(self, executor: Executor, chunk_size: int = 100, max_pending_chunks: int = 8) -> None:
+        super().__init__(chunk_size)
+        self.executor = executor
+        self.max_pending_chunks = max(1, max_pending_chunks)
+
+    def map_chunks(self, func: Callable[[list], R], tasks: Iterable) -> Iterator[R]:
+        pending_futures = deque()
+        try:
+            for chunk in self._iter_chunks(tasks):
+                pending_futures.append(self.executor.submit(func, chunk))
+                if len(pending_futures) >= self.max_pending_chunks:
+                    yield pending_futures.popleft().result()
+            while pending_futures:
+                yield pending_futures.popleft().result()
+        finally:
+            for future in pending_futures:
+                future.cancel()
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
+
+
+class ThreadPoolExtractionEngine(ExecutorExtractionEngine):
+
+    def __init__(self, executor: Optional[ThreadPoolExecutor] = None, max_workers: Optional[int] = None,
+                 chunk_size: int = 100, max_pending_chunks: int = 8) -> None:
+        super().__init__(executor or ThreadPoolExecutor(max_workers=max_workers,
+                                                        thread_name_prefix="sd-metrics-extraction"),
+                         chunk_size=chunk_size,
+                         max_pending_chunks=max_pending_chunks)
+
+
+class ProcessPoolExtractionEngine(ExecutorExtractionEngine):
+
+    def __init__(self, executor: Optional[ProcessPoolExecutor] = None, max_workers: Optional[int] = None,
+                 chunk_size: int = 500, max_pending_chunks: int = 8) -> None:
+        super().__init__(executor or ProcessPoolExecutor(max_workers=max_workers),
+                         chunk_size=chunk_size,
+                         max_pending_chunks=max_pending_chunks)
+
+
+class TaskExtractionMemo:
+    # views over one status change walk, so work time and work intervals share a single changelog pass
+    STATUS_CHANGE_STATE_VIEWS = {
+        AbstractStatusChangeWorklogExtractor.get_work_time_per_user: 'working_time_per_user',
+        AbstractStatusChangeWorklogExtractor.get_work_intervals_per_user: 'work_intervals_per_user',
+    }
+
+    def __init__(self) -> None:
+        self._task = None
+        self._values: Dict[Hashable, Any] = {}
+
+    def start_task(self, task):
+        self._task = task
+        self._values.clear()
+
+    def extract(self, extractor_method: Callable[[Any], R], task) -> R:
+        if task is not self._task:
+            self.start_task(task)
+        memo_key = self._create_memo_key(extractor_method)
+        if memo_key in self._values:
+            return self._values[memo_key]
+        value = self._extract_value(extractor_method, task)
+        self._values[memo_key] = value
+        return value
+
+    def _extract_value(self, extractor_method: Callable[[Any], R], task) -> R:
+        state_view = self.STATUS_CHANGE_STATE_VIEWS.get(getattr(extractor_method, '__func__', None))
+        if state_view is None:
+            return extractor_method(task)
+        state = self.extract(extractor_method.__self__.get_status_change_state, task)
+        return getattr(state, state_view)
+
+    @staticmethod
+    def _create_memo_key(extractor_method: Callable) -> Hashable:
+        extractor = getattr(extractor_method, '__self__', None)
+        if extractor is None:
+            return extractor_method
+        # bound methods are recreated on every attribute access, so key by extractor instance and function
+        return id(extractor), extractor_method.__func__
@@ -0,0 +1,51 @@
+from typing import Iterable, List, Optional
+
+from sd_metrics_lib.calculators.execution import TaskExtractionMemo
+from sd_metrics_lib.calculators.velocity import AbstractMetricCalculator
+from sd_metrics_lib.sources.tasks import TaskProvider, ProxyTaskProvider
+from sd_metrics_lib.utils.time import TimeUnit, TimePolicy
+
+
+class MetricPipeline:
+
+    def __init__(self, task_provider: TaskProvider, calculators: Iterable[AbstractMetricCalculator]) -> None:
+        self.task_provider = task_provider
+        self.calculators = list(calculators)
+
+    def calculate(self, velocity_time_unit: TimeUnit = TimeUnit.DAY,
+                  time_policy: Optional[TimePolicy] = None) -> List:
+        self.extract_data()
+        return [calculator.calculate(velocity_time_unit, time_policy) for calculator in self.calculators]
+
+    def extract_data(self):
+        pending_calculators = [calculator for calculator in self.calculators if not calculator.is_data_fetched()]
+        if not pending_calculators:
+            return
+
+        single_pass_calculators = [c for c in pending_calculators if c.supports_single_pass()]
+        own_pass_calculators = [c for c in pending_calculators if not c.supports_single_pass()]
+        collected_tasks = [] if own_pass_calculators else None
+
+        extraction_memo = TaskExtractionMemo()
+        for task in self.task_provider.iter_tasks():
+            extraction_memo.start_task(task)
+            for calculator in single_pass_calculators:
+                calculator._extract_data_from_task(task, extraction_memo)
+            if collected_tasks is not None:
+                collected_tasks.append(task)
+        for calculator in single_pass_calculators:
+            calculator.mark_data_fetched()
+
+        for calculator in own_pass_calculators:
+            self._extract_data_from_collected_tasks(calculator, collected_tasks)
+
+    @staticmethod
+    def _extract_data_from_collected_tasks(calculator: AbstractMetricCalculator, tasks: list):
+        # calculators without per task extraction read tasks from their own provider
+        original_task_provider = getattr(calculator, 'task_provider', None)
+        calculator.task_provider = ProxyTaskProvider(tasks)
+        try:
+            calculator._extract_data_from_tasks()
+        finally:
+            calculator.task_provider = original_task_provider
+        calculator.mark_data_fetched()
@@ -0,0 +1,211 @@
+import bisect
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sd_metrics_lib.calculators.execution import TaskExtractionMemo
+from sd_metrics_lib.calculators.velocity import AbstractMetricCalculator, SinglePassExtraction
+from sd_metrics_lib.sources.story_points import StoryPointExtractor
+from sd_metrics_lib.sources.tasks import TaskProvider
+from sd_metrics_lib.sources.worklog import WorkIntervalExtractor, ResolutionDateExtractor
+from sd_metrics_lib.utils.generators import resolve_period_start, shift_period_start
+from sd_metrics_lib.utils.time import Duration, TimeUnit, TimePolicy
+from sd_metrics_lib.utils.worktime import WorkTimeExtractor, SIMPLE_WORKTIME_EXTRACTOR
+
+
+@dataclass
+class VelocityBucket:
+    start: datetime
+    end: datetime
+    story_points_per_user: Dict[str, float] = field(default_factory=dict)
+    spent_time_per_user: Dict[str, Duration] = field(default_factory=dict)
+    velocity_per_user: Dict[str, float] = field(default_factory=dict)
+    team_velocity: float = 0.0
+    rolling_velocity_per_user: Dict[str, float] = field(default_factory=dict)
+    rolling_team_velocity: float = 0.0
+
+
+class VelocityTimeSeriesCalculator(AbstractMetricCalculator, SinglePassExtraction):
+
+    def __init__(self, task_provider: TaskProvider,
+                 story_point_extractor: StoryPointExtractor,
+                 resolution_date_extractor: ResolutionDateExtractor,
+                 work_interval_extractor: WorkIntervalExtractor,
+                 bucket_time_unit: TimeUnit = TimeUnit.WEEK,
+                 number_of_buckets: int = 12,
+                 rolling_window: int = 4,
+                 end_time: Optional[datetime] = None,
+                 worktime_extractor: WorkTimeExtractor = SIMPLE_WORKTIME_EXTRACTOR) -> None:
+        super().__init__()
+        self.task_provider = task_provider
+        self.story_point_extractor = story_point_extractor
+        self.resolution_date_extractor = resolution_date_extractor
+        self.work_interval_extractor = work_interval_extractor
+        self.bucket_time_unit = bucket_time_unit
+        self.number_of_buckets = max(1, number_of_buckets)
+        self.rolling_window = max(1, rolling_window)
+        self.worktime_extractor = worktime_extractor
+
+        last_bucket_start = resolve_period_start(self._to_local_naive(end_time or datetime.now()), bucket_time_unit)
+        # one extra boundary closes the last bucket, so bucket i is [boundaries[i], boundaries[i + 1])
+        self.bucket_boundaries = [shift_period_start(last_bucket_start, bucket_time_unit, i - self.number_of_buckets + 1)
+                                  for i in range(self.number_of_buckets + 1)]
+        self.story_points_per_bucket: List[Dict[str, float]] = [{} for _ in range(self.number_of_buckets)]
+        self.spent_seconds_per_bucket: List[Dict[str, float]] = [{} for _ in range(self.number_of_buckets)]
+        self.buckets: List[VelocityBucket] = []
+
+    def _calculate_metric(self, time_unit: TimeUnit, time_policy: TimePolicy):
+        self.buckets = []
+        for bucket_index in range(self.number_of_buckets):
+            story_points_per_user = self.story_points_per_bucket[bucket_index]
+            spent_seconds_per_user = self.spent_seconds_per_bucket[bucket_index]
+            window_start_index = max(0, bucket_index - self.rolling_window + 1)
+            window_story_points, window_spent_seconds = self._sum_buckets(window_start_index, bucket_index + 1)
+
+            self.buckets.append(VelocityBucket(
+                start=self.bucket_boundaries[bucket_index],
+                end=self.bucket_boundaries[bucket_index + 1] - timedelta(microseconds=1),
+                story_points_per_user=dict(story_points_per_user),
+                spent_time_per_user={user: Duration.of(seconds, TimeUnit.SECOND)
+                                     for user, seconds in spent_seconds_per_user.items()},
+                velocity_per_user=self._calculate_velocity_per_user(story_points_per_user, spent_seconds_per_user,
+                                                                    time_unit, time_policy),
+                team_velocity=self._calculate_velocity(sum(story_points_per_user.values()),
+                                                       sum(spent_seconds_per_user.values()), time_unit, time_policy),
+                rolling_velocity_per_user=self._calculate_velocity_per_user(window_story_points, window_spent_seconds,
+                                                                            time_unit, time_policy),
+                rolling_team_velocity=self._calculate_velocity(sum(window_story_points.values()),
+                                                               sum(window_spent_seconds.values()), time_unit,
+                                                               time_policy)
+            ))
+
+    def _extract_data_from_tasks(self):
+        for task in self.task_provider.iter_tasks():
+            self._extract_data_from_task(task)
+
+    def _extract_data_from_task(self, task, extraction_memo: Optional[TaskExtractionMemo] = None):
+        task_story_points = self._extract(self.story_point_extractor.get_story_points, task, extraction_memo)
+        if task_story_points is None or task_story_points <= 0:
+            return
+        resolution_date = self._extract(self.resolution_date_extractor.get_resolution_date, task, extraction_memo)
+        if resolution_date is None:
+            return
+        work_intervals_per_user = self._extract(self.work_interval_extractor.get_work_intervals_per_user, task,
+                                                extraction_memo)
+
+        total_seconds_per_user: Dict[str, float] = {}
+        seconds_per_bucket_and_user: Dict[Tuple[int, str], float] = {}
+        for user, work_intervals in (work_intervals_per_user or {}).items():
+            for interval_start, interval_end in work_intervals:
+                interval_start = self._to_local_naive(interval_start)
+                interval_end = self._to_local_naive(interval_end)
+                # user totals are summed from the same pieces as buckets, so story point shares match spent time
+                for bucket_index, piece_seconds in self._split_working_seconds(interval_start, interval_end):
+                    if piece_seconds <= 0:
+                        continue
+                    total_seconds_per_user[user] = total_seconds_per_user.get(user, 0.0) + piece_seconds
+                    if bucket_index is None:
+                        continue
+                    piece_key = (bucket_index, user)
+                    seconds_per_bucket_and_user[piece_key] = (seconds_per_bucket_and_user.get(piece_key, 0.0)
+                                                              + piece_seconds)
+
+        total_seconds = sum(total_seconds_per_user.values())
+        if total_seconds <= 0:
+            return
+
+        for (bucket_index, user), seconds in seconds_per_bucket_and_user.items():
+            spent_seconds_per_user = self.spent_seconds_per_bucket[bucket_index]
+            spent_seconds_per_user[user] = spent_seconds_per_user.get(user, 0.0) + seconds
+
+        resolution_bucket_index = self._find_bucket_index(self._to_local_naive(resolution_date))
+        if resolution_bucket_index is None:
+            return
+        story_points_per_user = self.story_points_per_bucket[resolution_bucket_index]
+        for user, user_seconds in total_seconds_per_user.items():
+            story_points_per_user[user] = (story_points_per_user.get(user, 0.0)
+                                           + task_story_points * user_seconds / total_seconds)
+
+    def get_metric(self):
+        return self.buckets
+
+    def get_bucket_ranges(self) -> List[Tuple[datetime, datetime]]:
+        return [(self.bucket_boundaries[i], self.bucket_boundaries[i + 1] - timedelta(microseconds=1))
+                for i in range(self.number_of_buckets)]
+
+    def _split_working_seconds(self, start: datetime, end: datetime) -> Iterator[Tuple[Optional[int], float]]:
+        # pieces get differences of the time measured from the interval start, so they add up to the unsplit time;
+        # a boundary is measured as an exclusive end, so midnight does not count the next day as worked
+        measured_seconds = 0.0
+        for bucket_index, _, piece_end in self._split_interval(start, end):
+            measured_end = piece_end if piece_end >= end else piece_end - timedelta(microseconds=1)
+            # timestamps carry millisecond precision, rounding drops the microsecond taken off the boundary
+            piece_measured_seconds = round(self._extract_working_seconds(start, measured_end), 3)
+            piece_measured_seconds = max(measured_seconds, piece_measured_seconds)
+            yield bucket_index, piece_measured_seconds - measured_seconds
+            measured_seconds = piece_measured_seconds
+
+    def _split_interval(self, start: datetime, end: datetime) -> Iterator[Tuple[Optional[int], datetime, datetime]]:
+        if start >= end:
+            return
+        # parts outside the bucket range are yielded without bucket index
+        if start < self.bucket_boundaries[0]:
+            yield None, start, min(end, self.bucket_boundaries[0])
+        clipped_start = max(start, self.bucket_boundaries[0])
+        clipped_end = min(end, self.bucket_boundaries[-1])
+        if clipped_start < clipped_end:
+            bucket_index = bisect.bisect_right(self.bucket_boundaries, clipped_start) - 1
+            while bucket_index < self.number_of_buckets and self.bucket_boundaries[bucket_index] < clipped_end:
+                yield (bucket_index,
+                       max(clipped_start, self.bucket_boundaries[bucket_index]),
+                       min(clipped_end, self.bucket_boundaries[bucket_index + 1]))
+                bucket_index += 1
+        if end > self.bucket_boundaries[-1]:
+            yield None, max(start, self.bucket_boundaries[-1]), end
+
+    def _find_bucket_index(self, value: datetime) -> Optional[int]:
+        if value < self.bucket_boundaries[0] or value >= self.bucket_boundaries[-1]:
+            return None
+        return bisect.bisect_right(self.bucket_boundaries, value) - 1
+
+    def _extract_working_seconds(self, start: datetime, end: datetime) -> float:
+        duration = self.worktime_extractor.extract_time_from_period(start, end)
+        if duration is None:
+            return 0.0
+        return duration.to_seconds()
+
+    def _sum_buckets(self, start_index: int, end_index: int) -> Tuple[Dict[str, float], Dict[str, float]]:
+        story_points_per_user: Dict[str, float] = {}
+        spent_seconds_per_user: Dict[str, float] = {}
+        for bucket_index in range(start_index, end_index):
+            for user, story_points in self.story_points_per_bucket[bucket_index].items():
+                story_points_per_user[user] = story_points_per_user.get(user, 0.0) + story_points
+            for user, seconds in self.spent_seconds_per_bucket[bucket_index].items():
+                spent_seconds_per_user[user] = spent_seconds_per_user.get(user, 0.0) + seconds
+        return story_points_per_user, spent_seconds_per_user
+
+    @classmethod
+    def _calculate_velocity_per_user(cls, story_points_per_user: Dict[str, float],
+                                     spent_seconds_per_user: Dict[str, float],
+                                     time_unit: TimeUnit, time_policy: TimePolicy) -> Dict[str, float]:
+        velocity_per_user = {}
+        for user, story_points in story_points_per_user.items():
+            velocity = cls._calculate_velocity(story_points, spent_seconds_per_user.get(user, 0.0), time_unit,
+                                               time_policy)
+            if velocity != 0:
+                velocity_per_user[user] = velocity
+        return velocity_per_user
+
+    @staticmethod
+    def _calculate_velocity(story_points: float, spent_seconds: float, time_unit: TimeUnit,
+                            time_policy: TimePolicy) -> float:
+        if spent_seconds <= 0:
+            return 0.0
+        spent_time_in_unit = Duration.of(spent_seconds, TimeUnit.SECOND).convert(time_unit, time_policy).time_delta
+        return story_points / spent_time_in_unit
+
+    @staticmethod
+    def _to_local_naive(value: datetime) -> datetime:
+        if value.tzinfo is None:
+            return value
+        return value.astimezone().replace(tzinfo=None)
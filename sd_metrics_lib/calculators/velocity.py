@@ -1,10 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
 
+from sd_metrics_lib.calculators.accumulators import (MergeableAccumulator, UserVelocityAccumulator,
+                                                     TeamVelocityAccumulator)
+from sd_metrics_lib.calculators.execution import ExtractionEngine, TaskExtractionMemo
 from sd_metrics_lib.calculators.metrics import MetricCalculator
 from sd_metrics_lib.utils.time import TimeUnit, Duration, TimePolicy
 from sd_metrics_lib.sources.story_points import StoryPointExtractor
-from sd_metrics_lib.sources.tasks import TaskProvider
+from sd_metrics_lib.sources.tasks import TaskProvider, ProxyTaskProvider, extract_task_id
 from sd_metrics_lib.sources.worklog import WorklogExtractor, TaskTotalSpentTimeExtractor
 
 
@@ -27,6 +32,15 @@ class AbstractMetricCalculator(MetricCalculator, ABC):
     def is_data_fetched(self):
         return self.data_fetched is True
 
+    def supports_single_pass(self) -> bool:
+        return isinstance(self, SinglePassExtraction)
+
+    @staticmethod
+    def _extract(extractor_method: Callable[[Any], Any], task, extraction_memo: Optional[TaskExtractionMemo]):
+        if extraction_memo is None:
+            return extractor_method(task)
+        return extraction_memo.extract(extractor_method, task)
+
     @abstractmethod
     def _calculate_metric(self, time_unit: TimeUnit, time_policy: TimePolicy):
         pass
@@ -40,21 +54,143 @@ class AbstractMetricCalculator(MetricCalculator, ABC):
         pass
 
 
-class UserVelocityCalculator(AbstractMetricCalculator):
+class SinglePassExtraction(ABC):
+
+    @abstractmethod
+    def _extract_data_from_task(self, task, extraction_memo: Optional[TaskExtractionMemo] = None):
+        pass
+
+
+class AccumulatingMetricCalculator(AbstractMetricCalculator, SinglePassExtraction, ABC):
+    EXTRACTION_BATCH_SIZE = 100
+
+    def __init__(self, accumulator: MergeableAccumulator,
+                 track_task_contributions: bool = True,
+                 task_id_extractor: Callable[[Any], Hashable] = extract_task_id) -> None:
+        super().__init__()
+        self.accumulator = accumulator
+        self.track_task_contributions = track_task_contributions
+        self.task_id_extractor = task_id_extractor
+        self.task_contributions: Dict[Hashable, Any] = {}
+
+    def get_accumulator(self) -> MergeableAccumulator:
+        self._ensure_data_fetched()
+        return self.accumulator
+
+    def apply_task(self, task):
+        self._ensure_data_fetched()
+        self._retract_contribution(self._pop_tracked_contribution(task))
+        self._apply_contribution(task, self._extract_task_contribution(task))
+        self._refresh_totals_from_accumulator()
+
+    def retract_task(self, task):
+        self._ensure_data_fetched()
+        contribution = self._pop_tracked_contribution(task)
+        if contribution is None:
+            contribution = self._extract_task_contribution(task)
+        self._retract_contribution(contribution)
+        self._refresh_totals_from_accumulator()
+
+    def replace_task(self, old_task, new_task):
+        self.retract_task(old_task)
+        self.apply_task(new_task)
+
+    def _extract_data_from_task(self, task, extraction_memo: Optional[TaskExtractionMemo] = None):
+        self._apply_contribution(task, self._extract_task_contribution(task, extraction_memo))
+
+    def _extract_data_from_task_batches(self, tasks: Iterable):
+        iterator = iter(tasks)
+        while True:
+            batch = list(islice(iterator, self.EXTRACTION_BATCH_SIZE))
+            if not batch:
+                return
+            for task, contribution in zip(batch, self._extract_task_contributions_batch(batch)):
+                self._apply_contribution(task, contribution)
+
+    def _apply_contribution(self, task, contribution):
+        if contribution is None:
+            return
+        self._accumulate_contribution(contribution, 1)
+        if self.track_task_contributions:
+            task_id = self.task_id_extractor(task)
+            if task_id is not None:
+                self.task_contributions[task_id] = contribution
+
+    def _pop_tracked_contribution(self, task):
+        if not self.track_task_contributions:
+            return None
+        task_id = self.task_id_extractor(task)
+        if task_id is None:
+            return None
+        return self.task_contributions.pop(task_id, None)
+
+    def _retract_contribution(self, contribution):
+        if contribution is not None:
+            self._accumulate_contribution(contribution, -1)
+
+    def _extract_data_from_task_chunks(self, chunk_extractor: Callable[[list], Tuple[MergeableAccumulator, Dict]],
+                                       tasks: Iterable):
+        for partial_accumulator, partial_task_contributions in self.extraction_engine.map_chunks(chunk_extractor,
+                                                                                                 tasks):
+            self.accumulator.merge(partial_accumulator)
+            self.task_contributions.update(partial_task_contributions)
+
+    def _ensure_data_fetched(self):
+        if not self.is_data_fetched():
+            self._extract_data_from_tasks()
+            self.mark_data_fetched()
+
+    def merge_accumulator(self, accumulator: MergeableAccumulator):
+        # own tasks are extracted first, so the merged shard adds to them instead of replacing them
+        self._ensure_data_fetched()
+        self.accumulator.merge(accumulator)
+        self._refresh_totals_from_accumulator()
+
+    def _calculate_metric(self, time_unit: TimeUnit, time_policy: TimePolicy):
+        self._refresh_totals_from_accumulator()
+        self._calculate_metric_from_totals(time_unit, time_policy)
+
+    @abstractmethod
+    def _calculate_metric_from_totals(self, time_unit: TimeUnit, time_policy: TimePolicy):
+        pass
+
+    @abstractmethod
+    def _refresh_totals_from_accumulator(self):
+        pass
+
+    @abstractmethod
+    def _extract_task_contribution(self, task, extraction_memo: Optional[TaskExtractionMemo] = None):
+        pass
+
+    @abstractmethod
+    def _extract_task_contributions_batch(self, tasks: list) -> list:
+        pass
+
+    @abstractmethod
+    def _accumulate_contribution(self, contribution, sign: int):
+        pass
+
+
+class UserVelocityCalculator(AccumulatingMetricCalculator):
 
     def __init__(self, task_provider: TaskProvider,
                  story_point_extractor: StoryPointExtractor,
-                 worklog_extractor: WorklogExtractor) -> None:
-        super().__init__()
+                 worklog_extractor: WorklogExtractor,
+                 extraction_engine: Optional[ExtractionEngine] = None,
+                 track_task_contributions: bool = True,
+                 task_id_extractor: Callable[[Any], Hashable] = extract_task_id) -> None:
+        super().__init__(UserVelocityAccumulator(), track_task_contributions, task_id_extractor)
         self.task_provider = task_provider
         self.story_point_extractor = story_point_extractor
         self.worklog_extractor = worklog_extractor
+        self.extraction_engine = extraction_engine
 
         self.velocity_per_user = {}
         self.resolved_story_points_per_user = {}
         self.spent_time_per_user: Dict[str, Duration] = {}
 
-    def _calculate_metric(self, time_unit: TimeUnit, time_policy: TimePolicy):
+    def _calculate_metric_from_totals(self, time_unit: TimeUnit, time_policy: TimePolicy):
+        self.velocity_per_user = {}
         for user in self.resolved_story_points_per_user:
             spent_duration = self.spent_time_per_user.get(user)
             if spent_duration and not spent_duration.is_zero():
@@ -64,13 +200,37 @@ class UserVelocityCalculator(AbstractMetricCalculator):
                     self.velocity_per_user[user] = developer_velocity
 
     def _extract_data_from_tasks(self):
-        tasks = self.task_provider.get_tasks()
-        for task in tasks:
-            task_story_points = self.story_point_extractor.get_story_points(task)
-            if task_story_points is not None and task_story_points > 0:
-                time_user_worked_on_task = self.worklog_extractor.get_work_time_per_user(task)
-
-                self._sum_story_points_and_worklog(task_story_points, time_user_worked_on_task)
+        tasks = self.task_provider.iter_tasks()
+        if self.extraction_engine is not None:
+            chunk_extractor = partial(_extract_user_velocity_partial_sums,
+                                      self.story_point_extractor,
+                                      self.worklog_extractor,
+                                      self.track_task_contributions,
+                                      self.task_id_extractor)
+            self._extract_data_from_task_chunks(chunk_extractor, tasks)
+        else:
+            self._extract_data_from_task_batches(tasks)
+        self._refresh_totals_from_accumulator()
+
+    def _extract_task_contribution(self, task, extraction_memo: Optional[TaskExtractionMemo] = None):
+        task_story_points = self._extract(self.story_point_extractor.get_story_points, task, extraction_memo)
+        if task_story_points is None or task_story_points <= 0:
+            return None
+        time_user_worked_on_task = self._extract(self.worklog_extractor.get_work_time_per_user, task, extraction_memo)
+        return self._split_story_points_by_worklog(task_story_points, time_user_worked_on_task)
+
+    def _extract_task_contributions_batch(self, tasks: list) -> List[Optional[Dict[str, Tuple[float, float]]]]:
+        contributions = [None] * len(tasks)
+        story_points_batch = self.story_point_extractor.get_story_points_batch(tasks)
+        resolved_indexes = [i for i, story_points in enumerate(story_points_batch)
+                            if story_points is not None and story_points > 0]
+        if not resolved_indexes:
+            return contributions
+        work_times = self.worklog_extractor.get_work_time_per_user_batch([tasks[i] for i in resolved_indexes])
+        for task_index, time_user_worked_on_task in zip(resolved_indexes, work_times):
+            contributions[task_index] = self._split_story_points_by_worklog(story_points_batch[task_index],
+                                                                            time_user_worked_on_task)
+        return contributions
 
     def get_metric(self):
         return self.velocity_per_user
@@ -81,29 +241,41 @@ class UserVelocityCalculator(AbstractMetricCalculator):
     def get_spent_time(self):
         return self.spent_time_per_user
 
-    def _sum_story_points_and_worklog(self, task_story_points, time_user_worked_on_task: Dict[str, Duration]):
+    @staticmethod
+    def _split_story_points_by_worklog(task_story_points,
+                                       time_user_worked_on_task: Dict[str, Duration]) -> Optional[Dict[str, Tuple[float, float]]]:
         total_spent_time_on_task = Duration.sum(list(time_user_worked_on_task.values()), unit=TimeUnit.SECOND)
         if total_spent_time_on_task.is_zero():
-            return
-
-        for user in time_user_worked_on_task.keys():
-            if user not in self.resolved_story_points_per_user:
-                self.resolved_story_points_per_user[user] = 0.0
-            if user not in self.spent_time_per_user:
-                self.spent_time_per_user[user] = Duration.zero()
+            return None
 
+        contribution = {}
         for user, user_spent_time_on_task in time_user_worked_on_task.items():
-            story_point_ratio = user_spent_time_on_task.convert(TimeUnit.SECOND).time_delta / total_spent_time_on_task.time_delta
-            self.resolved_story_points_per_user[user] += task_story_points * story_point_ratio
-            self.spent_time_per_user[user] = self.spent_time_per_user[user].add(user_spent_time_on_task, unit=TimeUnit.SECOND)
+            user_spent_seconds = user_spent_time_on_task.convert(TimeUnit.SECOND).time_delta
+            story_point_ratio = user_spent_seconds / total_spent_time_on_task.time_delta
+            contribution[user] = (task_story_points * story_point_ratio, user_spent_seconds)
+        return contribution
+
+    def _accumulate_contribution(self, contribution: Dict[str, Tuple[float, float]], sign: int):
+        for user, (story_points, spent_seconds) in contribution.items():
+            self.accumulator.add(user, sign * story_points, sign * spent_seconds)
+            if sign < 0:
+                self.accumulator.discard_user_if_empty(user)
+
+    def _refresh_totals_from_accumulator(self):
+        self.resolved_story_points_per_user = self.accumulator.get_story_points_per_user()
+        self.spent_time_per_user = {user: Duration.of(seconds, TimeUnit.SECOND)
+                                    for user, seconds in self.accumulator.get_spent_seconds_per_user().items()}
 
 
-class GeneralizedTeamVelocityCalculator(AbstractMetricCalculator):
+class GeneralizedTeamVelocityCalculator(AccumulatingMetricCalculator):
 
     def __init__(self, task_provider: TaskProvider,
                  story_point_extractor: StoryPointExtractor,
-                 time_extractor: TaskTotalSpentTimeExtractor) -> None:
-        super().__init__()
+                 time_extractor: TaskTotalSpentTimeExtractor,
+                 extraction_engine: Optional[ExtractionEngine] = None,
+                 track_task_contributions: bool = True,
+                 task_id_extractor: Callable[[Any], Hashable] = extract_task_id) -> None:
+        super().__init__(TeamVelocityAccumulator(), track_task_contributions, task_id_extractor)
         self.total_resolved_story_points = 0.0
         self.total_spent_time: Duration = Duration.zero()
         self.velocity = None
@@ -111,8 +283,9 @@ class GeneralizedTeamVelocityCalculator(AbstractMetricCalculator):
         self.task_provider = task_provider
         self.story_point_extractor = story_point_extractor
         self.time_extractor = time_extractor
+        self.extraction_engine = extraction_engine
 
-    def _calculate_metric(self, time_unit: TimeUnit, time_policy: TimePolicy):
+    def _calculate_metric_from_totals(self, time_unit: TimeUnit, time_policy: TimePolicy):
         spent_time = self.total_spent_time.convert(time_unit, time_policy).time_delta
         story_points = self.total_resolved_story_points
 
@@ -122,13 +295,44 @@ class GeneralizedTeamVelocityCalculator(AbstractMetricCalculator):
             self.velocity = story_points / spent_time
 
     def _extract_data_from_tasks(self):
-        tasks = self.task_provider.get_tasks()
-        for task in tasks:
-            task_story_points = self.story_point_extractor.get_story_points(task)
-            if task_story_points is not None and task_story_points > 0:
-                time_spent_on_task = self.time_extractor.get_total_spent_time(task)
-
-                self._sum_story_points_and_worklog(task_story_points, time_spent_on_task)
+        tasks = self.task_provider.iter_tasks()
+        if self.extraction_engine is not None:
+            chunk_extractor = partial(_extract_team_velocity_partial_sums,
+                                      self.story_point_extractor,
+                                      self.time_extractor,
+                                      self.track_task_contributions,
+                                      self.task_id_extractor)
+            self._extract_data_from_task_chunks(chunk_extractor, tasks)
+        else:
+            self._extract_data_from_task_batches(tasks)
+        self._refresh_totals_from_accumulator()
+
+    def _extract_task_contribution(self, task, extraction_memo: Optional[TaskExtractionMemo] = None):
+        task_story_points = self._extract(self.story_point_extractor.get_story_points, task, extraction_memo)
+        if task_story_points is None or task_story_points <= 0:
+            return None
+        time_spent_on_task = self._extract(self.time_extractor.get_total_spent_time, task, extraction_memo)
+        return self._create_team_contribution(task_story_points, time_spent_on_task)
+
+    def _extract_task_contributions_batch(self, tasks: list) -> List[Optional[Tuple[float, float]]]:
+        contributions = [None] * len(tasks)
+        story_points_batch = self.story_point_extractor.get_story_points_batch(tasks)
+        resolved_indexes = [i for i, story_points in enumerate(story_points_batch)
+                            if story_points is not None and story_points > 0]
+        if not resolved_indexes:
+            return contributions
+        spent_times = self.time_extractor.get_total_spent_time_batch([tasks[i] for i in resolved_indexes])
+        for task_index, time_spent_on_task in zip(resolved_indexes, spent_times):
+            contributions[task_index] = self._create_team_contribution(story_points_batch[task_index],
+                                                                       time_spent_on_task)
+        return contributions
+
+    @staticmethod
+    def _create_team_contribution(task_story_points: float,
+                                  time_spent_on_task: Duration) -> Optional[Tuple[float, float]]:
+        if not time_spent_on_task or time_spent_on_task.is_zero():
+            return None
+        return task_story_points, time_spent_on_task.convert(TimeUnit.SECOND).time_delta
 
     def get_metric(self):
         return self.velocity
@@ -139,9 +343,32 @@ class GeneralizedTeamVelocityCalculator(AbstractMetricCalculator):
     def get_spent_time(self):
         return self.total_spent_time
 
-    def _sum_story_points_and_worklog(self, task_story_points: float, task_total_spent_time: Duration):
-        if not task_total_spent_time or task_total_spent_time.is_zero():
-            return
-
-        self.total_resolved_story_points += task_story_points
-        self.total_spent_time = self.total_spent_time.add(task_total_spent_time, unit=TimeUnit.SECOND)
+    def _accumulate_contribution(self, contribution: Tuple[float, float], sign: int):
+        story_points, spent_seconds = contribution
+        self.accumulator.add(sign * story_points, sign * spent_seconds)
+
+    def _refresh_totals_from_accumulator(self):
+        self.total_resolved_story_points = self.accumulator.story_points.value
+        self.total_spent_time = Duration.of(self.accumulator.spent_seconds.value, TimeUnit.SECOND)
+
+
+def _extract_user_velocity_partial_sums(story_point_extractor: StoryPointExtractor,
+                                        worklog_extractor: WorklogExtractor,
+                                        track_task_contributions: bool,
+                                        task_id_extractor: Callable[[Any], Hashable],
+                                        tasks: list) -> Tuple[UserVelocityAccumulator, Dict[Hashable, Any]]:
+    calculator = UserVelocityCalculator(ProxyTaskProvider(tasks), story_point_extractor, worklog_extractor,
+                                        track_task_contributions=track_task_contributions,
+                                        task_id_extractor=task_id_extractor)
+    return calculator.get_accumulator(), calculator.task_contributions
+
+
+def _extract_team_velocity_partial_sums(story_point_extractor: StoryPointExtractor,
+                                        time_extractor: TaskTotalSpentTimeExtractor,
+                                        track_task_contributions: bool,
+                                        task_id_extractor: Callable[[Any], Hashable],
+                                        tasks: list) -> Tuple[TeamVelocityAccumulator, Dict[Hashable, Any]]:
+    calculator = GeneralizedTeamVelocityCalculator(ProxyTaskProvider(tasks), story_point_extractor, time_extractor,
+                                                   track_task_contributions=track_task_contributions,
+                                                   task_id_extractor=task_id_extractor)
+    return calculator.get_accumulator(), calculator.task_contributions
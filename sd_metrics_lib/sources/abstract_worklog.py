@@ -1,13 +1,22 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, List, Optional
 
-from sd_metrics_lib.sources.worklog import WorklogExtractor
+from sd_metrics_lib.sources.worklog import WorklogExtractor, WorkIntervalExtractor, WorkInterval
 from sd_metrics_lib.utils.time import Duration, TimeUnit
 from sd_metrics_lib.utils.worktime import WorkTimeExtractor, SIMPLE_WORKTIME_EXTRACTOR
 
 
-class AbstractStatusChangeWorklogExtractor(WorklogExtractor, ABC):
+@dataclass(slots=True)
+class StatusChangeIntervalState:
+    interval_start_time: Optional[datetime] = None
+    interval_end_time: Optional[datetime] = None
+    working_time_per_user: Dict[str, Duration] = field(default_factory=dict)
+    work_intervals_per_user: Dict[str, List[WorkInterval]] = field(default_factory=dict)
+
+
+class AbstractStatusChangeWorklogExtractor(WorklogExtractor, WorkIntervalExtractor, ABC):
 
     def __init__(self,
                  transition_statuses: Optional[list[str]] = None,
@@ -17,15 +26,18 @@ class AbstractStatusChangeWorklogExtractor(WorklogExtractor, ABC):
         self.user_filter = user_filter
         self.worktime_extractor = worktime_extractor
 
-        self.interval_start_time: Optional[datetime] = None
-        self.interval_end_time: Optional[datetime] = None
-
     def get_work_time_per_user(self, task) -> Dict[str, Duration]:
-        working_time_per_user: Dict[str, Duration] = {}
+        return self.get_status_change_state(task).working_time_per_user
+
+    def get_work_intervals_per_user(self, task) -> Dict[str, List[WorkInterval]]:
+        return self.get_status_change_state(task).work_intervals_per_user
+
+    def get_status_change_state(self, task) -> StatusChangeIntervalState:
+        state = StatusChangeIntervalState()
 
         changelog_history = list(self._extract_chronological_changes_sequence(task))
         if not changelog_history:
-            return working_time_per_user
+            return state
 
         last_assigned_user = self._default_assigned_user()
         for changelog_entry in changelog_history:
@@ -44,64 +56,63 @@ class AbstractStatusChangeWorklogExtractor(WorklogExtractor, ABC):
                     last_assigned_user
                 )
 
-                self._update_time_intervals_and_sum_worklog(changelog_entry, working_time_per_user,
-                                                            previous_assigned_user)
+                self._update_time_intervals_and_sum_worklog(changelog_entry, state, previous_assigned_user)
 
                 assignee = self._extract_user_from_change(changelog_entry)
                 if self._is_allowed_user(assignee):
                     last_assigned_user = assignee
 
                 if self._is_status_changed_into_required(changelog_entry):
-                    if self.interval_start_time is None:
-                        self.interval_start_time = self._extract_change_time(changelog_entry)
+                    if state.interval_start_time is None:
+                        state.interval_start_time = self._extract_change_time(changelog_entry)
             elif is_user_change_entry:
                 previous_assigned_user = last_assigned_user
                 change_time = self._extract_change_time(changelog_entry)
-                was_in_interval = self.interval_start_time is not None
+                was_in_interval = state.interval_start_time is not None
 
-                self._update_time_intervals_and_sum_worklog(changelog_entry, working_time_per_user,
-                                                            previous_assigned_user)
+                self._update_time_intervals_and_sum_worklog(changelog_entry, state, previous_assigned_user)
 
                 assignee = self._extract_user_from_change(changelog_entry)
                 if self._is_allowed_user(assignee):
                     last_assigned_user = assignee
 
-                if was_in_interval and not is_status_change_entry and self.interval_start_time is None:
-                    self.interval_start_time = change_time
+                if was_in_interval and not is_status_change_entry and state.interval_start_time is None:
+                    state.interval_start_time = change_time
             elif is_status_change_entry:
                 last_assigned_user = self._get_current_assignee_from_changelog_when_last_assigned_is_unknown(
                     changelog_entry,
                     last_assigned_user
                 )
-                self._update_time_intervals_and_sum_worklog(changelog_entry, working_time_per_user, last_assigned_user)
+                self._update_time_intervals_and_sum_worklog(changelog_entry, state, last_assigned_user)
 
         if self._is_current_status_a_required_status(task):
-            self.interval_end_time = self._now()
-            self._sum_working_time(working_time_per_user, last_assigned_user)
+            state.interval_end_time = self._now()
+            self._sum_working_time(state, last_assigned_user)
 
-        return working_time_per_user
+        return state
 
-    def _update_time_intervals_and_sum_worklog(self, changelog_entry, working_time_per_user, assigned_user):
+    def _update_time_intervals_and_sum_worklog(self, changelog_entry, state: StatusChangeIntervalState,
+                                               assigned_user):
         change_time = self._extract_change_time(changelog_entry)
         is_user_change = self._is_user_change_entry(changelog_entry)
         is_status_into_required = self._is_status_change_entry(changelog_entry) and self._is_status_changed_into_required(changelog_entry)
         is_status_from_required = self._is_status_change_entry(changelog_entry) and self._is_status_changed_from_required(changelog_entry)
 
-        if is_user_change and self.interval_start_time is not None:
-            self.interval_end_time = change_time
-            self._sum_working_time(working_time_per_user, assigned_user)
-            if is_status_into_required or (not is_status_from_required and self.interval_start_time is not None):
-                self.interval_start_time = change_time
+        if is_user_change and state.interval_start_time is not None:
+            state.interval_end_time = change_time
+            self._sum_working_time(state, assigned_user)
+            if is_status_into_required or (not is_status_from_required and state.interval_start_time is not None):
+                state.interval_start_time = change_time
             else:
-                self._clean_interval_times()
+                self._clean_interval_times(state)
         else:
             # Handle status transitions - these are not mutually exclusive!
-            if is_status_from_required and self.interval_start_time is not None:
-                self.interval_end_time = change_time
-                self._sum_working_time(working_time_per_user, assigned_user)
+            if is_status_from_required and state.interval_start_time is not None:
+                state.interval_end_time = change_time
+                self._sum_working_time(state, assigned_user)
 
             if is_status_into_required:
-                self.interval_start_time = change_time
+                state.interval_start_time = change_time
 
     def _get_current_assignee_from_changelog_when_last_assigned_is_unknown(self, changelog_entry, last_assigned_user):
         if last_assigned_user == self._default_assigned_user():
@@ -164,19 +175,23 @@ class AbstractStatusChangeWorklogExtractor(WorklogExtractor, ABC):
         except Exception:
             return datetime.now()
 
-    def _sum_working_time(self, working_time_per_user: Dict[str, Duration], last_assigned_user: str):
-        if self._is_interval_found_for_status_change():
-            duration_in_status = self.worktime_extractor.extract_time_from_period(self.interval_start_time,
-                                                                                  self.interval_end_time)
+    def _sum_working_time(self, state: StatusChangeIntervalState, last_assigned_user: str):
+        if self._is_interval_found_for_status_change(state):
+            duration_in_status = self.worktime_extractor.extract_time_from_period(state.interval_start_time,
+                                                                                  state.interval_end_time)
             if duration_in_status is not None:
-                already_worked_time = working_time_per_user.get(last_assigned_user, Duration.zero())
-                working_time_per_user[last_assigned_user] = already_worked_time.add(duration_in_status,
-                                                                                    unit=TimeUnit.SECOND)
-            self._clean_interval_times()
+                already_worked_time = state.working_time_per_user.get(last_assigned_user, Duration.zero())
+                state.working_time_per_user[last_assigned_user] = already_worked_time.add(duration_in_status,
+                                                                                          unit=TimeUnit.SECOND)
+                state.work_intervals_per_user.setdefault(last_assigned_user, []).append(
+                    (state.interval_start_time, state.interval_end_time))
+            self._clean_interval_times(state)
 
-    def _is_interval_found_for_status_change(self):
-        return self.interval_start_time is not None and self.interval_end_time is not None
+    @staticmethod
+    def _is_interval_found_for_status_change(state: StatusChangeIntervalState):
+        return state.interval_start_time is not None and state.interval_end_time is not None
 
-    def _clean_interval_times(self):
-        self.interval_start_time = None
-        self.interval_end_time = None
+    @staticmethod
+    def _clean_interval_times(state: StatusChangeIntervalState):
+        state.interval_start_time = None
+        state.interval_end_time = None
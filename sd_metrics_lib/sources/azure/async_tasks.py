@@ -0,0 +1,237 @@
+import asyncio
+import math
+from typing import Iterable, List, Optional, Dict
+
+import httpx
+from azure.devops.v7_1.work_item_tracking import models
+from azure.devops.v7_1.work_item_tracking.models import Wiql
+from msrest import Deserializer
+
+from sd_metrics_lib.sources.azure.tasks import AzureTaskProvider
+from sd_metrics_lib.sources.tasks import AsyncTaskProvider
+from sd_metrics_lib.utils.cache import CacheProtocol, CacheKeyBuilder
+
+
+class AsyncAzureClient:
+    API_VERSION = '7.1'
+
+    def __init__(self,
+                 organization_url: str,
+                 personal_access_token: Optional[str] = None,
+                 max_connections: int = 20,
+                 timeout: float = 75.0,
+                 http_client: Optional[httpx.AsyncClient] = None) -> None:
+        self.normalized_url = organization_url.rstrip('/')
+        if http_client is not None:
+            self.http_client = http_client
+        else:
+            auth = ('', personal_access_token) if personal_access_token is not None else None
+            self.http_client = httpx.AsyncClient(base_url=organization_url.rstrip('/'),
+                                                 auth=auth,
+                                                 timeout=timeout,
+                                                 limits=httpx.Limits(max_connections=max_connections,
+                                                                     max_keepalive_connections=max_connections))
+        client_models = {k: v for k, v in models.__dict__.items() if isinstance(v, type)}
+        self._deserialize = Deserializer(client_models)
+
+    async def query_by_wiql(self, wiql: Wiql, top: Optional[int] = None):
+        params = {}
+        if top is not None:
+            params['$top'] = top
+        response = await self._send('POST', '_apis/wit/wiql', params, json={'query': wiql.query})
+        return self._deserialize('WorkItemQueryResult', response)
+
+    async def get_work_items(self, ids, fields=None):
+        params = {'ids': ','.join(map(str, ids))}
+        if fields:
+            params['fields'] = ','.join(fields)
+        response = await self._send('GET', '_apis/wit/workitems', params)
+        return self._deserialize('[WorkItem]', response.get('value', []))
+
+    async def get_updates(self, id: int, top: Optional[int] = None, skip: Optional[int] = None):
+        params = {}
+        if top is not None:
+            params['$top'] = top
+        if skip is not None:
+            params['$skip'] = skip
+        response = await self._send('GET', f'_apis/wit/workItems/{id}/updates', params)
+        return self._deserialize('[WorkItemUpdate]', response.get('value', []))
+
+    async def aclose(self) -> None:
+        await self.http_client.aclose()
+
+    async def __aenter__(self) -> 'AsyncAzureClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def _send(self, method: str, path: str, params: dict, json: Optional[dict] = None) -> dict:
+        params = dict(params)
+        params['api-version'] = self.API_VERSION
+        response = await self.http_client.request(method, path, params=params, json=json,
+                                                  headers={'Accept': 'application/json'})
+        response.raise_for_status()
+        return response.json()
+
+
+class AsyncAzureTaskProvider(AsyncTaskProvider):
+
+    def __init__(self, azure_client, query: str,
+                 additional_fields: Optional[Iterable[str]] = None,
+                 custom_expand_fields: Optional[Iterable[str]] = None,
+                 page_size: int = 200,
+                 max_in_flight_requests: int = 8,
+                 cache: Optional[CacheProtocol] = None) -> None:
+        self.azure_client = azure_client
+        self.query = query.strip()
+        self.additional_fields = list(additional_fields) if additional_fields is not None else list(
+            AzureTaskProvider.DEFAULT_FIELDS)
+        self.custom_expand_fields = custom_expand_fields or []
+        self.page_size = max(1, page_size)
+        self.max_in_flight_requests = max(1, max_in_flight_requests)
+        self.cache = cache
+
+    @property
+    def cache_namespace(self) -> Optional[str]:
+        return getattr(self.azure_client, 'normalized_url', None)
+
+    async def get_tasks(self) -> list:
+        in_flight_limiter = asyncio.Semaphore(self.max_in_flight_requests)
+        task_ids = await self._fetch_task_ids_paginated(in_flight_limiter)
+        if not task_ids:
+            return []
+
+        return await self._fetch_tasks(task_ids, self.custom_expand_fields, in_flight_limiter)
+
+    async def _fetch_task_ids_paginated(self, in_flight_limiter: asyncio.Semaphore) -> List[int]:
+        base_query_no_order = AzureTaskProvider._remove_custom_order_by(self.query)
+        last_id = 0
+        all_ids: List[int] = []
+        while True:
+            wiql_text = AzureTaskProvider._add_tasks_pagination_with_stable_order_by(base_query_no_order, last_id)
+            query_result = await self._query_by_wiql(wiql_text, in_flight_limiter)
+            items = query_result.work_items or []
+            if not items:
+                break
+            page_ids = [ref.id for ref in items]
+            all_ids.extend(page_ids)
+            last_id = page_ids[-1]
+            if len(page_ids) < AzureTaskProvider.WIQL_RESULT_LIMIT_BEFORE_EXCEPTION_THROWING:
+                break
+        return all_ids
+
+    async def _fetch_tasks(self, work_item_ids, custom_expand_fields, in_flight_limiter: asyncio.Semaphore):
+        work_item_ids_list = list(work_item_ids)
+        total_ids = len(work_item_ids_list)
+        total_batches = math.ceil(total_ids / float(self.page_size))
+        batches = await asyncio.gather(*[
+            self._fetch_work_items_batch(
+                work_item_ids_list[batch_index * self.page_size:(batch_index + 1) * self.page_size],
+                in_flight_limiter)
+            for batch_index in range(total_batches)
+        ])
+        fetched_tasks = []
+        for batch in batches:
+            fetched_tasks.extend(batch or [])
+
+        if custom_expand_fields:
+            if AzureTaskProvider.WORK_ITEM_UPDATES_CUSTOM_FIELD_NAME in custom_expand_fields:
+                await self._attach_changelog_history(fetched_tasks, in_flight_limiter)
+
+            if AzureTaskProvider.CHILD_TASKS_CUSTOM_FIELD_NAME in custom_expand_fields:
+                await self._attach_child_tasks(fetched_tasks, in_flight_limiter)
+
+        return fetched_tasks
+
+    async def _fetch_work_items_batch(self, batch_ids: List[int], in_flight_limiter: asyncio.Semaphore):
+        async with in_flight_limiter:
+            return await self.azure_client.get_work_items(ids=batch_ids, fields=self.additional_fields)
+
+    async def _attach_changelog_history(self, tasks: List[object], in_flight_limiter: asyncio.Semaphore):
+        async def fetch_changelog_history(item):
+            parts = ["updates", str(getattr(item, 'id', None))]
+            key = CacheKeyBuilder.create_provider_custom_key(AzureTaskProvider, parts)
+
+            if self.cache is not None:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    item.fields[AzureTaskProvider.WORK_ITEM_UPDATES_CUSTOM_FIELD_NAME] = cached
+                    return
+
+            updates = await self._fetch_all_updates(item.id, in_flight_limiter)
+            item.fields[AzureTaskProvider.WORK_ITEM_UPDATES_CUSTOM_FIELD_NAME] = updates
+            if self.cache is not None:
+                self.cache.set(key, updates)
+
+        await asyncio.gather(*[fetch_changelog_history(task) for task in tasks])
+
+    async def _fetch_all_updates(self, work_item_id: int, in_flight_limiter: asyncio.Semaphore) -> list:
+        async with in_flight_limiter:
+            updates = list(await self.azure_client.get_updates(work_item_id,
+                                                               top=AzureTaskProvider.WORK_ITEM_UPDATES_PAGE_SIZE,
+                                                               skip=0) or [])
+        page_len = len(updates)
+        while page_len >= AzureTaskProvider.WORK_ITEM_UPDATES_PAGE_SIZE:
+            async with in_flight_limiter:
+                page = await self.azure_client.get_updates(work_item_id,
+                                                           top=AzureTaskProvider.WORK_ITEM_UPDATES_PAGE_SIZE,
+                                                           skip=len(updates)) or []
+            updates.extend(page)
+            page_len = len(page)
+        return updates
+
+    async def _attach_child_tasks(self, tasks: List[object], in_flight_limiter: asyncio.Semaphore):
+        if not tasks:
+            return
+
+        id_to_parent = {task.id: task for task in tasks if task is not None}
+        if not id_to_parent:
+            return
+
+        child_to_parent = await self._fetch_child_relationships_dict(id_to_parent.keys(), in_flight_limiter)
+        if not child_to_parent:
+            return
+
+        child_custom_expand_fields = [
+            field for field in self.custom_expand_fields
+            if field != AzureTaskProvider.CHILD_TASKS_CUSTOM_FIELD_NAME
+        ]
+
+        child_tasks = await self._fetch_tasks(child_to_parent.keys(), child_custom_expand_fields, in_flight_limiter)
+        AzureTaskProvider._assign_child_tasks_to_parents(id_to_parent, child_to_parent, child_tasks)
+
+    async def _fetch_child_relationships_dict(self, parent_ids, in_flight_limiter: asyncio.Semaphore) -> Dict[int, int]:
+        parent_ids_list = list(parent_ids)
+        if not parent_ids_list:
+            return {}
+
+        parent_ids_str = ', '.join(str(pid) for pid in parent_ids_list)
+        base_query = AzureTaskProvider.WORK_ITEM_LINKS_SELECTION_QUERY.format(parent_task_ids=parent_ids_str)
+
+        child_to_parent = {}
+        last_source_id = 0
+        while True:
+            wiql_query = AzureTaskProvider._add_relationships_pagination_with_stable_order_by(base_query,
+                                                                                               last_source_id)
+            query_result = await self._query_by_wiql(wiql_query, in_flight_limiter)
+
+            relations = query_result.work_item_relations or []
+            if not relations:
+                break
+
+            for relation in relations:
+                if relation and relation.source and relation.target:
+                    child_to_parent[relation.target.id] = relation.source.id
+                    last_source_id = max(last_source_id, relation.source.id)
+
+            if len(relations) < AzureTaskProvider.WIQL_RESULT_LIMIT_BEFORE_EXCEPTION_THROWING:
+                break
+
+        return child_to_parent
+
+    async def _query_by_wiql(self, wiql_text: str, in_flight_limiter: asyncio.Semaphore):
+        async with in_flight_limiter:
+            return await self.azure_client.query_by_wiql(
+                Wiql(query=wiql_text),
+                top=AzureTaskProvider.WIQL_RESULT_LIMIT_BEFORE_EXCEPTION_THROWING)
@@ -1,6 +1,10 @@
 import datetime
 from enum import Enum, auto
-from typing import Optional
+from typing import Optional, Iterable
+
+from sd_metrics_lib.sources.query import QueryDescriptor, DateRange, TaskFilterEvaluator
+from sd_metrics_lib.utils.query import canonicalize_query
+from sd_metrics_lib.utils.time import parse_timestamp_with_fraction_fallback
 
 
 class AzureSearchQueryBuilder:
@@ -31,6 +35,8 @@ class AzureSearchQueryBuilder:
                  ) -> None:
         self.query_parts: dict[AzureSearchQueryBuilder.__QueryParts, str] = {}
         self.raw_queries: list[str] = []
+        self.filter_values: dict[str, frozenset[str]] = {}
+        self.filter_date_ranges: dict[str, DateRange] = {}
 
         self.with_projects(projects)
         self.with_statuses(statuses)
@@ -49,12 +55,14 @@ class AzureSearchQueryBuilder:
             return
         project_filter = "[System.TeamProject] IN (" + self.__convert_in_wiql_value_list(projects) + ")"
         self.__add_filter(self.__QueryParts.PROJECT, project_filter)
+        self.__add_descriptor_values('projects', projects)
 
     def with_statuses(self, statuses: list[str]):
         if not statuses:
             return
         status_filter = "[System.State] IN (" + self.__convert_in_wiql_value_list(statuses) + ")"
         self.__add_filter(self.__QueryParts.STATUS, status_filter)
+        self.__add_descriptor_values('statuses', statuses)
 
     def with_resolution_dates(self, resolution_dates: tuple[Optional[datetime.datetime], Optional[datetime.datetime]]):
         if not resolution_dates:
@@ -64,6 +72,7 @@ class AzureSearchQueryBuilder:
                                                       resolution_dates[1])
         if date_filter:
             self.__add_filter(self.__QueryParts.RESOLUTION_DATE, date_filter)
+            self.__add_descriptor_dates('resolution_dates', resolution_dates)
 
     def with_last_modified_dates(self,
                                  last_modified_dates: tuple[Optional[datetime.datetime], Optional[datetime.datetime]]):
@@ -74,24 +83,28 @@ class AzureSearchQueryBuilder:
                                                       last_modified_dates[1])
         if date_filter:
             self.__add_filter(self.__QueryParts.LAST_MODIFIED, date_filter)
+            self.__add_descriptor_dates('last_modified_dates', last_modified_dates)
 
     def with_task_types(self, task_types: list[str]):
         if not task_types:
             return
         task_type_filter = "[System.WorkItemType] IN (" + self.__convert_in_wiql_value_list(task_types) + ")"
         self.__add_filter(self.__QueryParts.TYPE, task_type_filter)
+        self.__add_descriptor_values('task_types', task_types)
 
     def with_task_ids(self, task_ids: list[str]):
         if not task_ids:
             return
         ids_filter = "[System.Id] IN (" + ", ".join(task_ids) + ")"
         self.__add_filter(self.__QueryParts.TASK_IDS, ids_filter)
+        self.__add_descriptor_values('task_ids', task_ids)
 
     def with_assignees(self, assignees: list[str]):
         if not assignees:
             return
         assignees_filter = "[System.AssignedTo] IN (" + self.__convert_in_wiql_value_list(assignees) + ")"
         self.__add_filter(self.__QueryParts.ASSIGNEES, assignees_filter)
+        self.__add_descriptor_values('assignees', assignees)
 
     def with_assignees_history(self, assignees: list[str]):
         if not assignees:
@@ -99,12 +112,14 @@ class AzureSearchQueryBuilder:
         parts = [f"EVER ([System.AssignedTo] = '{a}')" for a in assignees]
         filter_expr = "(" + " OR ".join(parts) + ")"
         self.__add_filter(self.__QueryParts.ASSIGNEES_HISTORY, filter_expr)
+        self.__add_descriptor_values('assignees_history', assignees)
 
     def with_teams(self, teams: list[str]):
         if not teams:
             return
         team_filter = "[System.AreaPath] IN (" + self.__convert_in_wiql_value_list(teams) + ")"
         self.__add_filter(self.__QueryParts.AREA_PATH, team_filter)
+        self.__add_descriptor_values('teams', teams)
 
     def with_raw_queries(self, raw_queries: list[str]):
         if not raw_queries:
@@ -134,6 +149,15 @@ class AzureSearchQueryBuilder:
             query += " ORDER BY " + order_by
         return query
 
+    def build_canonical_query(self) -> str:
+        return canonicalize_query(self.build_query())
+
+    def build_descriptor(self) -> QueryDescriptor:
+        return QueryDescriptor(value_filters=dict(self.filter_values),
+                               date_filters=dict(self.filter_date_ranges),
+                               raw_queries=tuple(self.raw_queries),
+                               order_by=self.query_parts.get(self.__QueryParts.ORDER_BY))
+
     @staticmethod
     def __convert_in_wiql_value_list(values: list[str]) -> str:
         return ", ".join(["'%s'" % str(v) for v in values])
@@ -153,3 +177,55 @@ class AzureSearchQueryBuilder:
 
     def __add_filter(self, query_part_type: __QueryParts, query_part: str):
         self.query_parts[query_part_type] = query_part.strip()
+
+    def __add_descriptor_values(self, filter_name: str, values):
+        self.filter_values[filter_name] = frozenset(str(value) for value in values)
+
+    def __add_descriptor_dates(self, filter_name: str, date_range):
+        self.filter_date_ranges[filter_name] = (QueryDescriptor.to_date(date_range[0]),
+                                                QueryDescriptor.to_date(date_range[1]))
+
+
+class AzureTaskFilterEvaluator(TaskFilterEvaluator):
+    SUPPORTED_FILTERS = frozenset(['projects', 'statuses', 'task_types', 'task_ids', 'assignees', 'teams',
+                                   'resolution_dates', 'last_modified_dates'])
+
+    __FIELDS = {
+        'projects': 'System.TeamProject',
+        'statuses': 'System.State',
+        'task_types': 'System.WorkItemType',
+        'assignees': 'System.AssignedTo',
+        'teams': 'System.AreaPath',
+        'resolution_dates': 'Microsoft.VSTS.Common.ClosedDate',
+        'last_modified_dates': 'System.ChangedDate',
+    }
+
+    def __init__(self, time_format='%Y-%m-%dT%H:%M:%S.%f%z') -> None:
+        self.time_format = time_format
+
+    def required_fields(self, local_filters: QueryDescriptor) -> Iterable[str]:
+        return [self.__FIELDS[name] for name in local_filters.filter_names() if name in self.__FIELDS]
+
+    def extract_filter_values(self, task, filter_name: str) -> Iterable[str]:
+        if filter_name == 'task_ids':
+            return [str(task.id)]
+        field_value = task.fields.get(self.__FIELDS[filter_name])
+        if isinstance(field_value, dict):
+            return [field_value.get('displayName'), field_value.get('uniqueName'), field_value.get('id')]
+        return [field_value]
+
+    def extract_filter_date(self, task, filter_name: str) -> Optional[datetime.datetime]:
+        raw_date = task.fields.get(self.__FIELDS[filter_name])
+        if not raw_date or isinstance(raw_date, datetime.datetime):
+            return raw_date or None
+        return parse_timestamp_with_fraction_fallback(raw_date, self.time_format)
+
+    def is_date_in_range(self, value: datetime.datetime, date_range: DateRange) -> bool:
+        # WIQL compares dates with day precision unless timePrecision is requested
+        start_date, end_date = date_range
+        value_date = value.date()
+        if start_date is not None and value_date < start_date:
+            return False
+        if end_date is not None and value_date > end_date:
+            return False
+        return True
@@ -1,15 +1,21 @@
+import copy
 import math
-from concurrent.futures import ThreadPoolExecutor, wait, ALL_COMPLETED
-from typing import Iterable, List, Optional, Dict
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, ALL_COMPLETED, FIRST_COMPLETED
+from datetime import datetime
+from typing import Iterable, List, Optional, Dict, Tuple, Union
 
-from azure.devops.v7_1.work_item_tracking.models import Wiql
+from azure.devops.v7_1.work_item_tracking.models import (Wiql, ReportingWorkItemRevisionsFilter, WorkItemUpdate,
+                                                         WorkItemFieldUpdate)
 
+from sd_metrics_lib.sources.item_cache import TaskItemCache
 from sd_metrics_lib.sources.tasks import TaskProvider
-from sd_metrics_lib.utils.cache import CacheProtocol, CacheKeyBuilder
+from sd_metrics_lib.utils.cache import CacheProtocol, CacheKeyBuilder, DictProtocol
 
 
 class AzureTaskProvider(TaskProvider):
     WIQL_RESULT_LIMIT_BEFORE_EXCEPTION_THROWING = 19999
+    WORK_ITEM_UPDATES_PAGE_SIZE = 200
 
     WORK_ITEM_LINKS_SELECTION_QUERY = """
                                       SELECT [Source].[System.Id], [Target].[System.Id]
@@ -30,11 +36,28 @@ class AzureTaskProvider(TaskProvider):
         'Microsoft.VSTS.Common.ClosedDate'
     ]
 
+    BULK_UPDATES_TRACKED_FIELDS = [
+        'System.State',
+        'System.AssignedTo',
+        'System.ChangedBy',
+        'System.ChangedDate',
+        'System.RevisedDate',
+        'Microsoft.VSTS.Common.StateChangeDate'
+    ]
+    BULK_UPDATES_ALWAYS_PRESENT_FIELDS = ['System.ChangedBy', 'System.ChangedDate']
+
+    ITEM_VERSION_FIELD = 'System.Rev'
+
     def __init__(self, azure_client, query: str,
                  additional_fields: Optional[Iterable[str]] = None,
                  custom_expand_fields: Optional[Iterable[str]] = None,
                  page_size: int = 200, thread_pool_executor: Optional[ThreadPoolExecutor] = None,
-                 cache: Optional[CacheProtocol] = None) -> None:
+                 cache: Optional[CacheProtocol] = None,
+                 bulk_updates: bool = False,
+                 project: Optional[str] = None,
+                 updates_since: Optional[datetime] = None,
+                 wiql_shards: int = 1,
+                 item_cache: Optional[Union[DictProtocol, CacheProtocol]] = None) -> None:
         self.azure_client = azure_client
         self.query = query.strip()
         self.additional_fields = list(additional_fields) if additional_fields is not None else list(self.DEFAULT_FIELDS)
@@ -42,14 +65,63 @@ class AzureTaskProvider(TaskProvider):
         self.page_size = max(1, page_size)
         self.thread_pool_executor = thread_pool_executor
         self.cache = cache
+        self.bulk_updates = bulk_updates
+        self.project = project
+        self.updates_since = updates_since
+        self.wiql_shards = max(1, wiql_shards)
+        self.item_cache = item_cache
+
+    @property
+    def cache_namespace(self) -> Optional[str]:
+        return getattr(self.azure_client, 'normalized_url', None)
 
     def get_tasks(self) -> list:
-        task_ids = self._fetch_task_ids_paginated()
+        if self.thread_pool_executor is not None and self.wiql_shards > 1:
+            task_ids = self._fetch_task_ids_sharded()
+        else:
+            task_ids = self._fetch_task_ids_paginated()
         if not task_ids:
             return []
 
+        if self.item_cache is not None:
+            return self._fetch_tasks_through_item_cache(task_ids)
         return self._fetch_tasks(task_ids, self.custom_expand_fields)
 
+    def _fetch_tasks_through_item_cache(self, task_ids: List[int]) -> list:
+        probed_items = self._fetch_work_items(task_ids, [self.ITEM_VERSION_FIELD])
+        version_per_id = {item.id: self._extract_work_item_version(item) for item in probed_items if item is not None}
+        item_versions = [(task_id, version_per_id[task_id]) for task_id in task_ids if task_id in version_per_id]
+
+        # child tasks change independently of the parent revision, so they are attached after cache lookup
+        item_expand_fields = [field for field in self.custom_expand_fields
+                              if field != self.CHILD_TASKS_CUSTOM_FIELD_NAME]
+        task_item_cache = TaskItemCache(self.item_cache,
+                                        self,
+                                        self.additional_fields + item_expand_fields,
+                                        task_id_extractor=lambda item: item.id,
+                                        task_version_extractor=self._extract_work_item_version,
+                                        task_copier=self._copy_work_item)
+        # items missing in the item cache are new or changed, so their cached updates are outdated as well
+        tasks = task_item_cache.resolve(item_versions,
+                                        lambda missing_ids: self._fetch_tasks(missing_ids, item_expand_fields,
+                                                                              reuse_cached_updates=False))
+        if self.CHILD_TASKS_CUSTOM_FIELD_NAME in self.custom_expand_fields:
+            self._attach_child_tasks(tasks)
+        return tasks
+
+    @classmethod
+    def _extract_work_item_version(cls, item) -> Optional[int]:
+        rev = getattr(item, 'rev', None)
+        if rev is None:
+            rev = (getattr(item, 'fields', None) or {}).get(cls.ITEM_VERSION_FIELD)
+        return rev
+
+    @staticmethod
+    def _copy_work_item(item):
+        item_copy = copy.copy(item)
+        item_copy.fields = dict(item.fields or {})
+        return item_copy
+
     def _fetch_task_ids_paginated(self) -> List[int]:
         base_query_no_order = self._remove_custom_order_by(self.query)
         last_id = 0
@@ -68,35 +140,102 @@ class AzureTaskProvider(TaskProvider):
                 break
         return all_ids
 
-    def _fetch_tasks(self, work_item_ids, custom_expand_fields):
-        work_item_ids_list = list(work_item_ids)
-        total_ids = len(work_item_ids_list)
-        total_batches = math.ceil(total_ids / float(self.page_size))
-        if self.thread_pool_executor is None:
-            fetched_tasks = self._fetch_task_sync(work_item_ids_list, total_batches, total_ids)
-        else:
-            fetched_tasks = self._fetch_task_concurrently(work_item_ids_list, total_batches, total_ids)
+    def _fetch_task_ids_sharded(self) -> List[int]:
+        base_query_no_order = self._remove_custom_order_by(self.query)
+        id_bounds = self._fetch_task_id_bounds(base_query_no_order)
+        if id_bounds is None:
+            return []
+
+        min_id, max_id = id_bounds
+        ids_per_shard: Dict[int, List[int]] = {}
+        pending_futures = {}
+
+        def submit_shards(after_id: int, up_to_id: int, shards_count: int):
+            for shard_after_id, shard_up_to_id in self._split_id_range(after_id, up_to_id, shards_count):
+                future = self.thread_pool_executor.submit(self._fetch_task_ids_in_range, base_query_no_order,
+                                                          shard_after_id, shard_up_to_id)
+                pending_futures[future] = (shard_after_id, shard_up_to_id)
+
+        submit_shards(min_id - 1, max_id, self.wiql_shards)
+        while pending_futures:
+            done = wait(list(pending_futures.keys()), return_when=FIRST_COMPLETED).done
+            for future in done:
+                shard_after_id, shard_up_to_id = pending_futures.pop(future)
+                shard_ids = future.result()
+                ids_per_shard[shard_after_id] = shard_ids
+                if len(shard_ids) >= self.WIQL_RESULT_LIMIT_BEFORE_EXCEPTION_THROWING:
+                    # shard hit the cap, split the rest of its range further
+                    submit_shards(shard_ids[-1], shard_up_to_id, 2)
+
+        all_ids: List[int] = []
+        for shard_after_id in sorted(ids_per_shard.keys()):
+            all_ids.extend(ids_per_shard[shard_after_id])
+        return all_ids
+
+    def _fetch_task_id_bounds(self, base_query_no_order: str) -> Optional[Tuple[int, int]]:
+        bounds = []
+        for direction in ("ASC", "DESC"):
+            wiql = Wiql(query=base_query_no_order + f" ORDER BY [System.Id] {direction}")
+            items = self.azure_client.query_by_wiql(wiql, top=1).work_items or []
+            if not items:
+                return None
+            bounds.append(items[0].id)
+        return bounds[0], bounds[1]
+
+    def _fetch_task_ids_in_range(self, base_query_no_order: str, after_id: int, up_to_id: int) -> List[int]:
+        wiql_text = self._add_tasks_id_range_with_stable_order_by(base_query_no_order, after_id, up_to_id)
+        query_result = self.azure_client.query_by_wiql(Wiql(query=wiql_text),
+                                                       top=self.WIQL_RESULT_LIMIT_BEFORE_EXCEPTION_THROWING)
+        return [ref.id for ref in query_result.work_items or []]
+
+    @staticmethod
+    def _split_id_range(after_id: int, up_to_id: int, shards_count: int) -> List[Tuple[int, int]]:
+        range_width = up_to_id - after_id
+        if range_width <= 0:
+            return []
+        shards_count = min(shards_count, range_width)
+        shard_width = math.ceil(range_width / shards_count)
+        shards = []
+        shard_after_id = after_id
+        while shard_after_id < up_to_id:
+            shard_up_to_id = min(shard_after_id + shard_width, up_to_id)
+            shards.append((shard_after_id, shard_up_to_id))
+            shard_after_id = shard_up_to_id
+        return shards
+
+    def _fetch_tasks(self, work_item_ids, custom_expand_fields, reuse_cached_updates: bool = True):
+        fetched_tasks = self._fetch_work_items(work_item_ids, self.additional_fields)
 
         if custom_expand_fields:
             if self.WORK_ITEM_UPDATES_CUSTOM_FIELD_NAME in custom_expand_fields:
-                self._attach_changelog_history(fetched_tasks)
+                self._attach_changelog_history(fetched_tasks, reuse_cached_updates)
 
             if self.CHILD_TASKS_CUSTOM_FIELD_NAME in custom_expand_fields:
                 self._attach_child_tasks(fetched_tasks)
 
         return fetched_tasks
 
-    def _fetch_task_sync(self, work_item_ids: List[int], total_batches: int, total_ids: int) -> List:
+    def _fetch_work_items(self, work_item_ids, fields: List[str]) -> List:
+        work_item_ids_list = list(work_item_ids)
+        total_ids = len(work_item_ids_list)
+        total_batches = math.ceil(total_ids / float(self.page_size))
+        if self.thread_pool_executor is None:
+            return self._fetch_task_sync(work_item_ids_list, total_batches, total_ids, fields)
+        return self._fetch_task_concurrently(work_item_ids_list, total_batches, total_ids, fields)
+
+    def _fetch_task_sync(self, work_item_ids: List[int], total_batches: int, total_ids: int,
+                         fields: List[str]) -> List:
         tasks = []
         for batch_index in range(total_batches):
             batch_start = batch_index * self.page_size
             batch_end = min(batch_start + self.page_size, total_ids)
             batch_ids = work_item_ids[batch_start:batch_end]
-            wis = self.azure_client.get_work_items(ids=batch_ids, fields=self.additional_fields)
+            wis = self.azure_client.get_work_items(ids=batch_ids, fields=fields)
             tasks.extend(wis or [])
         return tasks
 
-    def _fetch_task_concurrently(self, work_item_ids: List[int], total_batches: int, total_ids: int) -> List:
+    def _fetch_task_concurrently(self, work_item_ids: List[int], total_batches: int, total_ids: int,
+                                 fields: List[str]) -> List:
         tasks = []
         futures = []
         for batch_index in range(total_batches):
@@ -105,24 +244,29 @@ class AzureTaskProvider(TaskProvider):
             batch_ids = work_item_ids[batch_start:batch_end]
             futures.append(
                 self.thread_pool_executor.submit(self.azure_client.get_work_items, ids=batch_ids,
-                                                 fields=self.additional_fields))
+                                                 fields=fields))
         done = wait(futures, return_when=ALL_COMPLETED).done
         for done_feature in done:
             tasks.extend(done_feature.result() or [])
         return tasks
 
-    def _attach_changelog_history(self, tasks: List[object]):
+    def _attach_changelog_history(self, tasks: List[object], reuse_cached_updates: bool = True):
+        if self.bulk_updates:
+            self._attach_changelog_history_in_bulk(tasks, reuse_cached_updates)
+        else:
+            self._attach_changelog_history_per_item(tasks, reuse_cached_updates)
+
+    def _attach_changelog_history_per_item(self, tasks: List[object], reuse_cached_updates: bool = True):
         def fetch_changelog_history(item):
-            parts = ["updates", str(getattr(item, 'id', None))]
-            key = CacheKeyBuilder.create_provider_custom_key(self.__class__, parts)
+            key = self._create_updates_cache_key(item)
 
-            if getattr(self, 'cache', None) is not None:
+            if reuse_cached_updates and getattr(self, 'cache', None) is not None:
                 cached = self.cache.get(key)
                 if cached is not None:
                     item.fields[self.WORK_ITEM_UPDATES_CUSTOM_FIELD_NAME] = cached
                     return
 
-            updates = self.azure_client.get_updates(item.id)
+            updates = self._fetch_all_updates(item.id)
             item.fields[self.WORK_ITEM_UPDATES_CUSTOM_FIELD_NAME] = updates
             if getattr(self, 'cache', None) is not None:
                 self.cache.set(key, updates)
@@ -134,6 +278,96 @@ class AzureTaskProvider(TaskProvider):
             futures = [self.thread_pool_executor.submit(fetch_changelog_history, task) for task in tasks]
             wait(futures, return_when=ALL_COMPLETED)
 
+    def _create_updates_cache_key(self, item) -> str:
+        parts = ["updates", str(getattr(item, 'id', None))]
+        return CacheKeyBuilder.create_provider_custom_key(self.__class__, parts)
+
+    def _fetch_all_updates(self, work_item_id: int) -> list:
+        updates = list(self.azure_client.get_updates(work_item_id, top=self.WORK_ITEM_UPDATES_PAGE_SIZE, skip=0) or [])
+        page_len = len(updates)
+        while page_len >= self.WORK_ITEM_UPDATES_PAGE_SIZE:
+            page = self.azure_client.get_updates(work_item_id, top=self.WORK_ITEM_UPDATES_PAGE_SIZE,
+                                                 skip=len(updates)) or []
+            updates.extend(page)
+            page_len = len(page)
+        return updates
+
+    def _attach_changelog_history_in_bulk(self, tasks: List[object], reuse_cached_updates: bool = True):
+        not_cached_tasks = []
+        for task in tasks:
+            if reuse_cached_updates and self.cache is not None:
+                cached = self.cache.get(self._create_updates_cache_key(task))
+                if cached is not None:
+                    task.fields[self.WORK_ITEM_UPDATES_CUSTOM_FIELD_NAME] = cached
+                    continue
+            not_cached_tasks.append(task)
+        if not not_cached_tasks:
+            return
+
+        revisions_per_item = self._fetch_reporting_revisions({task.id for task in not_cached_tasks})
+        missing_in_stream = []
+        for task in not_cached_tasks:
+            revisions = revisions_per_item.get(task.id)
+            if not self._is_full_revision_history(revisions):
+                # with updates_since the stream starts mid-history for older items, which would give a truncated
+                # changelog, so those items are read (and cached) per item instead
+                missing_in_stream.append(task)
+                continue
+            updates = self._convert_revisions_to_updates(task.id, revisions)
+            task.fields[self.WORK_ITEM_UPDATES_CUSTOM_FIELD_NAME] = updates
+            if self.cache is not None:
+                self.cache.set(self._create_updates_cache_key(task), updates)
+
+        if missing_in_stream:
+            self._attach_changelog_history_per_item(missing_in_stream, reuse_cached_updates)
+
+    def _fetch_reporting_revisions(self, work_item_ids: set) -> Dict[int, List[dict]]:
+        revisions_filter = ReportingWorkItemRevisionsFilter(fields=self.BULK_UPDATES_TRACKED_FIELDS,
+                                                            include_identity_ref=True)
+        revisions_per_item = defaultdict(list)
+        continuation_token = None
+        while True:
+            # continuation token and start date are mutually exclusive in reporting API
+            start_date_time = self.updates_since if continuation_token is None else None
+            batch = self.azure_client.read_reporting_revisions_post(revisions_filter,
+                                                                    project=self.project,
+                                                                    continuation_token=continuation_token,
+                                                                    start_date_time=start_date_time)
+            for revision in batch.values or []:
+                if revision.get('id') in work_item_ids:
+                    revisions_per_item[revision['id']].append(revision)
+            if batch.is_last_batch or not batch.values or batch.continuation_token is None:
+                break
+            continuation_token = batch.continuation_token
+        return revisions_per_item
+
+    @staticmethod
+    def _is_full_revision_history(revisions: Optional[List[dict]]) -> bool:
+        if not revisions:
+            return False
+        return min(revision.get('rev', 0) for revision in revisions) == 1
+
+    @classmethod
+    def _convert_revisions_to_updates(cls, work_item_id: int, revisions: List[dict]) -> List[WorkItemUpdate]:
+        updates = []
+        previous_fields = {}
+        for revision in sorted(revisions, key=lambda r: r.get('rev', 0)):
+            current_fields = revision.get('fields') or {}
+            changed_fields = {}
+            for field_name in cls.BULK_UPDATES_TRACKED_FIELDS:
+                old_value = previous_fields.get(field_name)
+                new_value = current_fields.get(field_name)
+                if old_value != new_value or (field_name in cls.BULK_UPDATES_ALWAYS_PRESENT_FIELDS
+                                              and new_value is not None):
+                    changed_fields[field_name] = WorkItemFieldUpdate(old_value=old_value, new_value=new_value)
+            updates.append(WorkItemUpdate(id=revision.get('rev'),
+                                          rev=revision.get('rev'),
+                                          work_item_id=work_item_id,
+                                          revised_date=current_fields.get('System.RevisedDate'),
+                                          fields=changed_fields))
+            previous_fields = current_fields
+        return updates
+
     def _attach_child_tasks(self, tasks: List[object]):
         if not tasks:
             return
@@ -152,15 +386,20 @@ class AzureTaskProvider(TaskProvider):
         ]
 
         child_tasks = self._fetch_tasks(child_to_parent.keys(), child_custom_expand_fields)
+        self._assign_child_tasks_to_parents(id_to_parent, child_to_parent, child_tasks)
+
+    @classmethod
+    def _assign_child_tasks_to_parents(cls, id_to_parent: Dict[int, object], child_to_parent: Dict[int, int],
+                                       child_tasks: List[object]):
         id_to_child = {child.id: child for child in child_tasks if child is not None}
 
         for child_id, parent_id in child_to_parent.items():
             if child_id in id_to_child and parent_id in id_to_parent:
                 parent_task = id_to_parent[parent_id]
                 child_task = id_to_child[child_id]
-                if self.CHILD_TASKS_CUSTOM_FIELD_NAME not in parent_task.fields:
-                    parent_task.fields[self.CHILD_TASKS_CUSTOM_FIELD_NAME] = []
-                parent_task.fields[self.CHILD_TASKS_CUSTOM_FIELD_NAME].append(child_task)
+                if cls.CHILD_TASKS_CUSTOM_FIELD_NAME not in parent_task.fields:
+                    parent_task.fields[cls.CHILD_TASKS_CUSTOM_FIELD_NAME] = []
+                parent_task.fields[cls.CHILD_TASKS_CUSTOM_FIELD_NAME].append(child_task)
 
     def _fetch_child_relationships_dict(self, parent_ids) -> Dict[int, int]:
         parent_ids_list = list(parent_ids)
@@ -209,6 +448,17 @@ class AzureTaskProvider(TaskProvider):
         paged_query += " ORDER BY [System.Id] ASC"
         return paged_query
 
+    @staticmethod
+    def _add_tasks_id_range_with_stable_order_by(base_query_no_order: str, after_id: int, up_to_id: int) -> str:
+        lower = base_query_no_order.lower()
+        id_range = f"[System.Id] > {after_id} AND [System.Id] <= {up_to_id}"
+        if " where " in lower:
+            sharded_query = base_query_no_order + f" AND {id_range}"
+        else:
+            sharded_query = base_query_no_order + f" WHERE {id_range}"
+        sharded_query += " ORDER BY [System.Id] ASC"
+        return sharded_query
+
     @staticmethod
     def _add_relationships_pagination_with_stable_order_by(base_query: str, last_source_id: int) -> str:
         if last_source_id == 0:
@@ -2,8 +2,8 @@ from datetime import datetime
 from typing import Optional
 
 from sd_metrics_lib.sources.abstract_worklog import AbstractStatusChangeWorklogExtractor
-from sd_metrics_lib.sources.worklog import TaskTotalSpentTimeExtractor
-from sd_metrics_lib.utils.time import Duration, TimeUnit
+from sd_metrics_lib.sources.worklog import TaskTotalSpentTimeExtractor, ResolutionDateExtractor
+from sd_metrics_lib.utils.time import Duration, TimeUnit, parse_timestamp_with_fraction_fallback
 from sd_metrics_lib.utils.worktime import WorkTimeExtractor, SIMPLE_WORKTIME_EXTRACTOR
 
 
@@ -69,11 +69,7 @@ class AzureStatusChangeWorklogExtractor(AbstractStatusChangeWorklogExtractor):
         if isinstance(date_to_use, datetime):
             return date_to_use
         else:
-            try:
-                return datetime.strptime(date_to_use, self.time_format)
-            except ValueError:
-                # Sometimes Azure API returns time without milliseconds
-                return datetime.strptime(date_to_use, '%Y-%m-%dT%H:%M:%S%z')
+            return parse_timestamp_with_fraction_fallback(date_to_use, self.time_format)
 
     def _is_status_changed_into_required(self, changelog_entry) -> bool:
         if self.transition_statuses is None:
@@ -125,8 +121,18 @@ class AzureTaskTotalSpentTimeExtractor(TaskTotalSpentTimeExtractor):
         return Duration.datetime_difference(creation_date, resolution_date, TimeUnit.SECOND)
 
     def _convert_to_time(self, date_string: str) -> datetime:
-        try:
-            return datetime.strptime(date_string, self.time_format)
-        except ValueError:
-            # Sometimes Azure API returns time without milliseconds
-            return datetime.strptime(date_string, '%Y-%m-%dT%H:%M:%S%z')
+        if isinstance(date_string, datetime):
+            return date_string
+        return parse_timestamp_with_fraction_fallback(date_string, self.time_format)
+
+
+class AzureResolutionDateExtractor(ResolutionDateExtractor):
+
+    def __init__(self, time_format='%Y-%m-%dT%H:%M:%S.%f%z') -> None:
+        self.time_format = time_format
+
+    def get_resolution_date(self, task) -> Optional[datetime]:
+        resolution_date = (task.fields or {}).get('Microsoft.VSTS.Common.ClosedDate')
+        if resolution_date is None or isinstance(resolution_date, datetime):
+            return resolution_date
+        return parse_timestamp_with_fraction_fallback(resolution_date, self.time_format)
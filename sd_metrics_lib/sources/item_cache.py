@@ -0,0 +1,54 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from sd_metrics_lib.utils.cache import CacheKeyBuilder, CacheProtocol, DictProtocol, DictToCacheProtocolAdapter
+
+
+class TaskItemCache:
+
+    def __init__(self, cache: Union[DictProtocol, CacheProtocol],
+                 provider: object,
+                 fields: Optional[Iterable[str]],
+                 task_id_extractor: Callable[[Any], Any],
+                 task_version_extractor: Callable[[Any], Any],
+                 task_copier: Callable[[Any], Any]) -> None:
+        if isinstance(cache, DictProtocol):
+            self.cache: CacheProtocol = DictToCacheProtocolAdapter(cache)
+        else:
+            self.cache = cache
+        self.provider = provider
+        self.fields = CacheKeyBuilder.normalize_fields(fields)
+        self.task_id_extractor = task_id_extractor
+        self.task_version_extractor = task_version_extractor
+        self.task_copier = task_copier
+
+    def resolve(self, item_versions: Iterable[Tuple[Any, Any]],
+                fetch_tasks: Callable[[List[Any]], Iterable]) -> list:
+        ordered_ids = []
+        missing_ids = []
+        resolved: Dict[Any, Any] = {}
+        for item_id, version in item_versions:
+            ordered_ids.append(item_id)
+            cached = self.get(item_id, version)
+            if cached is None:
+                missing_ids.append(item_id)
+            else:
+                resolved[item_id] = self.task_copier(cached)
+
+        if missing_ids:
+            for task in fetch_tasks(missing_ids) or []:
+                self.set(task)
+                resolved[self.task_id_extractor(task)] = self.task_copier(task)
+
+        return [resolved[item_id] for item_id in ordered_ids if item_id in resolved]
+
+    def get(self, item_id: Any, version: Any):
+        if version is None:
+            return None
+        return self.cache.get(CacheKeyBuilder.create_item_key(self.provider, self.fields, item_id, version))
+
+    def set(self, task):
+        version = self.task_version_extractor(task)
+        if version is None:
+            return
+        item_id = self.task_id_extractor(task)
+        self.cache.set(CacheKeyBuilder.create_item_key(self.provider, self.fields, item_id, version), task)
@@ -0,0 +1,132 @@
+import asyncio
+import math
+from typing import Iterable, Optional, Union, List
+
+import httpx
+
+from sd_metrics_lib.sources.jira.tasks import JiraTaskProvider
+from sd_metrics_lib.sources.tasks import AsyncTaskProvider
+
+
+class AsyncJiraClient:
+
+    def __init__(self,
+                 url: str,
+                 username: Optional[str] = None,
+                 password: Optional[str] = None,
+                 api_version: str = '2',
+                 max_connections: int = 20,
+                 timeout: float = 75.0,
+                 http_client: Optional[httpx.AsyncClient] = None) -> None:
+        self.url = url.rstrip('/')
+        self.api_version = api_version
+        if http_client is not None:
+            self.http_client = http_client
+        else:
+            auth = (username, password) if username is not None else None
+            self.http_client = httpx.AsyncClient(base_url=url.rstrip('/'),
+                                                 auth=auth,
+                                                 timeout=timeout,
+                                                 limits=httpx.Limits(max_connections=max_connections,
+                                                                     max_keepalive_connections=max_connections))
+
+    async def jql(self, jql: str, fields: Union[str, List[str]] = '*all', start: int = 0,
+                  limit: Optional[int] = None, expand: Optional[str] = None) -> dict:
+        params = {
+            'jql': jql,
+            'fields': fields if isinstance(fields, str) else ','.join(fields),
+            'startAt': start,
+        }
+        if limit is not None:
+            params['maxResults'] = limit
+        if expand is not None:
+            params['expand'] = expand
+        return await self._get(f'rest/api/{self.api_version}/search', params)
+
+    async def issue_get_worklog(self, issue_id_or_key: str) -> dict:
+        return await self._get(f'rest/api/{self.api_version}/issue/{issue_id_or_key}/worklog')
+
+    async def aclose(self) -> None:
+        await self.http_client.aclose()
+
+    async def __aenter__(self) -> 'AsyncJiraClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def _get(self, path: str, params: Optional[dict] = None) -> dict:
+        response = await self.http_client.get(path, params=params, headers={'Accept': 'application/json'})
+        response.raise_for_status()
+        return response.json()
+
+
+class AsyncJiraTaskProvider(AsyncTaskProvider):
+
+    def __init__(self,
+                 jira_client,
+                 query: str,
+                 additional_fields: Iterable[str] = None,
+                 max_in_flight_requests: int = 8,
+                 page_size: int = 50) -> None:
+        self.jira_client = jira_client
+        self.query = query.strip()
+        self.additional_fields = additional_fields
+        if additional_fields is None:
+            self._expand_str = None
+        else:
+            self._expand_str = ",".join(self.additional_fields)
+        self.max_in_flight_requests = max(1, max_in_flight_requests)
+        self.page_size = max(1, page_size)
+
+    @property
+    def cache_namespace(self) -> Optional[str]:
+        return getattr(self.jira_client, 'url', None)
+
+    async def get_tasks(self):
+        in_flight_limiter = asyncio.Semaphore(self.max_in_flight_requests)
+        tasks = await self._fetch_tasks(self.query, self._expand_str, in_flight_limiter)
+        if self.additional_fields and 'subtasks' in self.additional_fields:
+            await self._fetch_child_tasks_and_replace_subtasks_field(tasks, in_flight_limiter)
+
+        return tasks
+
+    async def _fetch_tasks(self, query: str, expand_str: Optional[str], in_flight_limiter: asyncio.Semaphore):
+        first_page = await self._fetch_page(query, expand_str, 0, in_flight_limiter)
+        first_page_tasks = first_page.get("issues", [])
+        tasks_total_count = first_page.get("total", len(first_page_tasks))
+        page_len = len(first_page_tasks)
+        if tasks_total_count == 0 or page_len == 0:
+            return []
+
+        tasks = []
+        tasks.extend(first_page_tasks)
+        if page_len < tasks_total_count:
+            amount_of_fetches = math.ceil(tasks_total_count / float(page_len))
+            pages = await asyncio.gather(*[
+                self._fetch_page(query, expand_str, i * page_len, in_flight_limiter)
+                for i in range(1, amount_of_fetches)
+            ])
+            for page in pages:
+                tasks.extend(page.get("issues", []))
+        return tasks
+
+    async def _fetch_page(self, query: str, expand_str: Optional[str], start: int,
+                          in_flight_limiter: asyncio.Semaphore) -> dict:
+        async with in_flight_limiter:
+            return await self.jira_client.jql(query, expand=expand_str, limit=self.page_size, start=start)
+
+    async def _fetch_child_tasks_and_replace_subtasks_field(self, jira_tasks: List[dict],
+                                                            in_flight_limiter: asyncio.Semaphore):
+        if not jira_tasks:
+            return
+
+        child_tasks_ids, task_id_to_child_tasks_ids = JiraTaskProvider._collect_child_tasks_ids(jira_tasks)
+        if not child_tasks_ids:
+            return
+
+        query = "key in (" + ", ".join(child_tasks_ids) + ")"
+        child_expand_str = ",".join([field for field in self.additional_fields if field != 'subtasks'])
+        child_tasks = await self._fetch_tasks(query, child_expand_str, in_flight_limiter)
+        child_task_id_to_child_task = {task['key']: task for task in child_tasks}
+        JiraTaskProvider._replace_subtasks_field(jira_tasks, task_id_to_child_tasks_ids, child_task_id_to_child_task)
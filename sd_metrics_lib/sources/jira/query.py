@@ -2,6 +2,10 @@ import datetime
 from enum import Enum, auto
 from typing import Optional, Iterable
 
+from sd_metrics_lib.sources.query import QueryDescriptor, DateRange, TaskFilterEvaluator
+from sd_metrics_lib.utils.query import canonicalize_query
+from sd_metrics_lib.utils.time import parse_timestamp
+
 
 class JiraSearchQueryBuilder:
     class __QueryParts(Enum):
@@ -31,6 +35,8 @@ class JiraSearchQueryBuilder:
                  ) -> None:
         self.query_parts = {}
         self.raw_queries: list[str] = []
+        self.filter_values: dict[str, frozenset[str]] = {}
+        self.filter_date_ranges: dict[str, DateRange] = {}
 
         self.with_projects(projects)
         self.with_statuses(statuses)
@@ -49,12 +55,14 @@ class JiraSearchQueryBuilder:
             return
         project_filter = "project IN (" + self.__convert_in_jql_value_list(projects) + ")"
         self.__add_filter(self.__QueryParts.PROJECT, project_filter)
+        self.__add_descriptor_values('projects', projects)
 
     def with_statuses(self, statuses: Iterable[str]):
         if not statuses:
             return
         status_filter = "status in (" + self.__convert_in_jql_value_list(statuses) + ")"
         self.__add_filter(self.__QueryParts.STATUS, status_filter)
+        self.__add_descriptor_values('statuses', statuses)
 
     def with_resolution_dates(self, resolution_dates: tuple[Optional[datetime.datetime], Optional[datetime.datetime]]):
         if not resolution_dates:
@@ -64,6 +72,7 @@ class JiraSearchQueryBuilder:
                                                       resolution_dates[1])
         if date_filter:
             self.__add_filter(self.__QueryParts.RESOLUTION_DATE, date_filter)
+            self.__add_descriptor_dates('resolution_dates', resolution_dates)
 
     def with_last_modified_dates(self, last_modified_datas: tuple[Optional[datetime.datetime], Optional[datetime.datetime]]):
         if not last_modified_datas:
@@ -73,36 +82,42 @@ class JiraSearchQueryBuilder:
                                                       last_modified_datas[1])
         if date_filter:
             self.__add_filter(self.__QueryParts.LAST_MODIFIED, date_filter)
+            self.__add_descriptor_dates('last_modified_dates', last_modified_datas)
 
     def with_task_types(self, task_types: Iterable[str]):
         if not task_types:
             return
         task_type_filter = "issuetype in (" + self.__convert_in_jql_value_list(task_types) + ")"
         self.__add_filter(self.__QueryParts.TYPE, task_type_filter)
+        self.__add_descriptor_values('task_types', task_types)
 
     def with_task_ids(self, task_ids: Iterable[str]):
         if not task_ids:
             return
         ids_filter = "key in (" + ", ".join(task_ids) + ")"
         self.__add_filter(self.__QueryParts.TASK_IDS, ids_filter)
+        self.__add_descriptor_values('task_ids', task_ids)
 
     def with_teams(self, teams: Iterable[str]):
         if not teams:
             return
         team_filter = "Team[Team] in (" + self.__convert_in_jql_value_list(teams) + ")"
         self.__add_filter(self.__QueryParts.TEAM, team_filter)
+        self.__add_descriptor_values('teams', teams)
 
     def with_assignees(self, assignees: Iterable[str]):
         if not assignees:
             return
         assignees_filter = "assignee in (" + self.__convert_in_jql_value_list(assignees) + ")"
         self.__add_filter(self.__QueryParts.ASSIGNEES, assignees_filter)
+        self.__add_descriptor_values('assignees', assignees)
 
     def with_assignees_history(self, assignees: Iterable[str]):
         if not assignees:
             return
         assignees_filter = "assignee WAS IN (" + self.__convert_in_jql_value_list(assignees) + ")"
         self.__add_filter(self.__QueryParts.ASSIGNEES_HISTORY, assignees_filter)
+        self.__add_descriptor_values('assignees_history', assignees)
 
     def with_raw_queries(self, raw_queries: Iterable[str]):
         if not raw_queries:
@@ -130,6 +145,15 @@ class JiraSearchQueryBuilder:
                 return 'ORDER BY ' + order_by
         return base
 
+    def build_canonical_query(self) -> str:
+        return canonicalize_query(self.build_query())
+
+    def build_descriptor(self) -> QueryDescriptor:
+        return QueryDescriptor(value_filters=dict(self.filter_values),
+                               date_filters=dict(self.filter_date_ranges),
+                               raw_queries=tuple(self.raw_queries),
+                               order_by=self.query_parts.get(self.__QueryParts.ORDER_BY))
+
     @staticmethod
     def __convert_in_jql_value_list(values: Iterable[str]):
         return ', '.join(['"%s"' % w for w in values])
@@ -148,3 +172,43 @@ class JiraSearchQueryBuilder:
     def __add_filter(self, query_part_type: __QueryParts, query_part):
         self.query_parts[query_part_type] = query_part.strip()
 
+    def __add_descriptor_values(self, filter_name: str, values):
+        self.filter_values[filter_name] = frozenset(str(value) for value in values)
+
+    def __add_descriptor_dates(self, filter_name: str, date_range):
+        self.filter_date_ranges[filter_name] = (QueryDescriptor.to_date(date_range[0]),
+                                                QueryDescriptor.to_date(date_range[1]))
+
+
+class JiraTaskFilterEvaluator(TaskFilterEvaluator):
+    SUPPORTED_FILTERS = frozenset(['projects', 'statuses', 'task_types', 'task_ids', 'assignees',
+                                   'resolution_dates', 'last_modified_dates'])
+
+    __VALUE_FIELDS = {
+        'projects': ('project', ('key', 'name', 'id')),
+        'statuses': ('status', ('name', 'id')),
+        'task_types': ('issuetype', ('name', 'id')),
+        'assignees': ('assignee', ('accountId', 'name', 'displayName', 'emailAddress')),
+    }
+    __DATE_FIELDS = {
+        'resolution_dates': 'resolutiondate',
+        'last_modified_dates': 'updated',
+    }
+
+    def __init__(self, time_format='%Y-%m-%dT%H:%M:%S.%f%z') -> None:
+        self.time_format = time_format
+
+    def extract_filter_values(self, task, filter_name: str) -> Iterable[str]:
+        if filter_name == 'task_ids':
+            return [task.get('key'), task.get('id')]
+        field_name, attributes = self.__VALUE_FIELDS[filter_name]
+        field_value = task.get('fields', {}).get(field_name)
+        if not isinstance(field_value, dict):
+            return [field_value]
+        return [field_value.get(attribute) for attribute in attributes]
+
+    def extract_filter_date(self, task, filter_name: str) -> Optional[datetime.datetime]:
+        raw_date = task.get('fields', {}).get(self.__DATE_FIELDS[filter_name])
+        if not raw_date:
+            return None
+        return parse_timestamp(raw_date, self.time_format)
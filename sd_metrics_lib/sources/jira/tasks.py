@@ -1,18 +1,23 @@
-import concurrent
 import math
-from concurrent.futures import ThreadPoolExecutor, wait
-from typing import Iterable
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional, List, Union
 
+from sd_metrics_lib.sources.item_cache import TaskItemCache
 from sd_metrics_lib.sources.tasks import TaskProvider
+from sd_metrics_lib.utils.cache import CacheProtocol, DictProtocol
 
 
 class JiraTaskProvider(TaskProvider):
+    ITEM_VERSION_FIELD = 'updated'
 
     def __init__(self,
                  jira_client,
                  query: str,
                  additional_fields: Iterable[str] = None,
-                 thread_pool_executor: ThreadPoolExecutor = None) -> None:
+                 thread_pool_executor: ThreadPoolExecutor = None,
+                 prefetch_pages: int = 4,
+                 item_cache: Optional[Union[DictProtocol, CacheProtocol]] = None) -> None:
         self.jira_client = jira_client
         self.query = query.strip()
         self.additional_fields = additional_fields
@@ -22,61 +27,158 @@ class JiraTaskProvider(TaskProvider):
             # For Jira, additional_fields correspond to expand values (e.g., 'changelog')
             self._expand_str = ",".join(self.additional_fields)
         self.thread_pool_executor = thread_pool_executor
+        self.prefetch_pages = prefetch_pages
+        self.item_cache = item_cache
+
+    @property
+    def cache_namespace(self) -> Optional[str]:
+        return getattr(self.jira_client, 'url', None)
 
     def get_tasks(self):
-        tasks = self._fetch_tasks(self.query, self._expand_str)
-        if self.additional_fields and 'subtasks' in self.additional_fields:
+        if self.item_cache is not None:
+            tasks = self._fetch_tasks_through_item_cache()
+        else:
+            tasks = self._fetch_tasks(self.query, self._expand_str)
+        if self._is_subtasks_expand_requested():
             self._fetch_child_tasks_and_replace_subtasks_field(tasks)
 
         return tasks
 
-    def _fetch_tasks(self, query: str, expand_str: str):
-        first_page = self.jira_client.jql(query, expand=expand_str, limit=self._get_task_fetch_amount())
+    def iter_tasks(self) -> Iterator[dict]:
+        if self.item_cache is not None:
+            pages = self._iter_task_pages_through_item_cache()
+        else:
+            pages = self._iter_task_pages(self.query, self._expand_str, prefetch_pages=self.prefetch_pages)
+        for page in pages:
+            if self._is_subtasks_expand_requested():
+                self._fetch_child_tasks_and_replace_subtasks_field(page)
+            yield from page
+
+    def _is_subtasks_expand_requested(self) -> bool:
+        return bool(self.additional_fields) and 'subtasks' in self.additional_fields
+
+    def _fetch_tasks_through_item_cache(self) -> list:
+        probed_tasks = self._fetch_tasks(self.query, None, fields=self.ITEM_VERSION_FIELD)
+        return self._resolve_through_item_cache(self._create_task_item_cache(), probed_tasks)
+
+    def _iter_task_pages_through_item_cache(self) -> Iterator[list]:
+        task_item_cache = self._create_task_item_cache()
+        for probed_page in self._iter_task_pages(self.query, None, prefetch_pages=self.prefetch_pages,
+                                                 fields=self.ITEM_VERSION_FIELD):
+            yield self._resolve_through_item_cache(task_item_cache, probed_page)
+
+    def _create_task_item_cache(self) -> TaskItemCache:
+        return TaskItemCache(self.item_cache,
+                             self,
+                             self.additional_fields,
+                             task_id_extractor=lambda task: task['key'],
+                             task_version_extractor=self._extract_task_version,
+                             task_copier=self._copy_task)
+
+    def _resolve_through_item_cache(self, task_item_cache: TaskItemCache, probed_tasks: list) -> list:
+        item_versions = [(task['key'], self._extract_task_version(task)) for task in probed_tasks]
+        return task_item_cache.resolve(item_versions,
+                                       lambda missing_keys: self._fetch_tasks_by_keys(missing_keys, self._expand_str))
+
+    def _fetch_tasks_by_keys(self, task_keys: List[str], expand_str: Optional[str]) -> list:
+        tasks = []
+        chunk_size = self._get_task_fetch_amount()
+        for chunk_start in range(0, len(task_keys), chunk_size):
+            chunk_keys = task_keys[chunk_start:chunk_start + chunk_size]
+            tasks.extend(self._fetch_tasks("key in (" + ", ".join(chunk_keys) + ")", expand_str))
+        return tasks
+
+    @classmethod
+    def _extract_task_version(cls, task: dict) -> Optional[str]:
+        return (task.get('fields') or {}).get(cls.ITEM_VERSION_FIELD)
+
+    @staticmethod
+    def _copy_task(task: dict) -> dict:
+        # subtasks field is replaced on returned tasks, cached payload must stay untouched
+        return dict(task, fields=dict(task.get('fields') or {}))
+
+    def _fetch_tasks(self, query: str, expand_str: Optional[str], fields: Optional[str] = None):
+        tasks = []
+        for page in self._iter_task_pages(query, expand_str, prefetch_pages=None, fields=fields):
+            tasks.extend(page)
+        return tasks
+
+    def _iter_task_pages(self, query: str, expand_str: Optional[str], prefetch_pages: Optional[int],
+                         fields: Optional[str] = None) -> Iterator[list]:
+        jql_options = self._create_jql_options(expand_str, fields)
+        first_page = self.jira_client.jql(query, limit=self._get_task_fetch_amount(), **jql_options)
         first_page_tasks = first_page.get("issues", [])
         tasks_total_count = first_page.get("total", len(first_page_tasks))
         page_len = len(first_page_tasks)
         if tasks_total_count == 0 or page_len == 0:
-            return []
+            return
 
-        tasks = []
-        tasks.extend(first_page_tasks)
+        yield first_page_tasks
         if page_len < tasks_total_count:
             amount_of_fetches = math.ceil(tasks_total_count / float(page_len))
 
             if self.thread_pool_executor is None:
-                self._fetch_task_sync(tasks, amount_of_fetches, page_len)
+                yield from self._iter_task_pages_sync(query, jql_options, amount_of_fetches, page_len)
             else:
-                self._fetch_task_concurrently(tasks, amount_of_fetches, page_len)
-        return tasks
+                yield from self._iter_task_pages_concurrently(query, jql_options, amount_of_fetches, page_len,
+                                                              prefetch_pages)
 
-    def _fetch_task_concurrently(self, tasks, amount_of_fetches, page_len):
-        features = []
-        for i in range(1, amount_of_fetches):
-            next_search_start = i * page_len
-            feature = self.thread_pool_executor.submit(self.jira_client.jql,
-                                                       self.query,
-                                                       expand=self._expand_str,
+    @staticmethod
+    def _create_jql_options(expand_str: Optional[str], fields: Optional[str]) -> dict:
+        jql_options = {'expand': expand_str}
+        if fields is not None:
+            jql_options['fields'] = fields
+        return jql_options
+
+    def _iter_task_pages_concurrently(self, query, jql_options, amount_of_fetches, page_len, prefetch_pages):
+        window_size = amount_of_fetches if prefetch_pages is None else max(1, prefetch_pages)
+        pending_futures = deque()
+        next_page_index = 1
+
+        def submit_next_page():
+            nonlocal next_page_index
+            future = self.thread_pool_executor.submit(self.jira_client.jql,
+                                                       query,
                                                        limit=self._get_task_fetch_amount(),
-                                                       start=next_search_start)
-            features.append(feature)
-        done, not_done = wait(features, return_when=concurrent.futures.ALL_COMPLETED)
-        for feature in done:
-            tasks.extend(feature.result().get("issues", []))
-
-    def _fetch_task_sync(self, tasks, amount_of_fetches, page_len):
+                                                       start=next_page_index * page_len,
+                                                       **jql_options)
+            pending_futures.append(future)
+            next_page_index += 1
+
+        try:
+            while next_page_index < amount_of_fetches and len(pending_futures) < window_size:
+                submit_next_page()
+            while pending_futures:
+                page_result = pending_futures.popleft().result()
+                if next_page_index < amount_of_fetches:
+                    submit_next_page()
+                yield page_result.get("issues", [])
+        finally:
+            for future in pending_futures:
+                future.cancel()
+
+    def _iter_task_pages_sync(self, query, jql_options, amount_of_fetches, page_len):
         for i in range(1, amount_of_fetches):
             start = i * page_len
-            current_page_result = self.jira_client.jql(self.query,
-                                                       expand=self._expand_str,
+            current_page_result = self.jira_client.jql(query,
                                                        limit=self._get_task_fetch_amount(),
-                                                       start=start)
-            current_page_tasks = current_page_result.get("issues", [])
-            tasks.extend(current_page_tasks)
+                                                       start=start,
+                                                       **jql_options)
+            yield current_page_result.get("issues", [])
 
     def _fetch_child_tasks_and_replace_subtasks_field(self, jira_tasks: Iterable[dict]):
         if not jira_tasks:
             return
 
+        child_tasks_ids, task_id_to_child_tasks_ids = self._collect_child_tasks_ids(jira_tasks)
+        if not child_tasks_ids:
+            return
+
+        child_task_id_to_child_task = self._fetch_tasks_by_id(child_tasks_ids)
+        self._replace_subtasks_field(jira_tasks, task_id_to_child_tasks_ids, child_task_id_to_child_task)
+
+    @staticmethod
+    def _collect_child_tasks_ids(jira_tasks: Iterable[dict]):
         child_tasks_ids = []
         task_id_to_child_tasks_ids = {}
         for jira_task in jira_tasks:
@@ -86,15 +188,14 @@ class JiraTaskProvider(TaskProvider):
                 if subtasks_ids:
                     child_tasks_ids.extend(subtasks_ids)
                     task_id_to_child_tasks_ids[jira_task['key']] = subtasks_ids
+        return child_tasks_ids, task_id_to_child_tasks_ids
 
-        if not child_tasks_ids:
-            return
-
-        child_task_id_to_child_task = self._fetch_tasks_by_id(child_tasks_ids)
+    @staticmethod
+    def _replace_subtasks_field(jira_tasks: Iterable[dict], task_id_to_child_tasks_ids, child_task_id_to_child_task):
         for task in jira_tasks:
             task_key = task['key']
             if task_key in task_id_to_child_tasks_ids:
-                task['fields']['subtasks'] = self._create_child_task_list(
+                task['fields']['subtasks'] = JiraTaskProvider._create_child_task_list(
                     task_key,
                     task_id_to_child_tasks_ids,
                     child_task_id_to_child_task
@@ -1,53 +1,190 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict, Iterable, List, Set
 
 from sd_metrics_lib.sources.abstract_worklog import AbstractStatusChangeWorklogExtractor
-from sd_metrics_lib.sources.worklog import TaskTotalSpentTimeExtractor
+from sd_metrics_lib.sources.worklog import TaskTotalSpentTimeExtractor, ResolutionDateExtractor
 from sd_metrics_lib.sources.worklog import WorklogExtractor
-from sd_metrics_lib.utils.time import Duration, TimeUnit
+from sd_metrics_lib.utils.time import Duration, TimeUnit, parse_timestamp
 from sd_metrics_lib.utils.worktime import WorkTimeExtractor, SIMPLE_WORKTIME_EXTRACTOR
 
 
 class JiraWorklogExtractor(WorklogExtractor):
+    WORKLOG_LIST_MAX_IDS = 1000
 
-    def __init__(self, jira_client, user_filter: list[str] = None, include_subtask_worklog=False) -> None:
+    def __init__(self, jira_client, user_filter: list[str] = None, include_subtask_worklog=False,
+                 worklogs_updated_since: Optional[datetime] = None,
+                 thread_pool_executor: Optional[ThreadPoolExecutor] = None,
+                 time_format='%Y-%m-%dT%H:%M:%S.%f%z',
+                 prefetch_batches: bool = False) -> None:
         self.jira_client = jira_client
         self.user_filter = user_filter
         self.include_subtask_worklog = include_subtask_worklog
+        self.worklogs_updated_since = worklogs_updated_since
+        self.thread_pool_executor = thread_pool_executor
+        self.time_format = time_format
+        self.prefetch_batches = prefetch_batches
+
+        self._prefetched_issue_ids: Set[str] = set()
+        self._worklogs_by_issue_id: Dict[str, list] = {}
+        self._scan_lock = threading.Lock()
+        self._reset_updated_worklogs_scan()
+
+    def __getstate__(self):
+        # process pool workers get prefetched worklogs, but neither the lock nor the instance-wide scan
+        state = self.__dict__.copy()
+        for name in ('_scan_lock', '_scanned_since_ms', '_scanned_worklog_ids', '_updated_worklogs_by_issue_id'):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._scan_lock = threading.Lock()
+        self._reset_updated_worklogs_scan()
 
     def get_work_time_per_user(self, task):
         worklogs = self._get_worklog_for_task_with_subtasks(task)
 
-        working_time_per_user = {}
+        spent_seconds_per_user = {}
         for worklog in worklogs:
             worklog_user = self._extract_user_from_worklog(worklog)
             if self._is_allowed_user(worklog_user):
                 worklog_time_spent = self._extract_time_in_seconds_from_worklog(worklog)
-
-                spent_time_from_worklog = Duration.of(worklog_time_spent, TimeUnit.SECOND)
-                already_spent_time = working_time_per_user.get(worklog_user, Duration.zero())
-                working_time_per_user[worklog_user] = already_spent_time.add(spent_time_from_worklog, unit=TimeUnit.SECOND)
-
-        return working_time_per_user
+                spent_seconds_per_user[worklog_user] = spent_seconds_per_user.get(worklog_user, 0.0) + worklog_time_spent
+
+        return {user: Duration.of(seconds, TimeUnit.SECOND) for user, seconds in spent_seconds_per_user.items()}
+
+    def get_work_time_per_user_batch(self, tasks: Iterable[dict]) -> List[Dict[str, Duration]]:
+        tasks = list(tasks)
+        if self.prefetch_batches:
+            not_prefetched_tasks = [task for task in tasks if str(task.get('id')) not in self._prefetched_issue_ids]
+            if not_prefetched_tasks:
+                self._prefetch_worklogs(not_prefetched_tasks)
+        if self.thread_pool_executor is None:
+            return [self.get_work_time_per_user(task) for task in tasks]
+        return list(self.thread_pool_executor.map(self.get_work_time_per_user, tasks))
+
+    def prefetch_worklogs(self, tasks: Iterable[dict]):
+        # explicit prefetch always reads the current worklogs
+        with self._scan_lock:
+            self._reset_updated_worklogs_scan()
+        self._prefetch_worklogs(tasks)
+
+    def clear_prefetched_worklogs(self):
+        self._prefetched_issue_ids = set()
+        self._worklogs_by_issue_id = {}
+        with self._scan_lock:
+            self._reset_updated_worklogs_scan()
+
+    def _prefetch_worklogs(self, tasks: Iterable[dict]):
+        issues = self._collect_issues_with_subtasks(tasks)
+        issue_ids = {str(issue['id']) for issue in issues if issue.get('id') is not None}
+        if not issue_ids:
+            return
+
+        since = self.worklogs_updated_since or self._earliest_creation_time(issues)
+        updated_worklogs_by_issue_id = self._scan_updated_worklogs(since)
+        for issue_id in issue_ids:
+            self._worklogs_by_issue_id[issue_id] = list(updated_worklogs_by_issue_id.get(issue_id, []))
+        self._prefetched_issue_ids.update(issue_ids)
+
+    def _scan_updated_worklogs(self, since: Optional[datetime]) -> Dict[str, list]:
+        # worklog/updated covers the whole instance, so batches reuse one scan and only extend it to earlier times
+        since_ms = self._to_epoch_millis(since)
+        with self._scan_lock:
+            if self._scanned_since_ms is not None and since_ms >= self._scanned_since_ms:
+                return self._updated_worklogs_by_issue_id
+            worklog_ids = [worklog_id for worklog_id in self._fetch_updated_worklog_ids(since, self._scanned_since_ms)
+                           if worklog_id not in self._scanned_worklog_ids]
+            for worklog in self._fetch_worklogs_by_ids(worklog_ids):
+                self._updated_worklogs_by_issue_id.setdefault(str(worklog.get('issueId')), []).append(worklog)
+            self._scanned_worklog_ids.update(worklog_ids)
+            self._scanned_since_ms = since_ms
+            return self._updated_worklogs_by_issue_id
+
+    def _reset_updated_worklogs_scan(self):
+        self._scanned_since_ms: Optional[int] = None
+        self._scanned_worklog_ids: Set[int] = set()
+        self._updated_worklogs_by_issue_id: Dict[str, list] = {}
 
     def _get_worklog_for_task_with_subtasks(self, task):
         worklogs = []
-        worklogs.extend(self._get_worklogs_from_jira(task['key']))
+        worklogs.extend(self._get_worklogs(task))
         if self.include_subtask_worklog:
             try:
-                sub_task_keys = [subtask["key"] for subtask in task["fields"]["subtasks"]]
-                for subtask in sub_task_keys:
-                    worklogs.extend(self._get_worklogs_from_jira(subtask))
+                for subtask in task["fields"]["subtasks"]:
+                    worklogs.extend(self._get_worklogs(subtask))
             except AttributeError:
                 pass
         return worklogs
 
+    def _get_worklogs(self, issue: dict):
+        issue_id = issue.get('id')
+        if issue_id is not None and str(issue_id) in self._prefetched_issue_ids:
+            return self._worklogs_by_issue_id.get(str(issue_id), [])
+        return self._get_worklogs_from_jira(issue['key'])
+
     def _get_worklogs_from_jira(self, task_key: str):
         data = self.jira_client.issue_get_worklog(task_key)
         if 'worklogs' in data:
             return data['worklogs']
         return data
 
+    def _collect_issues_with_subtasks(self, tasks: Iterable[dict]) -> List[dict]:
+        issues = []
+        for task in tasks:
+            issues.append(task)
+            if self.include_subtask_worklog:
+                subtasks = task.get('fields', {}).get('subtasks') or []
+                issues.extend(subtask for subtask in subtasks if isinstance(subtask, dict))
+        return issues
+
+    def _earliest_creation_time(self, issues: Iterable[dict]) -> Optional[datetime]:
+        creation_times = []
+        for issue in issues:
+            created = issue.get('fields', {}).get('created')
+            if created:
+                creation_times.append(parse_timestamp(created, self.time_format))
+        if not creation_times:
+            return None
+        return min(creation_times)
+
+    def _fetch_updated_worklog_ids(self, since: Optional[datetime], until_ms: Optional[int] = None) -> List[int]:
+        since_ms = self._to_epoch_millis(since)
+        worklog_ids = []
+        while True:
+            page = self.jira_client.get('rest/api/2/worklog/updated', params={'since': since_ms})
+            worklog_ids.extend(value['worklogId'] for value in page.get('values', []))
+            if page.get('lastPage', True) or page.get('until') is None:
+                break
+            since_ms = page['until']
+            if until_ms is not None and since_ms >= until_ms:
+                break
+        return worklog_ids
+
+    @staticmethod
+    def _to_epoch_millis(value: Optional[datetime]) -> int:
+        return int(value.timestamp() * 1000) if value is not None else 0
+
+    def _fetch_worklogs_by_ids(self, worklog_ids: List[int]) -> List[dict]:
+        batches = [
+            worklog_ids[batch_start:batch_start + self.WORKLOG_LIST_MAX_IDS]
+            for batch_start in range(0, len(worklog_ids), self.WORKLOG_LIST_MAX_IDS)
+        ]
+        if self.thread_pool_executor is None:
+            batch_results = [self._fetch_worklog_batch(batch) for batch in batches]
+        else:
+            batch_results = list(self.thread_pool_executor.map(self._fetch_worklog_batch, batches))
+
+        worklogs = []
+        for batch_result in batch_results:
+            worklogs.extend(batch_result or [])
+        return worklogs
+
+    def _fetch_worklog_batch(self, worklog_ids: List[int]) -> List[dict]:
+        return self.jira_client.post('rest/api/2/worklog/list', data={'ids': worklog_ids})
+
     def _is_allowed_user(self, worklog_user):
         if self.user_filter is None:
             return True
@@ -92,9 +229,9 @@ class JiraStatusChangeWorklogExtractor(AbstractStatusChangeWorklogExtractor):
                 continue
             for history_entry_item in history_entry['items']:
                 if self._is_status_change_entry(history_entry_item) or self._is_user_change_entry(history_entry_item):
-                    history_entry_item['created'] = history_entry['created']
-                    history_entry_item['author'] = history_entry.get('author', {})
-                    changelog_history.append(history_entry_item)
+                    changelog_history.append(dict(history_entry_item,
+                                                  created=history_entry['created'],
+                                                  author=history_entry.get('author', {})))
 
         changelog_history.reverse()  # Jira returns newest first; reverse to chronological
         return changelog_history
@@ -112,7 +249,7 @@ class JiraStatusChangeWorklogExtractor(AbstractStatusChangeWorklogExtractor):
             return changelog_entry['to']
 
     def _extract_change_time(self, changelog_entry):
-        return datetime.strptime(changelog_entry['created'], self.time_format)
+        return parse_timestamp(changelog_entry['created'], self.time_format)
 
     def _is_status_changed_into_required(self, changelog_entry):
         if self.transition_statuses is None:
@@ -161,7 +298,18 @@ class JiraResolutionTimeTaskTotalSpentTimeExtractor(TaskTotalSpentTimeExtractor)
         if resolution_date_str is None:
             return Duration.zero()
 
-        resolution_date = datetime.strptime(resolution_date_str, self.time_format)
-        creation_date = datetime.strptime(task['fields']['created'], self.time_format)
+        resolution_date = parse_timestamp(resolution_date_str, self.time_format)
+        creation_date = parse_timestamp(task['fields']['created'], self.time_format)
         return Duration.datetime_difference(creation_date, resolution_date, TimeUnit.SECOND)
 
+
+class JiraResolutionDateExtractor(ResolutionDateExtractor):
+
+    def __init__(self, time_format='%Y-%m-%dT%H:%M:%S.%f%z') -> None:
+        self.time_format = time_format
+
+    def get_resolution_date(self, task) -> Optional[datetime]:
+        resolution_date_str = task.get('fields', {}).get('resolutiondate')
+        if resolution_date_str is None:
+            return None
+        return parse_timestamp(resolution_date_str, self.time_format)
@@ -0,0 +1,61 @@
+import copy
+from enum import Enum, auto
+from typing import Iterable
+
+
+class ProjectionMode(Enum):
+    NONE = auto()
+    VIEW = auto()
+    COPY = auto()
+
+
+class TaskProjector:
+    PROTECTED_KEYS = frozenset(['id', 'key', 'self', 'fields'])
+    STUB_KEYS = ('id', 'key', 'self')
+    STUB_FIELDS = ('summary', 'status', 'priority', 'issuetype')
+
+    def __init__(self, excluded_names: Iterable[str], mode: ProjectionMode = ProjectionMode.VIEW) -> None:
+        self.excluded_names = frozenset(excluded_names) - self.PROTECTED_KEYS
+        self.mode = mode
+
+    def project(self, task):
+        if self.mode == ProjectionMode.NONE or not self.excluded_names:
+            return task
+
+        if isinstance(task, dict):
+            projected = {key: value for key, value in task.items() if key not in self.excluded_names}
+            fields = projected.get('fields')
+            # Jira returns some expand data (e.g. subtasks) inside the fields section, a plain fetch has stubs there
+            if isinstance(fields, dict) and not self.excluded_names.isdisjoint(fields):
+                projected['fields'] = {key: self._to_stubs(value) if key in self.excluded_names else value
+                                       for key, value in fields.items()}
+        else:
+            fields = getattr(task, 'fields', None)
+            if not isinstance(fields, dict):
+                return task
+            projected = copy.copy(task)
+            projected.fields = {key: value for key, value in fields.items() if key not in self.excluded_names}
+
+        if self.mode == ProjectionMode.COPY:
+            return copy.deepcopy(projected)
+        return projected
+
+    def project_tasks(self, tasks: list) -> list:
+        if self.mode == ProjectionMode.NONE or not self.excluded_names:
+            return tasks
+        return [self.project(task) for task in tasks]
+
+    @classmethod
+    def _to_stubs(cls, value):
+        if not isinstance(value, list):
+            return value
+        return [cls._to_stub(item) if isinstance(item, dict) else item for item in value]
+
+    @classmethod
+    def _to_stub(cls, item: dict) -> dict:
+        stub = {key: item[key] for key in cls.STUB_KEYS if key in item}
+        fields = item.get('fields')
+        if isinstance(fields, dict):
+            stub['fields'] = {key: fields[key] for key in cls.STUB_FIELDS if key in fields}
+        return stub
+
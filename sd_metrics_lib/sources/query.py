@@ -0,0 +1,154 @@
+import datetime
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from sd_metrics_lib.utils.query import canonicalize_query
+
+DateRange = Tuple[Optional[datetime.date], Optional[datetime.date]]
+
+
+@dataclass(frozen=True)
+class QueryDescriptor:
+    value_filters: Dict[str, FrozenSet[str]] = field(default_factory=dict)
+    date_filters: Dict[str, DateRange] = field(default_factory=dict)
+    raw_queries: Tuple[str, ...] = ()
+    order_by: Optional[str] = None
+
+    def is_empty(self) -> bool:
+        return not self.value_filters and not self.date_filters and not self.raw_queries and not self.order_by
+
+    def filter_names(self) -> FrozenSet[str]:
+        return frozenset(self.value_filters.keys()) | frozenset(self.date_filters.keys())
+
+    def to_dict(self) -> dict:
+        return {
+            'value_filters': {name: sorted(values) for name, values in self.value_filters.items()},
+            'date_filters': {name: [d.isoformat() if d is not None else None for d in date_range]
+                             for name, date_range in self.date_filters.items()},
+            'raw_queries': list(self.raw_queries),
+            'order_by': self.order_by,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'QueryDescriptor':
+        return cls(
+            value_filters={name: frozenset(values) for name, values in data.get('value_filters', {}).items()},
+            date_filters={name: tuple(datetime.date.fromisoformat(d) if d is not None else None for d in date_range)
+                          for name, date_range in data.get('date_filters', {}).items()},
+            raw_queries=tuple(data.get('raw_queries', ())),
+            order_by=data.get('order_by'),
+        )
+
+    @staticmethod
+    def to_date(value) -> Optional[datetime.date]:
+        if isinstance(value, datetime.datetime):
+            return value.date()
+        return value
+
+
+class QuerySubsumptionResolver:
+
+    @staticmethod
+    def find_local_filters(cached: QueryDescriptor, requested: QueryDescriptor) -> Optional[QueryDescriptor]:
+        if QuerySubsumptionResolver._canonical_set(cached.raw_queries) != \
+                QuerySubsumptionResolver._canonical_set(requested.raw_queries):
+            return None
+        if QuerySubsumptionResolver._canonical(cached.order_by) != QuerySubsumptionResolver._canonical(
+                requested.order_by):
+            return None
+
+        local_value_filters = {}
+        for name, cached_values in cached.value_filters.items():
+            requested_values = requested.value_filters.get(name)
+            if requested_values is None:
+                return None
+            cached_normalized = QuerySubsumptionResolver._normalize_values(cached_values)
+            requested_normalized = QuerySubsumptionResolver._normalize_values(requested_values)
+            if not requested_normalized.issubset(cached_normalized):
+                return None
+            if requested_normalized != cached_normalized:
+                local_value_filters[name] = requested_values
+        for name, requested_values in requested.value_filters.items():
+            if name not in cached.value_filters:
+                local_value_filters[name] = requested_values
+
+        local_date_filters = {}
+        for name, cached_range in cached.date_filters.items():
+            requested_range = requested.date_filters.get(name)
+            if requested_range is None:
+                return None
+            if not QuerySubsumptionResolver._is_date_range_within(requested_range, cached_range):
+                return None
+            if tuple(requested_range) != tuple(cached_range):
+                local_date_filters[name] = requested_range
+        for name, requested_range in requested.date_filters.items():
+            if name not in cached.date_filters:
+                local_date_filters[name] = requested_range
+
+        return QueryDescriptor(value_filters=local_value_filters, date_filters=local_date_filters)
+
+    @staticmethod
+    def _is_date_range_within(inner: DateRange, outer: DateRange) -> bool:
+        inner_start, inner_end = inner
+        outer_start, outer_end = outer
+        if outer_start is not None and (inner_start is None or inner_start < outer_start):
+            return False
+        if outer_end is not None and (inner_end is None or inner_end > outer_end):
+            return False
+        return True
+
+    @staticmethod
+    def _normalize_values(values: Iterable[str]) -> FrozenSet[str]:
+        return frozenset(str(value).casefold() for value in values)
+
+    @staticmethod
+    def _canonical(query: Optional[str]) -> Optional[str]:
+        if not query:
+            return None
+        return canonicalize_query(query)
+
+    @staticmethod
+    def _canonical_set(queries: Iterable[str]) -> FrozenSet[str]:
+        return frozenset(canonicalize_query(query) for query in queries)
+
+
+class TaskFilterEvaluator(ABC):
+    SUPPORTED_FILTERS: FrozenSet[str] = frozenset()
+
+    def can_evaluate(self, local_filters: QueryDescriptor) -> bool:
+        return local_filters.filter_names().issubset(self.SUPPORTED_FILTERS)
+
+    def required_fields(self, local_filters: QueryDescriptor) -> Iterable[str]:
+        return []
+
+    def matches(self, task, local_filters: QueryDescriptor) -> bool:
+        for name, values in local_filters.value_filters.items():
+            allowed_values = {str(value).casefold() for value in values}
+            task_values = self.extract_filter_values(task, name)
+            if not any(str(value).casefold() in allowed_values for value in task_values if value is not None):
+                return False
+        for name, date_range in local_filters.date_filters.items():
+            task_date = self.extract_filter_date(task, name)
+            if task_date is None or not self.is_date_in_range(task_date, date_range):
+                return False
+        return True
+
+    def filter_tasks(self, tasks: Iterable, local_filters: QueryDescriptor) -> list:
+        return [task for task in tasks if self.matches(task, local_filters)]
+
+    def is_date_in_range(self, value: datetime.datetime, date_range: DateRange) -> bool:
+        start_date, end_date = date_range
+        if start_date is not None and value < datetime.datetime.combine(start_date, datetime.time.min, value.tzinfo):
+            return False
+        if end_date is not None and value > datetime.datetime.combine(end_date, datetime.time.min, value.tzinfo):
+            return False
+        return True
+
+    @abstractmethod
+    def extract_filter_values(self, task, filter_name: str) -> Iterable[str]:
+        pass
+
+    @abstractmethod
+    def extract_filter_date(self, task, filter_name: str) -> Optional[datetime.datetime]:
+        pass
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Optional, TypeVar
+from typing import Callable, Iterable, List, Optional, TypeVar
 
 from sd_metrics_lib.utils.attributes import get_attribute_by_path
 
@@ -12,6 +12,9 @@ class StoryPointExtractor(ABC):
     def get_story_points(self, task) -> float | None:
         pass
 
+    def get_story_points_batch(self, tasks: Iterable) -> List[Optional[float]]:
+        return [self.get_story_points(task) for task in tasks]
+
 
 class ConstantStoryPointExtractor(StoryPointExtractor):
 
@@ -1,13 +1,37 @@
+import asyncio
+import copy
+import threading
+import time
 from abc import abstractmethod, ABC
-from typing import Optional, List, Tuple, Set, Iterable
+from concurrent.futures import Executor
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, List, Tuple, Set, Iterable, Iterator, Callable, Any, Dict, Sequence
 from typing import Union
 
+from sd_metrics_lib.sources.projection import ProjectionMode, TaskProjector
+from sd_metrics_lib.sources.query import QueryDescriptor, QuerySubsumptionResolver, TaskFilterEvaluator
 from sd_metrics_lib.utils.cache import (
     DictProtocol,
     CacheProtocol,
     DictToCacheProtocolAdapter,
     CacheKeyBuilder,
-    SupersetResolver
+    FieldsetIndex,
+    InstrumentedCache
+)
+from sd_metrics_lib.utils.concurrency import (
+    SingleFlight,
+    AsyncSingleFlight,
+    DEFAULT_SINGLE_FLIGHT,
+    DEFAULT_ASYNC_SINGLE_FLIGHT
+)
+from sd_metrics_lib.utils.instrumentation import (
+    CacheMetrics,
+    CACHE_EXACT_HITS,
+    CACHE_SUPERSET_HITS,
+    CACHE_SUBSUMPTION_HITS,
+    CACHE_MISSES,
+    CACHE_STORES,
+    PROVIDER_FETCH_SECONDS
 )
 
 
@@ -17,6 +41,16 @@ class TaskProvider(ABC):
     def get_tasks(self) -> list:
         pass
 
+    def iter_tasks(self) -> Iterator:
+        return iter(self.get_tasks())
+
+
+class AsyncTaskProvider(ABC):
+
+    @abstractmethod
+    async def get_tasks(self) -> list:
+        pass
+
 
 class ProxyTaskProvider(TaskProvider):
 
@@ -28,17 +62,40 @@ class ProxyTaskProvider(TaskProvider):
 
 
 class CachingTaskProvider(TaskProvider):
+    DESCRIPTOR_REGISTRY_SIZE = 256
+    _DESCRIPTOR_REGISTRY_LOCK = threading.Lock()
 
     def __init__(self, provider: TaskProvider,
-                 cache: Optional[Union[DictProtocol, CacheProtocol]] = None) -> None:
+                 cache: Optional[Union[DictProtocol, CacheProtocol]] = None,
+                 store_key_lookup: bool = False,
+                 query_descriptor: Optional[QueryDescriptor] = None,
+                 task_filter_evaluator: Optional[TaskFilterEvaluator] = None,
+                 superset_projection: ProjectionMode = ProjectionMode.NONE,
+                 single_flight: Optional[SingleFlight] = None,
+                 stale_after: Optional[timedelta] = None,
+                 refresh_executor: Optional[Executor] = None,
+                 metrics: Optional[CacheMetrics] = None) -> None:
         if cache is not None and isinstance(cache, DictProtocol):
             self.cache: Optional[CacheProtocol] = DictToCacheProtocolAdapter(cache)
         else:
             self.cache = cache  # type: ignore[assignment]
+        if self.cache is not None and metrics is not None:
+            self.cache = InstrumentedCache(self.cache, metrics)
+        # adapters are created per instance, flights are keyed by the cache object passed in
+        self._cache_identity = id(cache)
 
         self.provider = provider
         self.query = getattr(provider, 'query', None)
         self.additional_fields = getattr(provider, 'additional_fields', None)
+        self.store_key_lookup = store_key_lookup
+        self.query_descriptor = query_descriptor
+        self.task_filter_evaluator = task_filter_evaluator
+        self.superset_projection = superset_projection
+        self.single_flight = single_flight
+        self.stale_after = stale_after
+        self.refresh_executor = refresh_executor
+        self.metrics = metrics
+        self._fieldset_indexes: Dict[str, FieldsetIndex] = {}
 
         if self.cache is not None and hasattr(self.provider, 'cache'):
             try:
@@ -48,56 +105,187 @@ class CachingTaskProvider(TaskProvider):
 
     def get_tasks(self):
         cached = self._try_fetch_from_cache()
+        if cached is not None:
+            if self._is_cache_entry_stale():
+                self._schedule_background_refresh()
+            return cached
+        if self.cache is None or self.single_flight is None:
+            return self._fetch_and_store_tasks()
+        return self.single_flight.do(self._create_flight_key(), self._fetch_coalesced_tasks)
+
+    def _fetch_coalesced_tasks(self):
+        # previous flight for the same key could have filled the cache right before this one started
+        cached = self._try_fetch_from_cache(record_metrics=False)
         if cached is not None:
             return cached
-        tasks = self.provider.get_tasks()
+        return self._fetch_and_store_tasks()
+
+    def _fetch_and_store_tasks(self):
+        if self.metrics is not None:
+            with self.metrics.time(PROVIDER_FETCH_SECONDS, self._create_metric_labels()):
+                tasks = self.provider.get_tasks()
+        else:
+            tasks = self.provider.get_tasks()
         self._store_in_cache(tasks)
         return tasks
 
-    def _try_fetch_from_cache(self):
+    def _schedule_background_refresh(self):
+        single_flight = self.single_flight or DEFAULT_SINGLE_FLIGHT
+        single_flight.submit(self._create_refresh_flight_key(), self._fetch_and_store_tasks, self.refresh_executor)
+
+    def _create_data_key(self) -> str:
+        return CacheKeyBuilder.create_full_data_key(CacheKeyBuilder.create_query_only_key_partial(self.query),
+                                                    self._effective_fields_for_key())
+
+    def _create_flight_key(self) -> str:
+        # flights can be shared process-wide, so the key is scoped to the cache and the provider's server
+        provider_namespace = getattr(self.provider, 'cache_namespace', None) or id(self.provider)
+        return (f"{self._cache_identity}||{self.provider.__class__.__name__}||{provider_namespace}||"
+                f"{self._create_data_key()}")
+
+    def _create_refresh_flight_key(self) -> str:
+        return "refresh||" + self._create_flight_key()
+
+    def _create_fetched_at_key(self) -> str:
+        return CacheKeyBuilder.create_fetched_at_key(CacheKeyBuilder.create_query_only_key_partial(self.query),
+                                                     self._effective_fields_for_key())
+
+    def _is_cache_entry_stale(self) -> bool:
+        if self.stale_after is None or self.cache is None:
+            return False
+        fetched_at = self.cache.get(self._create_fetched_at_key())
+        if fetched_at is None:
+            return False
+        return time.time() - float(fetched_at) > self.stale_after.total_seconds()
+
+    def _try_fetch_from_cache(self, record_metrics: bool = True):
         if self.cache is None:
             return None
 
         exact = self._fetch_exact_cache_hit()
         if exact is not None:
+            if record_metrics:
+                self._record_metric(CACHE_EXACT_HITS)
             return exact
 
         superset = self._fetch_superset_cache_hit()
         if superset is not None:
+            if record_metrics:
+                self._record_metric(CACHE_SUPERSET_HITS)
             return superset
 
+        subsuming = self._fetch_subsuming_cache_hit()
+        if subsuming is not None:
+            if record_metrics:
+                self._record_metric(CACHE_SUBSUMPTION_HITS)
+            self._store_in_cache(subsuming)
+            return subsuming
+
+        if record_metrics:
+            self._record_metric(CACHE_MISSES)
         return None
 
+    def _record_metric(self, name: str, amount: float = 1):
+        if self.metrics is not None:
+            self.metrics.increment(name, amount, self._create_metric_labels())
+
+    def _create_metric_labels(self) -> Dict[str, str]:
+        return {'provider': type(self.provider).__name__}
+
     def _store_in_cache(self, tasks):
         if self.cache is None:
             return
         normalized_fields = self._effective_fields_for_key()
         self._store_tasks_under_data_key(tasks, normalized_fields)
+        self._record_metric(CACHE_STORES)
         self._ensure_fieldset_list_updated(normalized_fields)
+        if self.store_key_lookup:
+            self._store_key_lookup()
+        if self.query_descriptor is not None:
+            self._register_query_descriptor()
+        if self.stale_after is not None:
+            self.cache.set(self._create_fetched_at_key(), time.time())
 
     def _fetch_exact_cache_hit(self):
-        partial_key = CacheKeyBuilder.create_query_only_key_partial(self.query)
-        data_key = CacheKeyBuilder.create_full_data_key(partial_key,
-                                                        self._effective_fields_for_key())
-        hit = self.cache.get(data_key)  # type: ignore[union-attr]
-        if hit is not None:
-            return hit
-        return None
+        return self._fetch_data_with_legacy_fallback(self._effective_fields_for_key())
 
     def _fetch_superset_cache_hit(self):
         requested_fields = self._effective_fields_for_key()
-        meta_key = CacheKeyBuilder.create_meta_data_key(CacheKeyBuilder.create_query_only_key_partial(self.query))
-        available_fieldsets = self._load_cached_fieldsets(meta_key)
-        compatible_available_fieldset = SupersetResolver.find_superset_fieldset(requested_fields, available_fieldsets)
+        fieldset_index = self._sync_fieldset_index(self._create_meta_key_for_query())
+        compatible_available_fieldset = fieldset_index.find_smallest_superset(requested_fields)
+        legacy_partial_key = CacheKeyBuilder.create_legacy_query_only_key_partial(self.query)
+        if compatible_available_fieldset is None and legacy_partial_key is not None:
+            legacy_fieldset_index = self._sync_fieldset_index(CacheKeyBuilder.create_meta_data_key(legacy_partial_key))
+            compatible_available_fieldset = legacy_fieldset_index.find_smallest_superset(requested_fields)
         if compatible_available_fieldset is not None:
-            superset_data_key = CacheKeyBuilder.create_full_data_key(
-                CacheKeyBuilder.create_query_only_key_partial(self.query),
-                compatible_available_fieldset)
-            superset_value = self.cache.get(superset_data_key)  # type: ignore[union-attr]
+            superset_value = self._fetch_data_with_legacy_fallback(compatible_available_fieldset)
             if superset_value is not None:
-                return superset_value
+                return self._project_superset_tasks(superset_value, compatible_available_fieldset, requested_fields)
+        return None
+
+    def _project_superset_tasks(self, tasks, superset_fields: Iterable[str], requested_fields: Iterable[str]):
+        projector = TaskProjector(set(superset_fields) - set(requested_fields), self.superset_projection)
+        return projector.project_tasks(tasks)
+
+    def _fetch_data_with_legacy_fallback(self, fields: Iterable[str]):
+        partial_key = CacheKeyBuilder.create_query_only_key_partial(self.query)
+        hit = self.cache.get(CacheKeyBuilder.create_full_data_key(partial_key, fields))  # type: ignore[union-attr]
+        if hit is not None:
+            return hit
+
+        legacy_partial_key = CacheKeyBuilder.create_legacy_query_only_key_partial(self.query)
+        if legacy_partial_key is None:
+            return None
+        legacy_hit = self.cache.get(  # type: ignore[union-attr]
+            CacheKeyBuilder.create_legacy_full_data_key(legacy_partial_key, fields))
+        if legacy_hit is not None:
+            # migrate entry written with the legacy base64 key to the current key
+            normalized_fields = CacheKeyBuilder.normalize_fields(fields)
+            self._store_tasks_under_data_key(legacy_hit, normalized_fields)
+            self._ensure_fieldset_list_updated(normalized_fields)
+        return legacy_hit
+
+    def _fetch_subsuming_cache_hit(self):
+        if self.query_descriptor is None or self.task_filter_evaluator is None:
+            return None
+
+        requested_fields = self._effective_fields_for_key()
+        for entry in reversed(self._load_descriptor_registry()):
+            cached_query = entry['query']
+            if cached_query == self.query:
+                continue
+            cached_descriptor = QueryDescriptor.from_dict(entry['descriptor'])
+            local_filters = QuerySubsumptionResolver.find_local_filters(cached_descriptor, self.query_descriptor)
+            if local_filters is None or not self.task_filter_evaluator.can_evaluate(local_filters):
+                continue
+
+            required_fields = set(requested_fields) | set(self.task_filter_evaluator.required_fields(local_filters))
+            cached_partial_key = CacheKeyBuilder.create_query_only_key_partial(cached_query)
+            cached_fieldset_index = self._sync_fieldset_index(CacheKeyBuilder.create_meta_data_key(cached_partial_key))
+            cached_fieldset = cached_fieldset_index.find_smallest_superset(required_fields)
+            if cached_fieldset is None:
+                continue
+            cached_tasks = self.cache.get(  # type: ignore[union-attr]
+                CacheKeyBuilder.create_full_data_key(cached_partial_key, cached_fieldset))
+            if cached_tasks is not None:
+                filtered_tasks = self.task_filter_evaluator.filter_tasks(cached_tasks, local_filters)
+                return self._project_superset_tasks(filtered_tasks, cached_fieldset, requested_fields)
         return None
 
+    def _register_query_descriptor(self):
+        # read-modify-write of a shared entry, only guarded against writers inside this process
+        with self._DESCRIPTOR_REGISTRY_LOCK:
+            registry = [entry for entry in self._load_descriptor_registry() if entry['query'] != self.query]
+            registry.append({'query': self.query, 'descriptor': self.query_descriptor.to_dict()})
+            registry = registry[-self.DESCRIPTOR_REGISTRY_SIZE:]
+            self.cache.set(CacheKeyBuilder.create_descriptor_registry_key(self.provider), registry)  # type: ignore
+
+    def _load_descriptor_registry(self) -> List[dict]:
+        raw = self.cache.get(CacheKeyBuilder.create_descriptor_registry_key(self.provider))  # type: ignore
+        if not raw:
+            return []
+        return list(raw)
+
     def _effective_fields_for_key(self) -> List[str]:
         base = CacheKeyBuilder.normalize_fields(self.additional_fields)
         expand = CacheKeyBuilder.normalize_fields(getattr(self.provider, 'custom_expand_fields', None))
@@ -111,27 +299,192 @@ class CachingTaskProvider(TaskProvider):
 
     def _ensure_fieldset_list_updated(self, fields: Iterable[str]):
         meta_key = self._create_meta_key_for_query()
-        fieldsets = self._load_cached_fieldsets(meta_key)
         fieldset_tuple = tuple(fields)
-        if fieldset_tuple not in fieldsets:
-            fieldsets.add(fieldset_tuple)
-            self._save_cached_fieldsets(meta_key, fieldsets)
+        fieldset_index = self._sync_fieldset_index(meta_key)
+        if fieldset_index.contains(fieldset_tuple):
+            return
+        raw = list(self._load_raw_fieldsets(meta_key))
+        raw.append(list(fieldset_tuple))
+        self.cache.set(meta_key, raw)  # type: ignore[union-attr]
+        fieldset_index.sync(raw)
+
+    def _sync_fieldset_index(self, meta_key: str) -> FieldsetIndex:
+        fieldset_index = self._fieldset_indexes.get(meta_key)
+        if fieldset_index is None:
+            fieldset_index = FieldsetIndex()
+            self._fieldset_indexes[meta_key] = fieldset_index
+        fieldset_index.sync(self._load_raw_fieldsets(meta_key))
+        return fieldset_index
+
+    def _load_raw_fieldsets(self, meta_key: str) -> Sequence[Iterable[str]]:
+        raw = self.cache.get(meta_key)  # type: ignore[union-attr]
+        if not isinstance(raw, (list, tuple)):
+            return []
+        return raw
 
     def _create_meta_key_for_query(self) -> str:
         return CacheKeyBuilder.create_meta_data_key(CacheKeyBuilder.create_query_only_key_partial(self.query))
 
-    def _load_cached_fieldsets(self, meta_key: str) -> Set[Tuple[str, ...]]:
-        raw = self.cache.get(meta_key)  # type: ignore[union-attr]
+    def _store_key_lookup(self):
+        lookup_key = CacheKeyBuilder.create_key_lookup_key(CacheKeyBuilder.create_query_only_key_partial(self.query))
+        self.cache.set(lookup_key, self.query)  # type: ignore[union-attr]
+
+
+class AsyncCachingTaskProvider(AsyncTaskProvider):
+
+    def __init__(self, provider: AsyncTaskProvider,
+                 cache: Optional[Union[DictProtocol, CacheProtocol]] = None,
+                 single_flight: Optional[AsyncSingleFlight] = None,
+                 stale_after: Optional[timedelta] = None,
+                 **caching_options) -> None:
+        self.provider = provider
+        self.single_flight = single_flight
+        self.caching = CachingTaskProvider(provider, cache, single_flight=None, stale_after=stale_after,
+                                           **caching_options)
+        self._background_refreshes: Set[asyncio.Task] = set()
+
+    async def get_tasks(self):
+        cached = self.caching._try_fetch_from_cache()
+        if cached is not None:
+            if self.caching._is_cache_entry_stale():
+                self._schedule_background_refresh()
+            return cached
+        if self.caching.cache is None or self.single_flight is None:
+            return await self._fetch_and_store_tasks()
+        return await self.single_flight.do(self.caching._create_flight_key(), self._fetch_coalesced_tasks)
+
+    async def _fetch_coalesced_tasks(self):
+        cached = self.caching._try_fetch_from_cache(record_metrics=False)
+        if cached is not None:
+            return cached
+        return await self._fetch_and_store_tasks()
+
+    async def _fetch_and_store_tasks(self):
+        if self.caching.metrics is not None:
+            with self.caching.metrics.time(PROVIDER_FETCH_SECONDS, self.caching._create_metric_labels()):
+                tasks = await self.provider.get_tasks()
+        else:
+            tasks = await self.provider.get_tasks()
+        self.caching._store_in_cache(tasks)
+        return tasks
+
+    def _schedule_background_refresh(self):
+        single_flight = self.single_flight or DEFAULT_ASYNC_SINGLE_FLIGHT
+        refresh_key = self.caching._create_refresh_flight_key()
+        if single_flight.is_in_flight(refresh_key):
+            return
+        refresh = asyncio.ensure_future(single_flight.do(refresh_key, self._fetch_and_store_tasks))
+        self._background_refreshes.add(refresh)
+        refresh.add_done_callback(self._on_background_refresh_done)
+
+    def _on_background_refresh_done(self, refresh: asyncio.Task):
+        self._background_refreshes.discard(refresh)
+        if not refresh.cancelled():
+            # stale value was already served, a failed refresh is retried on the next stale hit
+            refresh.exception()
+
+
+def extract_task_id(task) -> Any:
+    if isinstance(task, dict):
+        return task.get('key', task.get('id'))
+    return getattr(task, 'id', None)
+
+
+class IncrementalCachingTaskProvider(CachingTaskProvider):
+
+    def __init__(self, query_builder,
+                 provider_factory: Callable[[str], TaskProvider],
+                 cache: Union[DictProtocol, CacheProtocol],
+                 task_id_extractor: Callable[[Any], Any] = extract_task_id,
+                 watermark_overlap: timedelta = timedelta(days=1),
+                 store_key_lookup: bool = False,
+                 metrics: Optional[CacheMetrics] = None,
+                 full_refresh_after: Optional[timedelta] = timedelta(days=1)) -> None:
+        self.query_builder = query_builder
+        self.provider_factory = provider_factory
+        self.task_id_extractor = task_id_extractor
+        self.watermark_overlap = watermark_overlap
+        self.full_refresh_after = full_refresh_after
+        super().__init__(provider_factory(query_builder.build_query()), cache, store_key_lookup, metrics=metrics)
+
+    def get_tasks(self):
+        if self.cache is None:
+            return self.provider.get_tasks()
+
+        refresh_started_at = datetime.now(timezone.utc)
+        cached = self._fetch_exact_cache_hit()
+        self._record_metric(CACHE_EXACT_HITS if cached is not None else CACHE_MISSES)
+        watermark = self._load_watermark()
+        if cached is None or watermark is None or self._is_full_refresh_due(refresh_started_at):
+            tasks = self.provider.get_tasks()
+            self._save_timestamp(self._create_full_refresh_key(), refresh_started_at)
+        else:
+            updated_tasks = self._fetch_tasks_updated_since(watermark - self.watermark_overlap)
+            tasks = self._merge_tasks(cached, updated_tasks)
+
+        self._store_in_cache(tasks)
+        self._save_watermark(refresh_started_at)
+        return tasks
+
+    def _is_full_refresh_due(self, now: datetime) -> bool:
+        # delta queries only return tasks that still match, so tasks that left the query are dropped by full refreshes
+        if self.full_refresh_after is None:
+            return False
+        last_full_refresh = self._load_timestamp(self._create_full_refresh_key())
+        return last_full_refresh is None or now - last_full_refresh >= self.full_refresh_after
+
+    def _fetch_tasks_updated_since(self, since: datetime) -> list:
+        delta_range = self._create_delta_last_modified_range(since)
+        if delta_range is None:
+            return []
+        delta_query_builder = copy.deepcopy(self.query_builder)
+        delta_query_builder.with_last_modified_dates(delta_range)
+        delta_provider = self.provider_factory(delta_query_builder.build_query())
+        return delta_provider.get_tasks()
+
+    def _create_delta_last_modified_range(self, since: datetime) -> Optional[Tuple[Union[date, datetime], Optional[date]]]:
+        date_ranges = getattr(self.query_builder, 'filter_date_ranges', None) or {}
+        requested_start, requested_end = date_ranges.get('last_modified_dates', (None, None))
+        # builders filter last modified dates by day, so the user range is intersected on dates
+        if requested_end is not None and since.date() > requested_end:
+            return None
+        if requested_start is not None and requested_start > since.date():
+            return requested_start, requested_end
+        return since, requested_end
+
+    def _merge_tasks(self, cached_tasks: list, updated_tasks: list) -> list:
+        updated_by_id = {self.task_id_extractor(task): task for task in updated_tasks}
+        merged = []
+        for task in cached_tasks:
+            task_id = self.task_id_extractor(task)
+            merged.append(updated_by_id.pop(task_id, task))
+        merged.extend(updated_by_id.values())
+        return merged
+
+    def _create_watermark_key(self) -> str:
+        return CacheKeyBuilder.create_watermark_key(CacheKeyBuilder.create_query_only_key_partial(self.query),
+                                                    self._effective_fields_for_key())
+
+    def _create_full_refresh_key(self) -> str:
+        return CacheKeyBuilder.create_full_refresh_key(CacheKeyBuilder.create_query_only_key_partial(self.query),
+                                                       self._effective_fields_for_key())
+
+    def _load_watermark(self) -> Optional[datetime]:
+        return self._load_timestamp(self._create_watermark_key())
+
+    def _save_watermark(self, watermark: datetime):
+        self._save_timestamp(self._create_watermark_key(), watermark)
+
+    def _load_timestamp(self, key: str) -> Optional[datetime]:
+        raw = self.cache.get(key)  # type: ignore[union-attr]
         if raw is None:
-            return set()
-        result: Set[Tuple[str, ...]] = set()
+            return None
         try:
-            for fieldset in raw:
-                result.add(tuple(fieldset))
-        except Exception:
-            return set()
-        return result
-
-    def _save_cached_fieldsets(self, meta_key: str, fieldsets: Set[Tuple[str, ...]]):
-        serializable: List[List[str]] = [list(t) for t in fieldsets]
-        self.cache.set(meta_key, serializable)  # type: ignore[union-attr]
+            timestamp = datetime.fromisoformat(raw)
+        except (TypeError, ValueError):
+            return None
+        # timestamps saved as naive local time are converted to UTC
+        return timestamp.astimezone(timezone.utc)
+
+    def _save_timestamp(self, key: str, value: datetime):
+        self.cache.set(key, value.isoformat())  # type: ignore[union-attr]
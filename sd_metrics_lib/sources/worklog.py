@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Callable, Optional, TypeVar
+from datetime import datetime
+from typing import Dict, Callable, Iterable, List, Optional, Tuple, TypeVar
 
 from sd_metrics_lib.utils.time import Duration, TimeUnit
 
@@ -7,6 +8,8 @@ from sd_metrics_lib.utils.attributes import get_attribute_by_path
 
 T = TypeVar('T')
 
+WorkInterval = Tuple[datetime, datetime]
+
 
 class WorklogExtractor(ABC):
 
@@ -14,6 +17,9 @@ class WorklogExtractor(ABC):
     def get_work_time_per_user(self, task) -> Dict[str, 'Duration']:
         pass
 
+    def get_work_time_per_user_batch(self, tasks: Iterable) -> List[Dict[str, 'Duration']]:
+        return [self.get_work_time_per_user(task) for task in tasks]
+
 
 class TaskTotalSpentTimeExtractor(ABC):
 
@@ -21,6 +27,23 @@ class TaskTotalSpentTimeExtractor(ABC):
     def get_total_spent_time(self, task) -> 'Duration':
         pass
 
+    def get_total_spent_time_batch(self, tasks: Iterable) -> List['Duration']:
+        return [self.get_total_spent_time(task) for task in tasks]
+
+
+class WorkIntervalExtractor(ABC):
+
+    @abstractmethod
+    def get_work_intervals_per_user(self, task) -> Dict[str, List[WorkInterval]]:
+        pass
+
+
+class ResolutionDateExtractor(ABC):
+
+    @abstractmethod
+    def get_resolution_date(self, task) -> Optional[datetime]:
+        pass
+
 
 class ChainedWorklogExtractor(WorklogExtractor):
 
@@ -34,6 +57,23 @@ class ChainedWorklogExtractor(WorklogExtractor):
                 return work_time
         return {}
 
+    def get_work_time_per_user_batch(self, tasks: Iterable) -> List[Dict[str, Duration]]:
+        tasks = list(tasks)
+        work_times: List[Dict[str, Duration]] = [{} for _ in tasks]
+        pending_indexes = list(range(len(tasks)))
+        for worklog_extractor in self.worklog_extractor_list:
+            if not pending_indexes:
+                break
+            batch = worklog_extractor.get_work_time_per_user_batch([tasks[i] for i in pending_indexes])
+            still_pending_indexes = []
+            for task_index, work_time in zip(pending_indexes, batch):
+                if work_time is not None and len(work_time.keys()) != 0:
+                    work_times[task_index] = work_time
+                else:
+                    still_pending_indexes.append(task_index)
+            pending_indexes = still_pending_indexes
+        return work_times
+
 
 class FunctionWorklogExtractor(WorklogExtractor):
 
@@ -61,6 +101,29 @@ class FunctionTotalSpentTimeExtractor(TaskTotalSpentTimeExtractor):
             return Duration.zero()
 
 
+class FunctionWorkIntervalExtractor(WorkIntervalExtractor):
+
+    def __init__(self, func: Callable[[T], Optional[Dict[str, List[WorkInterval]]]]):
+        self.func = func
+
+    def get_work_intervals_per_user(self, task: T) -> Dict[str, List[WorkInterval]]:
+        result = self.func(task)
+        try:
+            return {str(k): list(v) for k, v in (result or {}).items()}
+        except Exception:
+            return {}
+
+
+class FunctionResolutionDateExtractor(ResolutionDateExtractor):
+
+    def __init__(self, func: Callable[[T], Optional[datetime]]):
+        self.func = func
+
+    def get_resolution_date(self, task: T) -> Optional[datetime]:
+        result = self.func(task)
+        return result if isinstance(result, datetime) else None
+
+
 class AttributePathWorklogExtractor(WorklogExtractor):
 
     def __init__(self, attr_path: str):
@@ -1,5 +1,16 @@
 import base64
-from typing import Protocol, runtime_checkable, Any, Iterable, List, Tuple, Optional
+import bisect
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Protocol, runtime_checkable, Any, Iterable, List, Tuple, Optional, Dict, Sequence
+
+from sd_metrics_lib.utils.instrumentation import CacheMetrics, CACHE_EVICTIONS, CACHE_GET_SECONDS, \
+    CACHE_SERIALIZATION_SECONDS, CACHE_SET_SECONDS, CACHE_STORED_BYTES
+from sd_metrics_lib.utils.query import canonicalize_query
 
 
 @runtime_checkable
@@ -30,10 +41,123 @@ class DictToCacheProtocolAdapter(CacheProtocol):
         self._dict[key] = value
 
 
+class InstrumentedCache(CacheProtocol):
+    def __init__(self, cache: CacheProtocol, metrics: CacheMetrics) -> None:
+        self.cache = cache
+        self.metrics = metrics
+
+    def get(self, key: str) -> Any:
+        with self.metrics.time(CACHE_GET_SECONDS):
+            return self.cache.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        with self.metrics.time(CACHE_SET_SECONDS):
+            self.cache.set(key, value)
+
+
+class SqliteCache(CacheProtocol):
+
+    def __init__(self, path: str,
+                 max_size_bytes: Optional[int] = 512 * 1024 * 1024,
+                 compression_level: int = 6,
+                 metrics: Optional[CacheMetrics] = None) -> None:
+        self.path = path
+        self.max_size_bytes = max_size_bytes
+        self.compression_level = compression_level
+        self.metrics = metrics
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS cache_entries ("
+                                     "key TEXT PRIMARY KEY, "
+                                     "value BLOB NOT NULL, "
+                                     "size INTEGER NOT NULL, "
+                                     "last_access REAL NOT NULL)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS cache_entries_last_access "
+                                     "ON cache_entries (last_access)")
+            # running total keeps writes from summing the whole table
+            self._size_in_bytes = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM cache_entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._connection.execute("UPDATE cache_entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        return self._deserialize(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        if self.metrics is not None:
+            with self.metrics.time(CACHE_SERIALIZATION_SECONDS):
+                payload = self._serialize(value)
+            self.metrics.increment(CACHE_STORED_BYTES, len(payload))
+        else:
+            payload = self._serialize(value)
+        with self._lock:
+            replaced_size = self._find_entry_size(key)
+            self._connection.execute("INSERT OR REPLACE INTO cache_entries (key, value, size, last_access) "
+                                     "VALUES (?, ?, ?, ?)",
+                                     (key, payload, len(payload), time.time()))
+            self._size_in_bytes += len(payload) - replaced_size
+            self._evict_least_recently_used()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            deleted_size = self._find_entry_size(key)
+            self._connection.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            self._size_in_bytes -= deleted_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM cache_entries")
+            self._size_in_bytes = 0
+
+    def size_in_bytes(self) -> int:
+        with self._lock:
+            return self._size_in_bytes
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _evict_least_recently_used(self):
+        if self.max_size_bytes is None:
+            return
+        overflow = self._size_in_bytes - self.max_size_bytes
+        if overflow <= 0:
+            return
+        evicted_keys = []
+        for key, size in self._connection.execute("SELECT key, size FROM cache_entries ORDER BY last_access ASC"):
+            if overflow <= 0:
+                break
+            evicted_keys.append((key,))
+            overflow -= size
+            self._size_in_bytes -= size
+        self._connection.executemany("DELETE FROM cache_entries WHERE key = ?", evicted_keys)
+        if self.metrics is not None and evicted_keys:
+            self.metrics.increment(CACHE_EVICTIONS, len(evicted_keys))
+
+    def _find_entry_size(self, key: str) -> int:
+        row = self._connection.execute("SELECT size FROM cache_entries WHERE key = ?", (key,)).fetchone()
+        return 0 if row is None else row[0]
+
+    def _serialize(self, value: Any) -> bytes:
+        return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), self.compression_level)
+
+    @staticmethod
+    def _deserialize(payload: bytes) -> Any:
+        return pickle.loads(zlib.decompress(payload))
+
+
 class CacheKeyBuilder:
     DATA_PREFIX = "data||"
     META_PREFIX = "meta||"
     CUSTOM_PREFIX = "custom||"
+    ITEM_PREFIX = "item||"
+    KEY_VERSION = "v2"
+    KEY_DIGEST_SIZE = 16
 
     @staticmethod
     def normalize_fields(fields: Optional[Iterable[str]]) -> List[str]:
@@ -41,23 +165,92 @@ class CacheKeyBuilder:
             return []
         return sorted(set(fields))
 
+    @staticmethod
+    def canonicalize_query(query: str) -> str:
+        return canonicalize_query(query)
+
+    @staticmethod
+    def create_digest(value: str) -> str:
+        return hashlib.blake2b(value.encode("utf-8"), digest_size=CacheKeyBuilder.KEY_DIGEST_SIZE).hexdigest()
+
     @staticmethod
     def create_query_only_key_partial(query: Optional[str]) -> str:
         if query is None:
-            return "none_query||"
-        return base64.b64encode(query.encode("ascii")).decode("ascii") + "||"
+            return f"{CacheKeyBuilder.KEY_VERSION}||none_query||"
+        query_digest = CacheKeyBuilder.create_digest(CacheKeyBuilder.canonicalize_query(query))
+        return f"{CacheKeyBuilder.KEY_VERSION}||{query_digest}||"
 
     @staticmethod
     def create_full_data_key(query_only_key_partial: str, fields: Optional[Iterable[str]]) -> str:
         if not fields:
             return f"{CacheKeyBuilder.DATA_PREFIX}{query_only_key_partial}"
         normalized = CacheKeyBuilder.normalize_fields(fields)
-        return f"{CacheKeyBuilder.DATA_PREFIX}{query_only_key_partial}" + "_".join(normalized)
+        return f"{CacheKeyBuilder.DATA_PREFIX}{query_only_key_partial}" + CacheKeyBuilder.create_digest(
+            "\n".join(normalized))
 
     @staticmethod
     def create_meta_data_key(query_only_key_partial: str) -> str:
         return f"{CacheKeyBuilder.META_PREFIX}{query_only_key_partial}fieldsets"
 
+    @staticmethod
+    def create_watermark_key(query_only_key_partial: str, fields: Optional[Iterable[str]]) -> str:
+        normalized = CacheKeyBuilder.normalize_fields(fields)
+        return f"{CacheKeyBuilder.META_PREFIX}{query_only_key_partial}watermark||" + CacheKeyBuilder.create_digest(
+            "\n".join(normalized))
+
+    @staticmethod
+    def create_full_refresh_key(query_only_key_partial: str, fields: Optional[Iterable[str]]) -> str:
+        normalized = CacheKeyBuilder.normalize_fields(fields)
+        return f"{CacheKeyBuilder.META_PREFIX}{query_only_key_partial}full_refresh||" + CacheKeyBuilder.create_digest(
+            "\n".join(normalized))
+
+    @staticmethod
+    def create_fetched_at_key(query_only_key_partial: str, fields: Optional[Iterable[str]]) -> str:
+        normalized = CacheKeyBuilder.normalize_fields(fields)
+        return f"{CacheKeyBuilder.META_PREFIX}{query_only_key_partial}fetched_at||" + CacheKeyBuilder.create_digest(
+            "\n".join(normalized))
+
+    @staticmethod
+    def create_key_lookup_key(query_only_key_partial: str) -> str:
+        return f"{CacheKeyBuilder.META_PREFIX}{query_only_key_partial}lookup"
+
+    @staticmethod
+    def create_provider_namespace(provider: object) -> str:
+        if isinstance(provider, type):
+            return provider.__name__
+        namespace = getattr(provider, 'cache_namespace', None)
+        if not namespace:
+            return provider.__class__.__name__
+        return f"{provider.__class__.__name__}||{CacheKeyBuilder.create_digest(str(namespace))}"
+
+    @staticmethod
+    def create_descriptor_registry_key(provider: object) -> str:
+        provider_ns = CacheKeyBuilder.create_provider_namespace(provider)
+        return f"{CacheKeyBuilder.META_PREFIX}{CacheKeyBuilder.KEY_VERSION}||descriptors||{provider_ns}"
+
+    @staticmethod
+    def create_item_key(provider: object, fields: Optional[Iterable[str]], item_id: Any, version: Any) -> str:
+        provider_ns = CacheKeyBuilder.create_provider_namespace(provider)
+        fields_digest = CacheKeyBuilder.create_digest("\n".join(CacheKeyBuilder.normalize_fields(fields)))
+        return (f"{CacheKeyBuilder.ITEM_PREFIX}{CacheKeyBuilder.KEY_VERSION}||{provider_ns}||{fields_digest}||"
+                f"{item_id}||{version}")
+
+    @staticmethod
+    def create_legacy_query_only_key_partial(query: Optional[str]) -> Optional[str]:
+        if query is None:
+            return "none_query||"
+        try:
+            return base64.b64encode(query.encode("ascii")).decode("ascii") + "||"
+        except UnicodeEncodeError:
+            return None
+
+    @staticmethod
+    def create_legacy_full_data_key(legacy_query_only_key_partial: str, fields: Optional[Iterable[str]]) -> str:
+        if not fields:
+            return f"{CacheKeyBuilder.DATA_PREFIX}{legacy_query_only_key_partial}"
+        normalized = CacheKeyBuilder.normalize_fields(fields)
+        return f"{CacheKeyBuilder.DATA_PREFIX}{legacy_query_only_key_partial}" + "_".join(normalized)
+
     @staticmethod
     def create_provider_custom_key(provider_cls: object, parts: Optional[Iterable[str]]) -> str:
         try:
@@ -78,7 +271,80 @@ class SupersetResolver:
     def find_superset_fieldset(requested_fields: Iterable[str], available_fieldsets: Iterable[Tuple[str, ...]]) -> \
             Optional[Tuple[str, ...]]:
         requested_set = set(requested_fields)
+        smallest_fieldset = None
         for fieldset in available_fieldsets:
-            if requested_set.issubset(fieldset):
-                return fieldset
+            if requested_set.issubset(fieldset) and (smallest_fieldset is None
+                                                     or len(fieldset) < len(smallest_fieldset)):
+                smallest_fieldset = fieldset
+        return smallest_fieldset
+
+
+class FieldsetIndex:
+
+    def __init__(self) -> None:
+        self._field_bits: Dict[str, int] = {}
+        self._masks: Dict[int, Tuple[str, ...]] = {}
+        self._masks_by_size: List[Tuple[int, int]] = []
+        self._last_synced_fieldset: Optional[Tuple[str, ...]] = None
+        self.synced_count = 0
+
+    def __len__(self) -> int:
+        return len(self._masks)
+
+    def add(self, fieldset: Iterable[str]) -> bool:
+        fieldset_tuple = tuple(fieldset)
+        mask = 0
+        for field_name in fieldset_tuple:
+            bit = self._field_bits.get(field_name)
+            if bit is None:
+                bit = 1 << len(self._field_bits)
+                self._field_bits[field_name] = bit
+            mask |= bit
+        if mask in self._masks:
+            return False
+        self._masks[mask] = fieldset_tuple
+        bisect.insort(self._masks_by_size, (mask.bit_count(), mask))
+        return True
+
+    def contains(self, fieldset: Iterable[str]) -> bool:
+        mask = self._to_mask(fieldset)
+        return mask is not None and mask in self._masks
+
+    def sync(self, raw_fieldsets: Optional[Sequence[Iterable[str]]]):
+        raw_fieldsets = raw_fieldsets or []
+        # stored fieldset lists are append-only, anything else means the entry was rewritten
+        if len(raw_fieldsets) < self.synced_count or (
+                self.synced_count and tuple(raw_fieldsets[self.synced_count - 1]) != self._last_synced_fieldset):
+            self.clear()
+        if len(raw_fieldsets) == self.synced_count:
+            return
+        for fieldset in raw_fieldsets[self.synced_count:]:
+            self.add(fieldset)
+        self.synced_count = len(raw_fieldsets)
+        self._last_synced_fieldset = tuple(raw_fieldsets[-1])
+
+    def clear(self):
+        self._field_bits.clear()
+        self._masks.clear()
+        self._masks_by_size.clear()
+        self._last_synced_fieldset = None
+        self.synced_count = 0
+
+    def find_smallest_superset(self, requested_fields: Iterable[str]) -> Optional[Tuple[str, ...]]:
+        requested_mask = self._to_mask(requested_fields)
+        if requested_mask is None:
+            return None
+        start = bisect.bisect_left(self._masks_by_size, (requested_mask.bit_count(), 0))
+        for _, mask in self._masks_by_size[start:]:
+            if mask & requested_mask == requested_mask:
+                return self._masks[mask]
         return None
+
+    def _to_mask(self, fields: Iterable[str]) -> Optional[int]:
+        mask = 0
+        for field_name in fields:
+            bit = self._field_bits.get(field_name)
+            if bit is None:
+                return None
+            mask |= bit
+        return mask
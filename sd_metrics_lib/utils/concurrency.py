@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _InFlightCall:
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.exception: Optional[BaseException] = None
+
+
+class SingleFlight:
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _InFlightCall] = {}
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        call, is_leader = self._join_or_start(key)
+        if is_leader:
+            self._run(key, call, func)
+        else:
+            call.done.wait()
+        if call.exception is not None:
+            raise call.exception
+        return call.result
+
+    def submit(self, key: Hashable, func: Callable[[], Any], executor: Optional[Executor] = None) -> bool:
+        call, is_leader = self._join_or_start(key)
+        if not is_leader:
+            return False
+        if executor is not None:
+            executor.submit(self._run, key, call, func)
+        else:
+            threading.Thread(target=self._run, args=(key, call, func), daemon=True,
+                             name="sd-metrics-single-flight").start()
+        return True
+
+    def is_in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def _join_or_start(self, key: Hashable) -> Tuple[_InFlightCall, bool]:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = _InFlightCall()
+            self._calls[key] = call
+            return call, True
+
+    def _run(self, key: Hashable, call: _InFlightCall, func: Callable[[], Any]):
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.exception = e
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+
+class AsyncSingleFlight:
+
+    def __init__(self) -> None:
+        self._tasks: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task_key = (id(asyncio.get_running_loop()), key)
+        task = self._tasks.get(task_key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._tasks[task_key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(task_key, None))
+        # shield keeps the shared fetch running when a single waiter is cancelled
+        return await asyncio.shield(task)
+
+    def is_in_flight(self, key: Hashable) -> bool:
+        try:
+            loop_id = id(asyncio.get_running_loop())
+        except RuntimeError:
+            return False
+        return (loop_id, key) in self._tasks
+
+
+DEFAULT_SINGLE_FLIGHT = SingleFlight()
+DEFAULT_ASYNC_SINGLE_FLIGHT = AsyncSingleFlight()
@@ -55,3 +55,24 @@ class TimeRangeGenerator:
         elif self.time_unit == TimeUnit.MONTH:
             last_day_of_month = calendar.monthrange(self.period_initial_date.year, self.period_initial_date.month)[1]
             return self.period_initial_date.replace(day=last_day_of_month)
+
+
+def resolve_period_start(value: datetime.datetime, time_unit: TimeUnit) -> datetime.datetime:
+    if time_unit == TimeUnit.HOUR:
+        return value.replace(minute=0, second=0, microsecond=0)
+    day_start = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if time_unit == TimeUnit.WEEK:
+        return day_start - datetime.timedelta(days=day_start.weekday())
+    elif time_unit == TimeUnit.MONTH:
+        return day_start.replace(day=1)
+    return day_start
+
+
+def shift_period_start(period_start: datetime.datetime, time_unit: TimeUnit, amount: int) -> datetime.datetime:
+    if time_unit == TimeUnit.HOUR:
+        return period_start + relativedelta(hours=amount)
+    elif time_unit == TimeUnit.WEEK:
+        return period_start + relativedelta(weeks=amount)
+    elif time_unit == TimeUnit.MONTH:
+        return period_start + relativedelta(months=amount)
+    return period_start + relativedelta(days=amount)
@@ -0,0 +1,195 @@
+import bisect
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+CACHE_EXACT_HITS = "sd_metrics_cache_exact_hits_total"
+CACHE_SUPERSET_HITS = "sd_metrics_cache_superset_hits_total"
+CACHE_SUBSUMPTION_HITS = "sd_metrics_cache_subsumption_hits_total"
+CACHE_MISSES = "sd_metrics_cache_misses_total"
+CACHE_STORES = "sd_metrics_cache_stores_total"
+CACHE_EVICTIONS = "sd_metrics_cache_evictions_total"
+CACHE_STORED_BYTES = "sd_metrics_cache_stored_bytes_total"
+CACHE_GET_SECONDS = "sd_metrics_cache_get_seconds"
+CACHE_SET_SECONDS = "sd_metrics_cache_set_seconds"
+CACHE_SERIALIZATION_SECONDS = "sd_metrics_cache_serialization_seconds"
+PROVIDER_FETCH_SECONDS = "sd_metrics_provider_fetch_seconds"
+
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                           10.0, 30.0, 60.0)
+
+Labels = Optional[Dict[str, str]]
+_SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class CacheMetrics(ABC):
+
+    @abstractmethod
+    def increment(self, name: str, amount: float = 1, labels: Labels = None) -> None:
+        pass
+
+    @abstractmethod
+    def observe(self, name: str, value: float, labels: Labels = None) -> None:
+        pass
+
+    @contextmanager
+    def time(self, name: str, labels: Labels = None) -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started_at, labels)
+
+
+class HistogramSnapshot:
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.bucket_counts: List[int] = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.bucket_counts):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> List[int]:
+        cumulative = []
+        running = 0
+        for bucket_count in self.bucket_counts:
+            running += bucket_count
+            cumulative.append(running)
+        return cumulative
+
+    def copy(self) -> 'HistogramSnapshot':
+        snapshot = HistogramSnapshot(self.buckets)
+        snapshot.bucket_counts = list(self.bucket_counts)
+        snapshot.count = self.count
+        snapshot.sum = self.sum
+        return snapshot
+
+
+class InMemoryCacheMetrics(CacheMetrics):
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters: Dict[_SeriesKey, float] = {}
+        self._histograms: Dict[_SeriesKey, HistogramSnapshot] = {}
+
+    def increment(self, name: str, amount: float = 1, labels: Labels = None) -> None:
+        series_key = self._create_series_key(name, labels)
+        with self._lock:
+            self._counters[series_key] = self._counters.get(series_key, 0) + amount
+
+    def observe(self, name: str, value: float, labels: Labels = None) -> None:
+        series_key = self._create_series_key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(series_key)
+            if histogram is None:
+                histogram = HistogramSnapshot(self.buckets)
+                self._histograms[series_key] = histogram
+            histogram.observe(value)
+
+    def get_counter(self, name: str, labels: Labels = None) -> float:
+        with self._lock:
+            return self._counters.get(self._create_series_key(name, labels), 0)
+
+    def get_histogram(self, name: str, labels: Labels = None) -> Optional[HistogramSnapshot]:
+        with self._lock:
+            histogram = self._histograms.get(self._create_series_key(name, labels))
+            return histogram.copy() if histogram is not None else None
+
+    def counters(self) -> Dict[_SeriesKey, float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def histograms(self) -> Dict[_SeriesKey, HistogramSnapshot]:
+        with self._lock:
+            return {series_key: histogram.copy() for series_key, histogram in self._histograms.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    @staticmethod
+    def _create_series_key(name: str, labels: Labels) -> _SeriesKey:
+        return name, tuple(sorted(labels.items())) if labels else ()
+
+
+class PrometheusTextExporter:
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, metrics: InMemoryCacheMetrics) -> None:
+        self.metrics = metrics
+
+    def render(self) -> str:
+        lines: List[str] = []
+        counters = self.metrics.counters()
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {name} counter")
+            for (series_name, labels), value in sorted(counters.items()):
+                if series_name == name:
+                    lines.append(f"{name}{self._format_labels(labels)} {self._format_value(value)}")
+
+        histograms = self.metrics.histograms()
+        for name in sorted({name for name, _ in histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (series_name, labels), histogram in sorted(histograms.items(), key=lambda item: item[0]):
+                if series_name != name:
+                    continue
+                for bucket, cumulative in zip(histogram.buckets, histogram.cumulative_counts()):
+                    bucket_labels = labels + (('le', self._format_value(bucket)),)
+                    lines.append(f"{name}_bucket{self._format_labels(bucket_labels)} {cumulative}")
+                lines.append(f"{name}_bucket{self._format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                lines.append(f"{name}_sum{self._format_labels(labels)} {self._format_value(histogram.sum)}")
+                lines.append(f"{name}_count{self._format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, host: str = "127.0.0.1", port: int = 9464) -> ThreadingHTTPServer:
+        exporter = self
+
+        class MetricsRequestHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", exporter.CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True, name="sd-metrics-exporter").start()
+        return server
+
+    @staticmethod
+    def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+        if not labels:
+            return ""
+        formatted = ",".join(f'{key}="{PrometheusTextExporter._escape(value)}"' for key, value in labels)
+        return "{" + formatted + "}"
+
+    @staticmethod
+    def _escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        if float(value).is_integer():
+            return str(int(value))
+        return repr(float(value))
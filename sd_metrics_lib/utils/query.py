@@ -0,0 +1,195 @@
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+QUERY_KEYWORDS = frozenset([
+    'AND', 'OR', 'NOT', 'IN', 'IS', 'EMPTY', 'NULL', 'WAS', 'EVER', 'CHANGED', 'ON', 'AFTER', 'BEFORE', 'DURING',
+    'TO', 'FROM', 'BY', 'ORDER', 'ASC', 'DESC', 'SELECT', 'WHERE', 'ASOF', 'MODE', 'CONTAINS', 'WORDS', 'UNDER',
+])
+
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<string>'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.)*")
+  | (?P<bracket>\[[^\]]*\])
+  | (?P<operator>!=|<>|>=|<=|!~|=|<|>|~)
+  | (?P<open>\()
+  | (?P<close>\))
+  | (?P<comma>,)
+  | (?P<word>[^\s'"\[\]()<>=!~,]+)
+  | (?P<other>\S)
+""", re.VERBOSE)
+
+_VALUE_KINDS = ('string', 'bracket', 'word')
+
+
+class _Token(NamedTuple):
+    kind: str
+    text: str
+    glued: bool
+
+    def is_keyword(self, keyword: Optional[str] = None) -> bool:
+        if self.kind != 'word' or self.text not in QUERY_KEYWORDS:
+            return False
+        return keyword is None or self.text == keyword
+
+
+def canonicalize_query(query: Optional[str]) -> Optional[str]:
+    if query is None:
+        return None
+    tokens = _tokenize(query)
+    head, body, tail = _split_query_sections(tokens)
+    canonical_tokens = head + _canonicalize_expression(_sort_in_lists(body)) + tail
+    return _render(canonical_tokens)
+
+
+def are_queries_equivalent(first_query: Optional[str], second_query: Optional[str]) -> bool:
+    return canonicalize_query(first_query) == canonicalize_query(second_query)
+
+
+def _tokenize(query: str) -> List[_Token]:
+    tokens = []
+    previous_end = 0
+    for match in _TOKEN_PATTERN.finditer(query):
+        kind = match.lastgroup
+        text = match.group()
+        if kind == 'word' and text.upper() in QUERY_KEYWORDS:
+            text = text.upper()
+        tokens.append(_Token(kind, text, bool(tokens) and match.start() == previous_end))
+        previous_end = match.end()
+    return tokens
+
+
+def _split_query_sections(tokens: List[_Token]) -> Tuple[List[_Token], List[_Token], List[_Token]]:
+    body_start = 0
+    if tokens and tokens[0].is_keyword('SELECT'):
+        body_start = len(tokens)
+        for index, depth in _iter_top_level(tokens):
+            if tokens[index].is_keyword('WHERE'):
+                body_start = index + 1
+                break
+
+    tail_start = len(tokens)
+    for index, depth in _iter_top_level(tokens):
+        if index < body_start:
+            continue
+        token = tokens[index]
+        is_order_by = token.is_keyword('ORDER') and index + 1 < len(tokens) and tokens[index + 1].is_keyword('BY')
+        if is_order_by or token.is_keyword('ASOF'):
+            tail_start = index
+            break
+
+    body_start = min(body_start, tail_start)
+    return tokens[:body_start], tokens[body_start:tail_start], tokens[tail_start:]
+
+
+def _iter_top_level(tokens: List[_Token]):
+    depth = 0
+    for index, token in enumerate(tokens):
+        if token.kind == 'open':
+            depth += 1
+        elif token.kind == 'close':
+            depth = max(0, depth - 1)
+        elif depth == 0:
+            yield index, depth
+
+
+def _sort_in_lists(tokens: List[_Token]) -> List[_Token]:
+    result = []
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        result.append(token)
+        index += 1
+        if not token.is_keyword('IN') or index >= len(tokens) or tokens[index].kind != 'open':
+            continue
+        close_index = _find_matching_close(tokens, index)
+        if close_index is None:
+            continue
+        values = _extract_plain_values(tokens[index + 1:close_index])
+        if values is None:
+            continue
+        result.append(tokens[index])
+        for value_index, value in enumerate(sorted(set(values))):
+            if value_index:
+                result.append(_Token('comma', ',', True))
+            result.append(_Token(value[0], value[1], value_index == 0))
+        result.append(tokens[close_index])
+        index = close_index + 1
+    return result
+
+
+def _extract_plain_values(tokens: List[_Token]) -> Optional[List[Tuple[str, str]]]:
+    values = []
+    for position, token in enumerate(tokens):
+        if position % 2 == 1:
+            if token.kind != 'comma':
+                return None
+        elif token.kind not in _VALUE_KINDS or token.is_keyword():
+            return None
+        else:
+            values.append((token.kind, token.text))
+    if not values or len(tokens) % 2 == 0:
+        return None
+    return values
+
+
+def _find_matching_close(tokens: List[_Token], open_index: int) -> Optional[int]:
+    depth = 0
+    for index in range(open_index, len(tokens)):
+        if tokens[index].kind == 'open':
+            depth += 1
+        elif tokens[index].kind == 'close':
+            depth -= 1
+            if depth == 0:
+                return index
+    return None
+
+
+def _canonicalize_expression(tokens: List[_Token]) -> List[_Token]:
+    if not tokens:
+        return tokens
+    if tokens[0].kind == 'open' and _find_matching_close(tokens, 0) == len(tokens) - 1:
+        return [tokens[0]] + _canonicalize_expression(tokens[1:-1]) + [tokens[-1]]
+
+    top_level_indexes = [index for index, _ in _iter_top_level(tokens)]
+    if any(tokens[index].is_keyword('OR') for index in top_level_indexes):
+        return tokens
+    and_indexes = [index for index in top_level_indexes if tokens[index].is_keyword('AND')]
+    if not and_indexes:
+        return tokens
+
+    clauses = []
+    clause_start = 0
+    for and_index in and_indexes + [len(tokens)]:
+        clause = tokens[clause_start:and_index]
+        if clause:
+            clause = [clause[0]._replace(glued=False)] + clause[1:]
+            clauses.append(_canonicalize_expression(clause))
+        clause_start = and_index + 1
+    clauses.sort(key=_render)
+
+    and_token = tokens[and_indexes[0]]
+    result = []
+    for clause in clauses:
+        if result:
+            result.append(and_token)
+        result.extend(clause)
+    return result
+
+
+def _render(tokens: List[_Token]) -> str:
+    parts = []
+    previous = None
+    for token in tokens:
+        if previous is None:
+            separator = ''
+        elif token.kind in ('close', 'comma') or previous.kind == 'open':
+            separator = ''
+        elif token.kind == 'operator' or previous.kind in ('operator', 'comma'):
+            separator = ' '
+        elif token.kind == 'open':
+            separator = ' ' if previous.is_keyword() or not token.glued else ''
+        else:
+            separator = '' if token.glued else ' '
+        parts.append(separator)
+        parts.append(token.text)
+        previous = token
+    return ''.join(parts)
@@ -1,8 +1,14 @@
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 
 from enum import Enum, auto
-from typing import Iterable, ClassVar, SupportsFloat
+from typing import Iterable, ClassVar, SupportsFloat, Sequence, Dict, Hashable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class TimeUnit(Enum):
@@ -21,6 +27,50 @@ WORKING_WEEKS_IN_MONTH = 4
 # Python's date.weekday(): Monday=0
 WEEKDAY_FRIDAY = 4
 
+ISO_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S.%f%z'
+ISO_TIMESTAMP_WITHOUT_FRACTION_FORMAT = '%Y-%m-%dT%H:%M:%S%z'
+TIMESTAMP_PARSE_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=TIMESTAMP_PARSE_CACHE_SIZE)
+def parse_timestamp(value: str, time_format: str | None = None) -> datetime:
+    if time_format is None or time_format in (ISO_TIMESTAMP_FORMAT, ISO_TIMESTAMP_WITHOUT_FRACTION_FORMAT):
+        try:
+            return datetime.fromisoformat(_normalize_iso_timestamp(value))
+        except ValueError:
+            pass
+        try:
+            return datetime.strptime(value, ISO_TIMESTAMP_FORMAT)
+        except ValueError:
+            return datetime.strptime(value, ISO_TIMESTAMP_WITHOUT_FRACTION_FORMAT)
+    return datetime.strptime(value, time_format)
+
+
+def parse_timestamp_with_fraction_fallback(value: str, time_format: str | None = None) -> datetime:
+    try:
+        return parse_timestamp(value, time_format)
+    except ValueError:
+        # Sometimes APIs (e.g. Azure) return time without milliseconds
+        return parse_timestamp(value, ISO_TIMESTAMP_WITHOUT_FRACTION_FORMAT)
+
+
+def _normalize_iso_timestamp(value: str) -> str:
+    # fromisoformat() before Python 3.11 accepts only 3 or 6 fraction digits and '+HH:MM' offsets
+    if value.endswith('Z'):
+        body, offset = value[:-1], '+00:00'
+    elif len(value) > 5 and value[-5] in '+-' and value[-4:].isdigit():
+        body, offset = value[:-5], value[-5:-2] + ':' + value[-2:]
+    elif len(value) > 6 and value[-6] in '+-' and value[-3] == ':':
+        body, offset = value[:-6], value[-6:]
+    else:
+        body, offset = value, ''
+
+    fraction_start = body.rfind('.')
+    if fraction_start != -1 and fraction_start > body.find('T'):
+        fraction = body[fraction_start + 1:]
+        body = body[:fraction_start + 1] + (fraction + '000000')[:6]
+    return body + offset
+
 
 @dataclass(frozen=True, slots=True)
 class TimePolicy:
@@ -252,3 +302,144 @@ class Duration:
             for duration in durations:
                 total += policy_used.convert(duration.time_delta, duration.time_unit, unit)
         return Duration.of(total, unit)
+
+
+class DurationArray:
+    BASE_UNIT: ClassVar[TimeUnit] = TimeUnit.SECOND
+
+    __slots__ = ('_seconds',)
+
+    def __init__(self, seconds: Iterable[SupportsFloat] = ()) -> None:
+        self._ensure_numpy_available()
+        self._seconds = np.asarray(seconds, dtype=np.float64).reshape(-1)
+
+    @classmethod
+    def of(cls, values: Iterable[SupportsFloat], time_unit: TimeUnit,
+           time_policy: TimePolicy | None = None) -> "DurationArray":
+        cls._ensure_numpy_available()
+        policy = time_policy or TimePolicy.ALL_HOURS
+        factor = policy.convert(1.0, time_unit, cls.BASE_UNIT)
+        return cls(np.asarray(values, dtype=np.float64) * factor)
+
+    @staticmethod
+    def _ensure_numpy_available():
+        if np is None:
+            raise ImportError("DurationArray requires numpy. Install it with 'pip install sd-metrics-lib[numpy]'.")
+
+    @classmethod
+    def from_durations(cls, durations: Iterable[Duration],
+                       time_policy: TimePolicy | None = None) -> "DurationArray":
+        return cls([duration.to_seconds(time_policy) for duration in durations])
+
+    @property
+    def seconds(self):
+        view = self._seconds.view()
+        view.flags.writeable = False
+        return view
+
+    def __len__(self) -> int:
+        return len(self._seconds)
+
+    def __getitem__(self, index) -> "Duration | DurationArray":
+        selected = self._seconds[index]
+        if np.ndim(selected) == 0:
+            return Duration.of(selected, self.BASE_UNIT)
+        return DurationArray(selected)
+
+    def to_durations(self, time_unit: TimeUnit = TimeUnit.SECOND,
+                     time_policy: TimePolicy | None = None) -> list[Duration]:
+        return [Duration.of(value, time_unit) for value in self.convert(time_unit, time_policy).tolist()]
+
+    def convert(self, time_unit: TimeUnit, time_policy: TimePolicy | None = None):
+        policy = time_policy or TimePolicy.ALL_HOURS
+        return self._seconds * policy.convert(1.0, self.BASE_UNIT, time_unit)
+
+    def sum(self, time_unit: TimeUnit = TimeUnit.SECOND, time_policy: TimePolicy | None = None) -> Duration:
+        policy = time_policy or TimePolicy.ALL_HOURS
+        total_seconds = float(self._seconds.sum())
+        return Duration.of(policy.convert(total_seconds, self.BASE_UNIT, time_unit), time_unit)
+
+    def group_sum(self, keys: Sequence[Hashable], time_unit: TimeUnit = TimeUnit.SECOND,
+                  time_policy: TimePolicy | None = None) -> Dict[Hashable, Duration]:
+        if len(keys) != len(self._seconds):
+            raise ValueError("keys must have the same length as DurationArray")
+        if not len(keys):
+            return {}
+        unique_keys: Dict[Hashable, int] = {}
+        key_indexes = np.fromiter((unique_keys.setdefault(key, len(unique_keys)) for key in keys),
+                                  dtype=np.intp, count=len(keys))
+        totals = np.bincount(key_indexes, weights=self._seconds, minlength=len(unique_keys))
+        policy = time_policy or TimePolicy.ALL_HOURS
+        factor = policy.convert(1.0, self.BASE_UNIT, time_unit)
+        return {key: Duration.of(totals[index] * factor, time_unit) for key, index in unique_keys.items()}
+
+    def _coerce_seconds(self, other: object):
+        if isinstance(other, DurationArray):
+            return other._seconds
+        if isinstance(other, Duration):
+            return other.to_seconds(TimePolicy.ALL_HOURS)
+        if isinstance(other, (int, float)):
+            return float(other)
+        return None
+
+    def __add__(self, other: object) -> "DurationArray":
+        other_seconds = self._coerce_seconds(other)
+        if other_seconds is None:
+            return NotImplemented
+        return DurationArray(self._seconds + other_seconds)
+
+    def __radd__(self, other: object) -> "DurationArray":
+        return self.__add__(other)
+
+    def __sub__(self, other: object) -> "DurationArray":
+        other_seconds = self._coerce_seconds(other)
+        if other_seconds is None:
+            return NotImplemented
+        return DurationArray(self._seconds - other_seconds)
+
+    def __mul__(self, multiplier: SupportsFloat) -> "DurationArray":
+        return DurationArray(self._seconds * float(multiplier))
+
+    def __rmul__(self, multiplier: SupportsFloat) -> "DurationArray":
+        return self.__mul__(multiplier)
+
+    def __truediv__(self, divider: SupportsFloat) -> "DurationArray":
+        return DurationArray(self._seconds / float(divider))
+
+    def __eq__(self, other: object):
+        other_seconds = self._coerce_seconds(other)
+        if other_seconds is None:
+            return NotImplemented
+        return self._seconds == other_seconds
+
+    def __ne__(self, other: object):
+        other_seconds = self._coerce_seconds(other)
+        if other_seconds is None:
+            return NotImplemented
+        return self._seconds != other_seconds
+
+    def __lt__(self, other: object):
+        other_seconds = self._coerce_seconds(other)
+        if other_seconds is None:
+            return NotImplemented
+        return self._seconds < other_seconds
+
+    def __le__(self, other: object):
+        other_seconds = self._coerce_seconds(other)
+        if other_seconds is None:
+            return NotImplemented
+        return self._seconds <= other_seconds
+
+    def __gt__(self, other: object):
+        other_seconds = self._coerce_seconds(other)
+        if other_seconds is None:
+            return NotImplemented
+        return self._seconds > other_seconds
+
+    def __ge__(self, other: object):
+        other_seconds = self._coerce_seconds(other)
+        if other_seconds is None:
+            return NotImplemented
+        return self._seconds >= other_seconds
+
+    __hash__ = None
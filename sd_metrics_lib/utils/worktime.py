@@ -1,7 +1,14 @@
+import bisect
 import datetime
 from abc import ABC, abstractmethod
+from typing import Iterable, Sequence
 
-from sd_metrics_lib.utils.time import Duration, TimeUnit, TimePolicy
+from sd_metrics_lib.utils.time import Duration, DurationArray, TimeUnit, TimePolicy
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class WorkTimeExtractor(ABC):
@@ -101,3 +108,151 @@ class BoundarySimpleWorkTimeExtractor(SimpleWorkTimeExtractor):
             new_end_time_period = self.end_time_boundary
 
         return super().extract_time_from_period(new_start_period, new_end_time_period, time_policy, result_unit)
+
+
+class BusinessCalendarWorkTimeExtractor(WorkTimeExtractor):
+    DEFAULT_WEEKEND_DAYS = (5, 6)
+
+    def __init__(self,
+                 calendar_start: datetime.date,
+                 calendar_end: datetime.date,
+                 holidays: Iterable[datetime.date] = (),
+                 weekend_days: Iterable[int] = DEFAULT_WEEKEND_DAYS) -> None:
+        self.calendar_start = self.__to_date(calendar_start)
+        self.calendar_end = self.__to_date(calendar_end)
+        if self.calendar_end < self.calendar_start:
+            raise ValueError("calendar_end must not be before calendar_start")
+        self.weekend_days = frozenset(weekend_days)
+        self.holidays = frozenset(self.__to_date(holiday) for holiday in holidays)
+
+        self._working_weekdays_prefix = [0] * 8
+        for weekday in range(7):
+            is_working_weekday = 0 if weekday in self.weekend_days else 1
+            self._working_weekdays_prefix[weekday + 1] = self._working_weekdays_prefix[weekday] + is_working_weekday
+        self._sorted_working_day_holidays = sorted(
+            holiday for holiday in self.holidays if holiday.weekday() not in self.weekend_days
+        )
+
+        self._calendar_start_ordinal = self.calendar_start.toordinal()
+        calendar_length = self.calendar_end.toordinal() - self._calendar_start_ordinal + 2
+        self._working_days_prefix = [0] * calendar_length
+        cumulative = self.__count_working_days_before_without_calendar(self.calendar_start)
+        for day_offset in range(calendar_length):
+            self._working_days_prefix[day_offset] = cumulative
+            day = self.calendar_start + datetime.timedelta(days=day_offset)
+            if self.is_working_day(day):
+                cumulative += 1
+        if np is not None:
+            self._working_days_prefix_array = np.asarray(self._working_days_prefix, dtype=np.int64)
+            self._working_weekdays_prefix_array = np.asarray(self._working_weekdays_prefix, dtype=np.int64)
+            self._working_day_holiday_ordinals = np.asarray(
+                [holiday.toordinal() for holiday in self._sorted_working_day_holidays], dtype=np.int64)
+
+    def is_working_day(self, day: datetime.date) -> bool:
+        day = self.__to_date(day)
+        return day.weekday() not in self.weekend_days and day not in self.holidays
+
+    def count_working_days(self, start_day: datetime.date, end_day: datetime.date) -> int:
+        start_day = self.__to_date(start_day)
+        end_day = self.__to_date(end_day)
+        if end_day < start_day:
+            return 0
+        return (self._count_working_days_before(end_day + datetime.timedelta(days=1))
+                - self._count_working_days_before(start_day))
+
+    def extract_time_from_period(self,
+                                 start_time_period: datetime.date | datetime.datetime,
+                                 end_time_period: datetime.date | datetime.datetime,
+                                 time_policy: TimePolicy = TimePolicy.BUSINESS_HOURS,
+                                 result_unit: TimeUnit = TimeUnit.SECOND) -> Duration | None:
+        if end_time_period <= start_time_period:
+            return None
+
+        calendar_elapsed_seconds = Duration.datetime_difference(start_time_period, end_time_period, TimeUnit.SECOND)
+
+        minimum_trackable_duration_seconds = Duration.of(0.25, TimeUnit.HOUR).convert(TimeUnit.SECOND)
+        if calendar_elapsed_seconds < minimum_trackable_duration_seconds:
+            return None
+
+        if time_policy == TimePolicy.ALL_HOURS:
+            return calendar_elapsed_seconds.convert(result_unit, TimePolicy.ALL_HOURS)
+
+        working_days_count = self.count_working_days(start_time_period, end_time_period)
+        if working_days_count == 0:
+            return None
+
+        multi_day_span_in_calendar_days = calendar_elapsed_seconds.convert(TimeUnit.DAY, TimePolicy.ALL_HOURS)
+        if multi_day_span_in_calendar_days.time_delta >= 1.0:
+            rounded_up_calendar_days = int(multi_day_span_in_calendar_days.time_delta) + 1
+            capped_working_days = min(working_days_count, rounded_up_calendar_days)
+            return Duration.of(capped_working_days, TimeUnit.DAY).convert(result_unit, time_policy)
+
+        one_business_day_seconds = Duration.of(1, TimeUnit.DAY).convert(TimeUnit.SECOND, time_policy)
+        if calendar_elapsed_seconds.time_delta < one_business_day_seconds.time_delta:
+            return calendar_elapsed_seconds.convert(result_unit, time_policy)
+        return one_business_day_seconds.convert(result_unit, time_policy)
+
+    def extract_time_from_periods(self,
+                                  start_time_periods: Sequence[datetime.date | datetime.datetime],
+                                  end_time_periods: Sequence[datetime.date | datetime.datetime],
+                                  time_policy: TimePolicy = TimePolicy.BUSINESS_HOURS) -> DurationArray:
+        if np is None:
+            raise ImportError("extract_time_from_periods requires numpy. "
+                              "Install it with 'pip install sd-metrics-lib[numpy]'.")
+        if len(start_time_periods) != len(end_time_periods):
+            raise ValueError("start_time_periods and end_time_periods must have the same length")
+
+        periods_count = len(start_time_periods)
+        elapsed_seconds = np.fromiter(
+            ((end_time_period - start_time_period).total_seconds()
+             for start_time_period, end_time_period in zip(start_time_periods, end_time_periods)),
+            dtype=np.float64, count=periods_count)
+        minimum_trackable_duration_seconds = Duration.of(0.25, TimeUnit.HOUR).to_seconds()
+        trackable = elapsed_seconds >= minimum_trackable_duration_seconds
+        if time_policy == TimePolicy.ALL_HOURS:
+            return DurationArray(np.where(trackable, elapsed_seconds, 0.0))
+
+        start_ordinals = np.fromiter((self.__to_date(value).toordinal() for value in start_time_periods),
+                                     dtype=np.int64, count=periods_count)
+        end_ordinals = np.fromiter((self.__to_date(value).toordinal() for value in end_time_periods),
+                                   dtype=np.int64, count=periods_count)
+        working_days_count = (self._count_working_days_before_ordinals(end_ordinals + 1)
+                              - self._count_working_days_before_ordinals(start_ordinals))
+
+        one_business_day_seconds = Duration.of(1, TimeUnit.DAY).convert(TimeUnit.SECOND, time_policy).time_delta
+        elapsed_calendar_days = elapsed_seconds / Duration.of(1, TimeUnit.DAY).to_seconds()
+        capped_working_days = np.minimum(working_days_count, np.floor(elapsed_calendar_days) + 1)
+        working_seconds = np.where(elapsed_calendar_days >= 1.0,
+                                   capped_working_days * one_business_day_seconds,
+                                   np.minimum(elapsed_seconds, one_business_day_seconds))
+        return DurationArray(np.where(trackable & (working_days_count > 0), working_seconds, 0.0))
+
+    def _count_working_days_before_ordinals(self, ordinals):
+        day_offsets = ordinals - self._calendar_start_ordinal
+        in_calendar = (day_offsets >= 0) & (day_offsets < len(self._working_days_prefix_array))
+        # Ordinal 1 (0001-01-01) is a Monday, so full weeks are counted from there
+        full_weeks, trailing_days = np.divmod(ordinals - 1, 7)
+        working_days = (full_weeks * self._working_weekdays_prefix_array[7]
+                        + self._working_weekdays_prefix_array[trailing_days]
+                        - np.searchsorted(self._working_day_holiday_ordinals, ordinals, side='left'))
+        return np.where(in_calendar, self._working_days_prefix_array[np.where(in_calendar, day_offsets, 0)],
+                        working_days)
+
+    def _count_working_days_before(self, day: datetime.date) -> int:
+        day_offset = day.toordinal() - self._calendar_start_ordinal
+        if 0 <= day_offset < len(self._working_days_prefix):
+            return self._working_days_prefix[day_offset]
+        return self.__count_working_days_before_without_calendar(day)
+
+    def __count_working_days_before_without_calendar(self, day: datetime.date) -> int:
+        # Ordinal 1 (0001-01-01) is a Monday, so full weeks are counted from there
+        days_since_epoch = day.toordinal() - 1
+        full_weeks, trailing_days = divmod(days_since_epoch, 7)
+        working_days = full_weeks * self._working_weekdays_prefix[7] + self._working_weekdays_prefix[trailing_days]
+        return working_days - bisect.bisect_left(self._sorted_working_day_holidays, day)
+
+    @staticmethod
+    def __to_date(value: datetime.date | datetime.datetime) -> datetime.date:
+        if isinstance(value, datetime.datetime):
+            return value.date()
+        return value
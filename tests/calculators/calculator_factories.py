@@ -0,0 +1,33 @@
+from sd_metrics_lib.calculators.velocity import UserVelocityCalculator, GeneralizedTeamVelocityCalculator
+from sd_metrics_lib.sources.story_points import FunctionStoryPointExtractor
+from sd_metrics_lib.sources.tasks import ProxyTaskProvider
+from sd_metrics_lib.sources.worklog import (WorklogExtractor, TaskTotalSpentTimeExtractor, FunctionWorklogExtractor,
+                                            FunctionTotalSpentTimeExtractor)
+
+
+def story_points(task):
+    if isinstance(task, dict):
+        return task['story_points']
+    return task.story_points
+
+
+def create_user_calculator(tasks, work_time_per_user, extraction_engine=None, **options):
+    worklog_extractor = work_time_per_user
+    if not isinstance(worklog_extractor, WorklogExtractor):
+        worklog_extractor = FunctionWorklogExtractor(work_time_per_user)
+    return UserVelocityCalculator(ProxyTaskProvider(tasks),
+                                  FunctionStoryPointExtractor(story_points),
+                                  worklog_extractor,
+                                  extraction_engine=extraction_engine,
+                                  **options)
+
+
+def create_team_calculator(tasks, total_spent_time, extraction_engine=None, **options):
+    time_extractor = total_spent_time
+    if not isinstance(time_extractor, TaskTotalSpentTimeExtractor):
+        time_extractor = FunctionTotalSpentTimeExtractor(total_spent_time)
+    return GeneralizedTeamVelocityCalculator(ProxyTaskProvider(tasks),
+                                             FunctionStoryPointExtractor(story_points),
+                                             time_extractor,
+                                             extraction_engine=extraction_engine,
+                                             **options)
@@ -0,0 +1,98 @@
+import unittest
+
+from sd_metrics_lib.calculators.execution import SerialExtractionEngine
+from sd_metrics_lib.calculators.velocity import UserVelocityCalculator, GeneralizedTeamVelocityCalculator
+from sd_metrics_lib.sources.story_points import FunctionStoryPointExtractor, StoryPointExtractor
+from sd_metrics_lib.sources.tasks import ProxyTaskProvider
+from sd_metrics_lib.sources.worklog import (
+    ChainedWorklogExtractor,
+    FunctionTotalSpentTimeExtractor,
+    FunctionWorklogExtractor,
+    WorklogExtractor
+)
+from sd_metrics_lib.utils.time import Duration, TimeUnit
+
+
+class BatchStoryPointExtractor(StoryPointExtractor):
+    def __init__(self):
+        self.batch_sizes = []
+
+    def get_story_points(self, task) -> float | None:
+        raise AssertionError("per task extraction must not be used")
+
+    def get_story_points_batch(self, tasks):
+        self.batch_sizes.append(len(tasks))
+        return [task['story_points'] for task in tasks]
+
+
+class BatchWorklogExtractor(WorklogExtractor):
+    def __init__(self):
+        self.batches = []
+
+    def get_work_time_per_user(self, task):
+        raise AssertionError("per task extraction must not be used")
+
+    def get_work_time_per_user_batch(self, tasks):
+        self.batches.append([task['key'] for task in tasks])
+        return [{task['user']: Duration.of(task['hours'], TimeUnit.HOUR)} for task in tasks]
+
+
+def work_time_per_user(task):
+    return {task['user']: Duration.of(task['hours'], TimeUnit.HOUR)}
+
+
+def total_spent_time(task):
+    return Duration.of(task['hours'], TimeUnit.HOUR)
+
+
+class BatchExtractionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tasks = [{'key': f'T-{i}', 'story_points': i % 4, 'user': f'user-{i % 3}', 'hours': i % 5 + 1}
+                      for i in range(250)]
+
+    def test_user_calculator_prefers_batch_extractors(self):
+        # given
+        story_point_extractor = BatchStoryPointExtractor()
+        worklog_extractor = BatchWorklogExtractor()
+        calculator = UserVelocityCalculator(ProxyTaskProvider(self.tasks), story_point_extractor, worklog_extractor)
+        # when
+        result = calculator.calculate()
+        # then
+        expected = UserVelocityCalculator(ProxyTaskProvider(self.tasks),
+                                          FunctionStoryPointExtractor(lambda task: task['story_points']),
+                                          FunctionWorklogExtractor(work_time_per_user)).calculate()
+        self.assertEqual(expected, result)
+        self.assertEqual([100, 100, 50], story_point_extractor.batch_sizes)
+        self.assertNotIn('T-0', [key for batch in worklog_extractor.batches for key in batch])
+
+    def test_engine_chunks_use_batch_extractors(self):
+        # given
+        story_point_extractor = BatchStoryPointExtractor()
+        calculator = GeneralizedTeamVelocityCalculator(ProxyTaskProvider(self.tasks), story_point_extractor,
+                                                       FunctionTotalSpentTimeExtractor(total_spent_time),
+                                                       extraction_engine=SerialExtractionEngine(chunk_size=30))
+        # when
+        result = calculator.calculate()
+        # then
+        expected = GeneralizedTeamVelocityCalculator(ProxyTaskProvider(self.tasks),
+                                                     FunctionStoryPointExtractor(lambda task: task['story_points']),
+                                                     FunctionTotalSpentTimeExtractor(total_spent_time)).calculate()
+        self.assertEqual(expected, result)
+        self.assertEqual([30] * 8 + [10], story_point_extractor.batch_sizes)
+
+    def test_chained_batch_falls_back_only_for_tasks_without_work_time(self):
+        # given
+        first_extractor = FunctionWorklogExtractor(lambda task: work_time_per_user(task) if task['hours'] > 2 else {})
+        fallback_extractor = BatchWorklogExtractor()
+        chained_extractor = ChainedWorklogExtractor([first_extractor, fallback_extractor])
+        tasks = self.tasks[:5]
+        # when
+        result = chained_extractor.get_work_time_per_user_batch(tasks)
+        # then
+        self.assertEqual([work_time_per_user(task) for task in tasks], result)
+        self.assertEqual([['T-0', 'T-1']], fallback_extractor.batches)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+from sd_metrics_lib.calculators.execution import SerialExtractionEngine, ThreadPoolExtractionEngine, \
+    ProcessPoolExtractionEngine
+from sd_metrics_lib.utils.time import Duration, TimeUnit
+from tests.calculators.calculator_factories import create_user_calculator, create_team_calculator
+
+
+class Task:
+    def __init__(self, index: int):
+        self.index = index
+        self.story_points = index % 5 + 1
+
+
+def work_time_per_user(task: Task):
+    return {f'user-{task.index % 3}': Duration.of(2 * 3600, TimeUnit.SECOND),
+            f'user-{task.index % 4}': Duration.of(3600, TimeUnit.SECOND)}
+
+
+def total_spent_time(task: Task):
+    return Duration.of(task.index % 7 + 1, TimeUnit.HOUR)
+
+
+class ExtractionEngineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tasks = [Task(i) for i in range(250)]
+
+    def _assert_velocity_per_user_almost_equal(self, expected, actual):
+        self.assertEqual(expected.keys(), actual.keys())
+        for user in expected:
+            self.assertAlmostEqual(expected[user], actual[user], places=9)
+
+    def test_serial_engine_matches_default_extraction(self):
+        # when
+        velocity = create_user_calculator(self.tasks, work_time_per_user,
+                                          SerialExtractionEngine(chunk_size=16)).calculate()
+        # then
+        expected = create_user_calculator(self.tasks, work_time_per_user).calculate()
+        self._assert_velocity_per_user_almost_equal(expected, velocity)
+
+    def test_thread_pool_engine_matches_default_extraction(self):
+        # given
+        engine = ThreadPoolExtractionEngine(max_workers=4, chunk_size=16, max_pending_chunks=2)
+        # when
+        velocity = create_user_calculator(self.tasks, work_time_per_user, engine).calculate()
+        engine.shutdown()
+        # then
+        expected = create_user_calculator(self.tasks, work_time_per_user).calculate()
+        self._assert_velocity_per_user_almost_equal(expected, velocity)
+
+    def test_thread_pool_engine_merges_deterministically(self):
+        # given
+        engine = ThreadPoolExtractionEngine(max_workers=4, chunk_size=16)
+        # when
+        velocity = create_user_calculator(self.tasks, work_time_per_user, engine).calculate()
+        engine.shutdown()
+        # then
+        expected = create_user_calculator(self.tasks, work_time_per_user,
+                                          SerialExtractionEngine(chunk_size=16)).calculate()
+        self.assertEqual(expected, velocity)
+
+    def test_process_pool_engine_matches_default_extraction(self):
+        # given
+        engine = ProcessPoolExtractionEngine(max_workers=2, chunk_size=64)
+        # when
+        velocity = create_team_calculator(self.tasks, total_spent_time, engine).calculate()
+        engine.shutdown()
+        # then
+        self.assertEqual(create_team_calculator(self.tasks, total_spent_time).calculate(), velocity)
+
+    def test_engine_yields_chunk_results_in_order(self):
+        # given
+        engine = ThreadPoolExtractionEngine(max_workers=4, chunk_size=3)
+        # when
+        results = list(engine.map_chunks(sum, range(10)))
+        engine.shutdown()
+        # then
+        self.assertEqual([3, 12, 21, 9], results)
+
+
+if __name__ == "__main__":
+    unittest.main()
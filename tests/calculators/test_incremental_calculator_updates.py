@@ -0,0 +1,130 @@
+import unittest
+
+from sd_metrics_lib.calculators.execution import ThreadPoolExtractionEngine
+from sd_metrics_lib.sources.worklog import FunctionWorklogExtractor
+from sd_metrics_lib.utils.time import Duration, TimeUnit
+from tests.calculators.calculator_factories import create_user_calculator, create_team_calculator
+
+
+class CountingWorklogExtractor(FunctionWorklogExtractor):
+    def __init__(self):
+        super().__init__(lambda task: {user: Duration.of(hours, TimeUnit.HOUR) for user, hours in task['hours'].items()})
+        self.calls = 0
+
+    def get_work_time_per_user(self, task):
+        self.calls += 1
+        return super().get_work_time_per_user(task)
+
+
+def total_spent_time(task):
+    return Duration.of(sum(task['hours'].values()), TimeUnit.HOUR)
+
+
+class IncrementalCalculatorUpdatesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tasks = [{'key': f'T-{i}', 'story_points': (i % 5 + 1) / 3,
+                       'hours': {f'user-{i % 3}': i % 4 + 1, f'user-{i % 2}': 0.7}}
+                      for i in range(40)]
+
+    def test_apply_task_matches_full_recalculation(self):
+        # given
+        calculator = create_user_calculator(self.tasks[:30], CountingWorklogExtractor())
+        calculator.calculate()
+        # when
+        for task in self.tasks[30:]:
+            calculator.apply_task(task)
+        result = calculator.calculate()
+        # then
+        expected_calculator = create_user_calculator(self.tasks, CountingWorklogExtractor())
+        self.assertEqual(expected_calculator.calculate(), result)
+        self.assertEqual(expected_calculator.get_story_points(), calculator.get_story_points())
+
+    def test_retract_task_is_exact_and_removes_users_without_work(self):
+        # given
+        extra_task = {'key': 'X-1', 'story_points': 0.1, 'hours': {'newcomer': 3, 'user-0': 0.3}}
+        calculator = create_user_calculator(self.tasks + [extra_task], CountingWorklogExtractor())
+        calculator.calculate()
+        # when
+        calculator.retract_task(extra_task)
+        result = calculator.calculate()
+        # then
+        expected_calculator = create_user_calculator(self.tasks, CountingWorklogExtractor())
+        self.assertEqual(expected_calculator.calculate(), result)
+        self.assertEqual(expected_calculator.get_story_points(), calculator.get_story_points())
+        self.assertEqual(expected_calculator.get_spent_time(), calculator.get_spent_time())
+        self.assertNotIn('newcomer', result)
+
+    def test_tracked_contribution_is_retracted_without_extracting_old_task(self):
+        # given
+        worklog_extractor = CountingWorklogExtractor()
+        calculator = create_user_calculator(self.tasks, worklog_extractor)
+        calculator.calculate()
+        updated_task = dict(self.tasks[5], story_points=8, hours={'user-2': 5})
+        calls_before_update = worklog_extractor.calls
+        # when
+        calculator.apply_task(updated_task)
+        result = calculator.calculate()
+        # then
+        expected_tasks = list(self.tasks)
+        expected_tasks[5] = updated_task
+        self.assertEqual(create_user_calculator(expected_tasks, CountingWorklogExtractor()).calculate(), result)
+        self.assertEqual(calls_before_update + 1, worklog_extractor.calls)
+
+    def test_replace_task_updates_team_velocity(self):
+        # given
+        calculator = create_team_calculator(self.tasks, total_spent_time)
+        calculator.calculate()
+        new_task = dict(self.tasks[0], story_points=13, hours={'user-1': 2})
+        # when
+        calculator.replace_task(self.tasks[0], new_task)
+        result = calculator.calculate()
+        # then
+        expected = create_team_calculator([new_task] + self.tasks[1:], total_spent_time).calculate()
+        self.assertEqual(expected, result)
+
+    def test_apply_task_before_calculate_extracts_provider_tasks_first(self):
+        # given
+        calculator = create_team_calculator(self.tasks[:10], total_spent_time)
+        # when
+        calculator.apply_task(self.tasks[10])
+        # then
+        self.assertEqual(create_team_calculator(self.tasks[:11], total_spent_time).calculate(), calculator.calculate())
+        self.assertEqual(11, len(calculator.task_contributions))
+
+    def test_apply_and_retract_with_extraction_engine_use_chunk_contributions(self):
+        # given
+        engine = ThreadPoolExtractionEngine(max_workers=3, chunk_size=7)
+        calculator = create_user_calculator(self.tasks, CountingWorklogExtractor(), engine)
+        calculator.calculate()
+        updated_task = dict(self.tasks[3], story_points=5, hours={'user-1': 2})
+        # when
+        calculator.apply_task(updated_task)
+        calculator.retract_task(self.tasks[8])
+        result = calculator.calculate()
+        engine.shutdown()
+        # then
+        expected_tasks = [updated_task if task is self.tasks[3] else task
+                          for task in self.tasks if task is not self.tasks[8]]
+        expected_calculator = create_user_calculator(expected_tasks, CountingWorklogExtractor())
+        self.assertEqual(expected_calculator.calculate(), result)
+        self.assertEqual(expected_calculator.get_story_points(), calculator.get_story_points())
+        self.assertEqual(len(self.tasks) - 1, len(calculator.task_contributions))
+
+    def test_untracked_retract_re_extracts_given_task(self):
+        # given
+        worklog_extractor = CountingWorklogExtractor()
+        calculator = create_user_calculator(self.tasks, worklog_extractor, track_task_contributions=False)
+        calculator.calculate()
+        calls_before_retract = worklog_extractor.calls
+        # when
+        calculator.retract_task(self.tasks[0])
+        result = calculator.calculate()
+        # then
+        self.assertEqual(create_user_calculator(self.tasks[1:], CountingWorklogExtractor()).calculate(), result)
+        self.assertEqual(calls_before_retract + 1, worklog_extractor.calls)
+        self.assertEqual({}, calculator.task_contributions)
+
+
+if __name__ == "__main__":
+    unittest.main()
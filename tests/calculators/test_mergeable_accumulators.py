@@ -0,0 +1,118 @@
+import pickle
+import random
+import unittest
+
+from sd_metrics_lib.calculators.accumulators import ExactSum, UserVelocityAccumulator, TeamVelocityAccumulator
+from sd_metrics_lib.calculators.execution import SerialExtractionEngine, ThreadPoolExtractionEngine
+from sd_metrics_lib.utils.time import Duration, TimeUnit
+from tests.calculators.calculator_factories import create_user_calculator, create_team_calculator
+
+
+class Task:
+    def __init__(self, index: int):
+        self.index = index
+        self.story_points = (index % 7 + 1) / 3
+
+
+def work_time_per_user(task: Task):
+    return {f'user-{task.index % 3}': Duration.of(task.index % 5 + 1, TimeUnit.HOUR),
+            f'user-{task.index % 4}': Duration.of(1337 + task.index, TimeUnit.SECOND)}
+
+
+def total_spent_time(task: Task):
+    return Duration.of((task.index % 11 + 1) / 3, TimeUnit.HOUR)
+
+
+class MergeableAccumulatorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tasks = [Task(i) for i in range(300)]
+
+    def test_exact_sum_does_not_depend_on_order(self):
+        # given
+        values = [1e16, 1.0, -1e16, 0.1, 0.2, 0.3] * 50
+        shuffled = list(values)
+        random.Random(7).shuffle(shuffled)
+        # when
+        forward = ExactSum(values).value
+        backward = ExactSum(reversed(values)).value
+        merged = ExactSum(shuffled[:100]).merge(ExactSum(shuffled[100:])).value
+        # then
+        self.assertEqual(forward, backward)
+        self.assertEqual(forward, merged)
+
+    def test_user_accumulator_survives_bytes_round_trip_and_pickle(self):
+        # given
+        accumulator = UserVelocityAccumulator().add('alice', 0.1, 3600).add('bob', 1 / 3, 7200).add('alice', 0.2, 60)
+        # when
+        from_bytes = UserVelocityAccumulator.from_bytes(accumulator.to_bytes())
+        from_pickle = pickle.loads(pickle.dumps(accumulator))
+        # then
+        self.assertEqual(accumulator, from_bytes)
+        self.assertEqual(accumulator, from_pickle)
+        self.assertEqual(['alice', 'bob'], from_bytes.users())
+
+    def test_from_bytes_rejects_other_accumulator_type(self):
+        # given
+        data = TeamVelocityAccumulator().add(1, 3600).to_bytes()
+        # when / then
+        with self.assertRaises(ValueError):
+            UserVelocityAccumulator.from_bytes(data)
+        with self.assertRaises(ValueError):
+            TeamVelocityAccumulator.from_bytes(data + b'\x00')
+
+    def test_merged_shards_match_serial_user_velocity(self):
+        # given
+        expected_calculator = create_user_calculator(self.tasks, work_time_per_user)
+        expected = expected_calculator.calculate(TimeUnit.HOUR)
+        shards = [self.tasks[i::4] for i in range(4)]
+        serialized_shards = [create_user_calculator(shard, work_time_per_user).get_accumulator().to_bytes()
+                             for shard in shards]
+        # when
+        merged_calculator = create_user_calculator([], work_time_per_user)
+        for shard_bytes in reversed(serialized_shards):
+            merged_calculator.merge_accumulator(UserVelocityAccumulator.from_bytes(shard_bytes))
+        result = merged_calculator.calculate(TimeUnit.HOUR)
+        # then
+        self.assertEqual(expected, result)
+        self.assertEqual(expected_calculator.get_story_points(), merged_calculator.get_story_points())
+        self.assertEqual(expected_calculator.get_spent_time(), merged_calculator.get_spent_time())
+
+    def test_merged_shards_match_serial_team_velocity(self):
+        # given
+        expected = create_team_calculator(self.tasks, total_spent_time).calculate(TimeUnit.HOUR)
+        shards = [self.tasks[:17], self.tasks[17:200], self.tasks[200:]]
+        # when
+        merged = TeamVelocityAccumulator.merge_all(
+            pickle.loads(pickle.dumps(create_team_calculator(shard, total_spent_time).get_accumulator()))
+            for shard in shards)
+        merged_calculator = create_team_calculator([], total_spent_time)
+        merged_calculator.merge_accumulator(merged)
+        # then
+        self.assertEqual(expected, merged_calculator.calculate(TimeUnit.HOUR))
+
+    def test_merge_keeps_calculator_own_tasks(self):
+        # given
+        expected = create_user_calculator(self.tasks, work_time_per_user).calculate(TimeUnit.HOUR)
+        calculator = create_user_calculator(self.tasks[:120], work_time_per_user)
+        # when
+        calculator.merge_accumulator(create_user_calculator(self.tasks[120:], work_time_per_user).get_accumulator())
+        # then
+        self.assertEqual(expected, calculator.calculate(TimeUnit.HOUR))
+
+    def test_extraction_engines_match_serial_exactly(self):
+        # given
+        expected_user = create_user_calculator(self.tasks, work_time_per_user).calculate()
+        expected_team = create_team_calculator(self.tasks, total_spent_time).calculate()
+        for engine in [SerialExtractionEngine(chunk_size=7), ThreadPoolExtractionEngine(max_workers=3, chunk_size=13)]:
+            with self.subTest(engine=type(engine).__name__):
+                # when
+                user_result = create_user_calculator(self.tasks, work_time_per_user, engine).calculate()
+                team_result = create_team_calculator(self.tasks, total_spent_time, engine).calculate()
+                # then
+                self.assertEqual(expected_user, user_result)
+                self.assertEqual(expected_team, team_result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+
+from sd_metrics_lib.calculators.execution import TaskExtractionMemo
+from sd_metrics_lib.calculators.pipeline import MetricPipeline
+from sd_metrics_lib.calculators.velocity import (
+    AbstractMetricCalculator,
+    UserVelocityCalculator,
+    GeneralizedTeamVelocityCalculator
+)
+from sd_metrics_lib.sources.jira.worklog import JiraStatusChangeWorklogExtractor
+from sd_metrics_lib.sources.story_points import StoryPointExtractor
+from sd_metrics_lib.sources.tasks import ProxyTaskProvider
+from sd_metrics_lib.sources.worklog import FunctionWorklogExtractor, FunctionTotalSpentTimeExtractor
+from sd_metrics_lib.utils.time import Duration, TimeUnit
+
+
+class CountingStoryPointExtractor(StoryPointExtractor):
+    def __init__(self):
+        self.calls = 0
+
+    def get_story_points(self, task) -> float | None:
+        self.calls += 1
+        return task['story_points']
+
+
+class CountingTaskProvider(ProxyTaskProvider):
+    def __init__(self, tasks: list):
+        super().__init__(tasks)
+        self.iterations = 0
+
+    def iter_tasks(self):
+        self.iterations += 1
+        return super().iter_tasks()
+
+
+class CountingStatusChangeWorklogExtractor(JiraStatusChangeWorklogExtractor):
+    def __init__(self):
+        super().__init__(transition_statuses=['In Progress'])
+        self.changelog_walks = 0
+
+    def _extract_chronological_changes_sequence(self, task):
+        self.changelog_walks += 1
+        return super()._extract_chronological_changes_sequence(task)
+
+
+class TaskCountCalculator(AbstractMetricCalculator):
+    def __init__(self, task_provider):
+        super().__init__()
+        self.task_provider = task_provider
+        self.count = 0
+
+    def _calculate_metric(self, time_unit, time_policy):
+        pass
+
+    def _extract_data_from_tasks(self):
+        self.count = sum(1 for _ in self.task_provider.iter_tasks())
+
+    def get_metric(self):
+        return self.count
+
+
+def work_time_per_user(task):
+    return {task['user']: Duration.of(task['hours'], TimeUnit.HOUR)}
+
+
+def total_spent_time(task):
+    return Duration.of(task['hours'], TimeUnit.HOUR)
+
+
+class MetricPipelineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tasks = [{'story_points': 3, 'user': 'a', 'hours': 8},
+                      {'story_points': 5, 'user': 'b', 'hours': 16},
+                      {'story_points': 2, 'user': 'a', 'hours': 4}]
+
+    def _create_calculators(self, task_provider, story_point_extractor):
+        return [UserVelocityCalculator(task_provider, story_point_extractor,
+                                       FunctionWorklogExtractor(work_time_per_user)),
+                GeneralizedTeamVelocityCalculator(task_provider, story_point_extractor,
+                                                  FunctionTotalSpentTimeExtractor(total_spent_time))]
+
+    def test_pipeline_matches_separate_calculations(self):
+        # given
+        expected = [calculator.calculate()
+                    for calculator in self._create_calculators(ProxyTaskProvider(self.tasks),
+                                                               CountingStoryPointExtractor())]
+        task_provider = ProxyTaskProvider(self.tasks)
+        # when
+        result = MetricPipeline(task_provider,
+                                self._create_calculators(task_provider, CountingStoryPointExtractor())).calculate()
+        # then
+        self.assertEqual(expected, result)
+
+    def test_tasks_are_scanned_once_and_story_points_extracted_once(self):
+        # given
+        task_provider = CountingTaskProvider(self.tasks)
+        story_point_extractor = CountingStoryPointExtractor()
+        pipeline = MetricPipeline(task_provider, self._create_calculators(task_provider, story_point_extractor))
+        # when
+        pipeline.calculate()
+        # then
+        self.assertEqual(1, task_provider.iterations)
+        self.assertEqual(len(self.tasks), story_point_extractor.calls)
+
+    def test_calculator_without_per_task_extraction_reuses_scanned_tasks(self):
+        # given
+        task_provider = CountingTaskProvider(self.tasks)
+        custom_calculator = TaskCountCalculator(task_provider)
+        calculators = self._create_calculators(task_provider, CountingStoryPointExtractor()) + [custom_calculator]
+        # when
+        result = MetricPipeline(task_provider, calculators).calculate()
+        # then
+        self.assertEqual(3, result[2])
+        self.assertEqual(1, task_provider.iterations)
+        self.assertIs(task_provider, custom_calculator.task_provider)
+
+    def test_calculator_without_per_task_extraction_does_not_support_single_pass(self):
+        # when
+        supports_single_pass = TaskCountCalculator(ProxyTaskProvider([])).supports_single_pass()
+        # then
+        self.assertFalse(supports_single_pass)
+
+    def test_memo_walks_changelog_once_for_work_time_and_work_intervals(self):
+        # given
+        extractor = CountingStatusChangeWorklogExtractor()
+        task = {'key': 'X-1', 'fields': {'status': {'name': 'Done'}}, 'changelog': {'histories': []}}
+        memo = TaskExtractionMemo()
+        # when
+        memo.extract(extractor.get_work_time_per_user, task)
+        memo.extract(extractor.get_work_intervals_per_user, task)
+        # then
+        self.assertEqual(1, extractor.changelog_walks)
+
+
+if __name__ == "__main__":
+    unittest.main()
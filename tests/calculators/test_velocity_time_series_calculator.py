@@ -0,0 +1,149 @@
+import math
+import unittest
+from datetime import datetime
+
+from sd_metrics_lib.calculators.timeseries import VelocityTimeSeriesCalculator
+from sd_metrics_lib.sources.story_points import AttributePathStoryPointExtractor
+from sd_metrics_lib.sources.tasks import ProxyTaskProvider
+from sd_metrics_lib.sources.worklog import FunctionResolutionDateExtractor, FunctionWorkIntervalExtractor
+from sd_metrics_lib.utils.time import Duration, TimeUnit, TimePolicy
+from sd_metrics_lib.utils.worktime import WorkTimeExtractor, SimpleWorkTimeExtractor
+
+
+class CalendarWorkTimeExtractor(WorkTimeExtractor):
+
+    def extract_time_from_period(self, start_time_period, end_time_period, time_policy=TimePolicy.BUSINESS_HOURS,
+                                 result_unit=TimeUnit.SECOND):
+        if end_time_period <= start_time_period:
+            return None
+        return Duration.datetime_difference(start_time_period, end_time_period, result_unit)
+
+
+class HourRoundingWorkTimeExtractor(WorkTimeExtractor):
+
+    def extract_time_from_period(self, start_time_period, end_time_period, time_policy=TimePolicy.BUSINESS_HOURS,
+                                 result_unit=TimeUnit.SECOND):
+        if end_time_period <= start_time_period:
+            return None
+        started_hours = math.ceil((end_time_period - start_time_period).total_seconds() / 3600)
+        return Duration.of(started_hours * 3600, TimeUnit.SECOND)
+
+
+class Task:
+    def __init__(self, story_points, resolution_date, intervals_per_user):
+        self.story_points = story_points
+        self.resolution_date = resolution_date
+        self.intervals_per_user = intervals_per_user
+
+
+class VelocityTimeSeriesCalculatorTestCase(unittest.TestCase):
+
+    @staticmethod
+    def _create_calculator(tasks, number_of_buckets=3, rolling_window=2,
+                           worktime_extractor=CalendarWorkTimeExtractor(), bucket_time_unit=TimeUnit.DAY):
+        return VelocityTimeSeriesCalculator(ProxyTaskProvider(tasks),
+                                            AttributePathStoryPointExtractor('story_points'),
+                                            FunctionResolutionDateExtractor(lambda task: task.resolution_date),
+                                            FunctionWorkIntervalExtractor(lambda task: task.intervals_per_user),
+                                            bucket_time_unit=bucket_time_unit,
+                                            number_of_buckets=number_of_buckets,
+                                            rolling_window=rolling_window,
+                                            end_time=datetime(2024, 1, 10, 12),
+                                            worktime_extractor=worktime_extractor)
+
+    def test_buckets_cover_requested_range_in_ascending_order(self):
+        # when
+        ranges = self._create_calculator([]).get_bucket_ranges()
+        # then
+        self.assertEqual([datetime(2024, 1, 8), datetime(2024, 1, 9), datetime(2024, 1, 10)],
+                         [start for start, _ in ranges])
+        self.assertEqual(datetime(2024, 1, 10, 23, 59, 59, 999999), ranges[-1][1])
+
+    def test_interval_crossing_bucket_boundary_is_split(self):
+        # given
+        task = Task(4, datetime(2024, 1, 9, 15), {'a': [(datetime(2024, 1, 8, 20), datetime(2024, 1, 9, 4))]})
+        # when
+        buckets = self._create_calculator([task]).calculate(TimeUnit.HOUR, TimePolicy.ALL_HOURS)
+        # then
+        self.assertEqual(Duration.of(4 * 3600, TimeUnit.SECOND), buckets[0].spent_time_per_user['a'])
+        self.assertEqual(Duration.of(4 * 3600, TimeUnit.SECOND), buckets[1].spent_time_per_user['a'])
+        self.assertEqual({'a': 4.0}, buckets[1].story_points_per_user)
+        self.assertAlmostEqual(1.0, buckets[1].velocity_per_user['a'])
+        self.assertAlmostEqual(0.5, buckets[1].rolling_velocity_per_user['a'])
+
+    def test_story_points_are_split_by_user_time_and_summed_for_team(self):
+        # given
+        task = Task(6, datetime(2024, 1, 10, 9), {'a': [(datetime(2024, 1, 10, 1), datetime(2024, 1, 10, 3))],
+                                                  'b': [(datetime(2024, 1, 10, 3), datetime(2024, 1, 10, 7))]})
+        # when
+        buckets = self._create_calculator([task]).calculate(TimeUnit.HOUR, TimePolicy.ALL_HOURS)
+        # then
+        self.assertEqual({'a': 2.0, 'b': 4.0}, buckets[2].story_points_per_user)
+        self.assertAlmostEqual(1.0, buckets[2].team_velocity)
+
+    def test_task_resolved_outside_range_contributes_only_time(self):
+        # given
+        task = Task(3, datetime(2024, 1, 11, 9), {'a': [(datetime(2024, 1, 10, 1), datetime(2024, 1, 10, 3))]})
+        # when
+        buckets = self._create_calculator([task]).calculate(TimeUnit.HOUR, TimePolicy.ALL_HOURS)
+        # then
+        self.assertEqual({}, buckets[2].story_points_per_user)
+        self.assertEqual(Duration.of(2 * 3600, TimeUnit.SECOND), buckets[2].spent_time_per_user['a'])
+
+    def test_story_points_are_split_by_the_same_seconds_as_bucket_time(self):
+        # given
+        task = Task(6, datetime(2024, 1, 9, 10), {'a': [(datetime(2024, 1, 8, 23, 30), datetime(2024, 1, 9, 0, 30))],
+                                                  'b': [(datetime(2024, 1, 9, 1), datetime(2024, 1, 9, 2))]})
+        calculator = self._create_calculator([task], worktime_extractor=HourRoundingWorkTimeExtractor())
+        # when
+        buckets = calculator.calculate(TimeUnit.HOUR, TimePolicy.ALL_HOURS)
+        # then
+        self.assertEqual(Duration.of(3600, TimeUnit.SECOND), buckets[0].spent_time_per_user['a'])
+        self.assertNotIn('a', buckets[1].spent_time_per_user)
+        self.assertEqual({'a': 3.0, 'b': 3.0}, buckets[1].story_points_per_user)
+
+    def test_split_bucket_time_adds_up_to_unsplit_work_time(self):
+        intervals = [(datetime(2024, 1, 5, 10), datetime(2024, 1, 9, 10)),
+                     (datetime(2024, 1, 3, 14), datetime(2024, 1, 10, 11)),
+                     (datetime(2024, 1, 8, 16), datetime(2024, 1, 9, 9))]
+        for bucket_time_unit in [TimeUnit.DAY, TimeUnit.WEEK]:
+            for interval_start, interval_end in intervals:
+                with self.subTest(bucket_time_unit=bucket_time_unit, interval_start=interval_start):
+                    # given
+                    worktime_extractor = SimpleWorkTimeExtractor()
+                    task = Task(1, datetime(2024, 1, 10, 12), {'a': [(interval_start, interval_end)]})
+                    calculator = self._create_calculator([task], number_of_buckets=8,
+                                                         worktime_extractor=worktime_extractor,
+                                                         bucket_time_unit=bucket_time_unit)
+                    # when
+                    buckets = calculator.calculate(TimeUnit.HOUR)
+                    # then
+                    bucket_seconds = sum(bucket.spent_time_per_user.get('a', Duration.zero()).to_seconds()
+                                         for bucket in buckets)
+                    unsplit = worktime_extractor.extract_time_from_period(interval_start, interval_end)
+                    self.assertAlmostEqual(unsplit.to_seconds(), bucket_seconds, places=3)
+
+    def test_weekend_day_buckets_get_no_work_time(self):
+        # given
+        task = Task(1, datetime(2024, 1, 9, 12), {'a': [(datetime(2024, 1, 5, 10), datetime(2024, 1, 9, 10))]})
+        calculator = self._create_calculator([task], number_of_buckets=6, worktime_extractor=SimpleWorkTimeExtractor())
+        # when
+        buckets = calculator.calculate(TimeUnit.HOUR)
+        # then
+        hours_per_day = {bucket.start.day: bucket.spent_time_per_user['a'].to_seconds() / 3600
+                         for bucket in buckets if 'a' in bucket.spent_time_per_user}
+        self.assertEqual({5: 8.0, 8: 8.0, 9: 8.0}, hours_per_day)
+
+    def test_work_outside_bucket_range_still_counts_for_story_point_share(self):
+        # given
+        task = Task(4, datetime(2024, 1, 8, 10), {'a': [(datetime(2024, 1, 7, 6), datetime(2024, 1, 7, 9))],
+                                                  'b': [(datetime(2024, 1, 8, 1), datetime(2024, 1, 8, 2))]})
+        # when
+        buckets = self._create_calculator([task]).calculate(TimeUnit.HOUR, TimePolicy.ALL_HOURS)
+        # then
+        self.assertEqual({'a': 3.0, 'b': 1.0}, buckets[0].story_points_per_user)
+        self.assertNotIn('a', buckets[0].spent_time_per_user)
+
+
+if __name__ == "__main__":
+    unittest.main()
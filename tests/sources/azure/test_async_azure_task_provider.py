@@ -0,0 +1,74 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+import httpx
+
+from sd_metrics_lib.sources.azure.async_tasks import AsyncAzureTaskProvider, AsyncAzureClient
+from sd_metrics_lib.sources.azure.tasks import AzureTaskProvider
+
+
+class StubAsyncAzureClient:
+    def __init__(self, work_item_ids=(1,)):
+        self._ids = list(work_item_ids)
+        self.get_updates_calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def query_by_wiql(self, wiql, top=None):
+        refs = [SimpleNamespace(id=i) for i in self._ids if f'[System.Id] > {i}' not in wiql.query]
+        return SimpleNamespace(work_items=refs, work_item_relations=None)
+
+    async def get_work_items(self, ids, fields):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        return [SimpleNamespace(id=i, fields={}) for i in ids]
+
+    async def get_updates(self, item_id: int, top=None, skip=None):
+        self.get_updates_calls.append(item_id)
+        return [f"update_for_{item_id}"]
+
+
+class AsyncAzureTaskProviderTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def test_get_tasks_fetches_all_batches_within_in_flight_limit(self):
+        # given
+        azure = StubAsyncAzureClient(work_item_ids=range(1, 101))
+        provider = AsyncAzureTaskProvider(azure, "SELECT [System.Id] FROM WorkItems", page_size=10,
+                                          max_in_flight_requests=2)
+        # when
+        tasks = await provider.get_tasks()
+        # then
+        self.assertEqual(list(range(1, 101)), [task.id for task in tasks])
+        self.assertLessEqual(azure.max_in_flight, 2)
+
+    async def test_get_tasks_attaches_updates_expansion(self):
+        # given
+        azure = StubAsyncAzureClient(work_item_ids=(1, 2))
+        provider = AsyncAzureTaskProvider(azure, "SELECT [System.Id] FROM WorkItems",
+                                          custom_expand_fields=[AzureTaskProvider.WORK_ITEM_UPDATES_CUSTOM_FIELD_NAME])
+        # when
+        tasks = await provider.get_tasks()
+        # then
+        self.assertEqual(["update_for_2"], tasks[1].fields[AzureTaskProvider.WORK_ITEM_UPDATES_CUSTOM_FIELD_NAME])
+
+
+class AsyncAzureClientTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def test_get_work_items_deserializes_sdk_models(self):
+        # given
+        def handler(request: httpx.Request):
+            return httpx.Response(200, json={'count': 1, 'value': [{'id': 7, 'rev': 3, 'fields': {'System.State': 'Active'}}]})
+
+        http_client = httpx.AsyncClient(base_url='https://dev.azure.com/org', transport=httpx.MockTransport(handler))
+        async with AsyncAzureClient('https://dev.azure.com/org', http_client=http_client) as client:
+            # when
+            work_items = await client.get_work_items([7], fields=['System.State'])
+        # then
+        self.assertEqual('Active', work_items[0].fields['System.State'])
+
+
+if __name__ == "__main__":
+    unittest.main()
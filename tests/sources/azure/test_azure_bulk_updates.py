@@ -0,0 +1,165 @@
+import unittest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from sd_metrics_lib.sources.azure.tasks import AzureTaskProvider
+from sd_metrics_lib.sources.azure.worklog import AzureStatusChangeWorklogExtractor
+
+
+class InMemoryCache:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key: str):
+        return self.store.get(key)
+
+    def set(self, key: str, value):
+        self.store[key] = value
+
+
+def _revision(item_id, rev, state, assignee, changed_date):
+    return {
+        'id': item_id,
+        'rev': rev,
+        'fields': {
+            'System.State': state,
+            'System.AssignedTo': {'id': assignee},
+            'System.ChangedBy': {'id': assignee},
+            'System.ChangedDate': changed_date,
+        }
+    }
+
+
+class StubAzureClient:
+    def __init__(self, work_item_ids, updates_count=1, revisions=None, batch_size=2):
+        self._ids = list(work_item_ids)
+        self.updates_count = updates_count
+        self.revisions = list(revisions or [])
+        self.batch_size = batch_size
+        self.get_updates_calls = []
+        self.revisions_calls = []
+
+    def query_by_wiql(self, wiql, top=None):
+        return SimpleNamespace(work_items=[SimpleNamespace(id=i) for i in self._ids], work_item_relations=None)
+
+    def get_work_items(self, ids, fields):
+        return [SimpleNamespace(id=i, fields={'System.State': 'Done'}) for i in ids]
+
+    def get_updates(self, item_id, top=None, skip=None):
+        self.get_updates_calls.append((item_id, top, skip))
+        start = skip or 0
+        end = min(start + (top or AzureTaskProvider.WORK_ITEM_UPDATES_PAGE_SIZE), self.updates_count)
+        return [f'update_{item_id}_{i}' for i in range(start, end)]
+
+    def read_reporting_revisions_post(self, revisions_filter, project=None, continuation_token=None,
+                                      start_date_time=None):
+        self.revisions_calls.append((project, continuation_token, start_date_time))
+        start = int(continuation_token or 0)
+        end = start + self.batch_size
+        values = self.revisions[start:end]
+        return SimpleNamespace(values=values, continuation_token=str(end), is_last_batch=end >= len(self.revisions))
+
+
+class AzureBulkUpdatesTestCase(unittest.TestCase):
+
+    @staticmethod
+    def _create_provider(azure_client, bulk_updates=False, cache=None, updates_since=None):
+        return AzureTaskProvider(azure_client,
+                                 query="SELECT [System.Id] FROM WorkItems",
+                                 additional_fields=[],
+                                 custom_expand_fields=[AzureTaskProvider.WORK_ITEM_UPDATES_CUSTOM_FIELD_NAME],
+                                 cache=cache,
+                                 bulk_updates=bulk_updates,
+                                 project='Project',
+                                 updates_since=updates_since)
+
+    def test_updates_are_paged_when_item_has_long_history(self):
+        # given
+        azure = StubAzureClient([1], updates_count=450)
+        provider = self._create_provider(azure)
+        # when
+        tasks = provider.get_tasks()
+        # then
+        updates = tasks[0].fields[AzureTaskProvider.WORK_ITEM_UPDATES_CUSTOM_FIELD_NAME]
+        self.assertEqual([f'update_1_{i}' for i in range(450)], updates)
+        self.assertEqual([(1, 200, 0), (1, 200, 200), (1, 200, 400)], azure.get_updates_calls)
+
+    def test_bulk_mode_reads_revision_stream_instead_of_per_item_updates(self):
+        # given
+        revisions = [
+            _revision(1, 1, 'New', 'userA', '2024-02-01T08:00:00.000Z'),
+            _revision(99, 1, 'New', 'userX', '2024-02-01T08:30:00.000Z'),
+            _revision(1, 2, 'Active', 'userA', '2024-02-01T09:00:00.000Z'),
+            _revision(2, 1, 'Active', 'userB', '2024-02-01T10:00:00.000Z'),
+            _revision(1, 3, 'Done', 'userA', '2024-02-01T12:00:00.000Z'),
+        ]
+        azure = StubAzureClient([1, 2], revisions=revisions)
+        provider = self._create_provider(azure, bulk_updates=True)
+        # when
+        tasks = provider.get_tasks()
+        # then
+        self.assertEqual([], azure.get_updates_calls)
+        self.assertEqual(3, len(azure.revisions_calls))
+        updates_by_id = {t.id: t.fields[AzureTaskProvider.WORK_ITEM_UPDATES_CUSTOM_FIELD_NAME] for t in tasks}
+        self.assertEqual([1, 2, 3], [u.rev for u in updates_by_id[1]])
+        self.assertEqual(1, len(updates_by_id[2]))
+
+    def test_bulk_mode_updates_produce_status_change_work_time(self):
+        # given
+        revisions = [
+            _revision(1, 1, 'New', 'userA', '2024-02-01T08:00:00.000Z'),
+            _revision(1, 2, 'Active', 'userA', '2024-02-01T09:00:00.000Z'),
+            _revision(1, 3, 'Done', 'userA', '2024-02-01T12:00:00.000Z'),
+        ]
+        azure = StubAzureClient([1], revisions=revisions)
+        provider = self._create_provider(azure, bulk_updates=True)
+        extractor = AzureStatusChangeWorklogExtractor(transition_statuses=['Active'])
+        # when
+        work_time = extractor.get_work_time_per_user(provider.get_tasks()[0])
+        # then
+        self.assertAlmostEqual(3 * 3600, work_time['userA'].to_seconds(), delta=1)
+
+    def test_bulk_mode_falls_back_to_per_item_updates_for_items_missing_in_stream(self):
+        # given
+        azure = StubAzureClient([1, 2], revisions=[_revision(1, 1, 'New', 'userA', '2024-02-01T08:00:00.000Z')])
+        provider = self._create_provider(azure, bulk_updates=True)
+        # when
+        provider.get_tasks()
+        # then
+        self.assertEqual([(2, 200, 0)], azure.get_updates_calls)
+
+    def test_bulk_mode_reads_full_history_per_item_when_stream_starts_mid_history(self):
+        # given
+        cache = InMemoryCache()
+        revisions = [
+            _revision(1, 4, 'Active', 'userA', '2024-02-01T09:00:00.000Z'),
+            _revision(1, 5, 'Done', 'userA', '2024-02-01T12:00:00.000Z'),
+            _revision(2, 1, 'New', 'userB', '2024-02-01T10:00:00.000Z'),
+        ]
+        azure = StubAzureClient([1, 2], updates_count=3, revisions=revisions)
+        provider = self._create_provider(azure, bulk_updates=True, cache=cache,
+                                         updates_since=datetime(2024, 2, 1, tzinfo=timezone.utc))
+        # when
+        tasks = provider.get_tasks()
+        # then
+        updates_by_id = {t.id: t.fields[AzureTaskProvider.WORK_ITEM_UPDATES_CUSTOM_FIELD_NAME] for t in tasks}
+        self.assertEqual([(1, 200, 0)], azure.get_updates_calls)
+        self.assertEqual(['update_1_0', 'update_1_1', 'update_1_2'], updates_by_id[1])
+        self.assertEqual(['update_1_0', 'update_1_1', 'update_1_2'],
+                         cache.get(provider._create_updates_cache_key(tasks[0])))
+        self.assertEqual([1], [u.rev for u in updates_by_id[2]])
+
+    def test_bulk_mode_skips_revision_stream_when_all_items_cached(self):
+        # given
+        cache = InMemoryCache()
+        azure = StubAzureClient([1], revisions=[_revision(1, 1, 'New', 'userA', '2024-02-01T08:00:00.000Z')])
+        self._create_provider(azure, bulk_updates=True, cache=cache).get_tasks()
+        azure.revisions_calls.clear()
+        # when
+        self._create_provider(azure, bulk_updates=True, cache=cache).get_tasks()
+        # then
+        self.assertEqual([], azure.revisions_calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
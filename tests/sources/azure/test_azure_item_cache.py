@@ -0,0 +1,71 @@
+import unittest
+from types import SimpleNamespace
+
+from sd_metrics_lib.sources.azure.tasks import AzureTaskProvider
+from sd_metrics_lib.utils.cache import DictToCacheProtocolAdapter
+
+
+class StubAzureClient:
+    def __init__(self, revisions: dict):
+        self.revisions = revisions
+        self.full_payload_ids = []
+        self.get_updates_calls = []
+
+    def query_by_wiql(self, wiql, top=None):
+        ids = [] if "> 0" not in wiql.query else sorted(self.revisions.keys())
+        return SimpleNamespace(work_items=[SimpleNamespace(id=i) for i in ids], work_item_relations=None)
+
+    def get_work_items(self, ids, fields):
+        if fields == [AzureTaskProvider.ITEM_VERSION_FIELD]:
+            return [SimpleNamespace(id=i, rev=self.revisions[i], fields={'System.Rev': self.revisions[i]})
+                    for i in ids]
+        self.full_payload_ids.extend(ids)
+        return [SimpleNamespace(id=i, rev=self.revisions[i], fields={'System.Title': f'{i}@{self.revisions[i]}'})
+                for i in ids]
+
+    def get_updates(self, item_id, top=None, skip=None):
+        self.get_updates_calls.append(item_id)
+        return [SimpleNamespace(rev=self.revisions[item_id])]
+
+
+class AzureTaskProviderItemCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.client = StubAzureClient({1: 3, 2: 5})
+        self.item_cache = {}
+        self.updates_cache = DictToCacheProtocolAdapter({})
+
+    def _create_provider(self):
+        return AzureTaskProvider(self.client,
+                                 query="SELECT [System.Id] FROM WorkItems",
+                                 additional_fields=['System.Title'],
+                                 custom_expand_fields=[AzureTaskProvider.WORK_ITEM_UPDATES_CUSTOM_FIELD_NAME],
+                                 cache=self.updates_cache,
+                                 item_cache=self.item_cache)
+
+    def test_second_fetch_pulls_only_changed_items(self):
+        # given
+        self._create_provider().get_tasks()
+        self.client.full_payload_ids.clear()
+        self.client.get_updates_calls.clear()
+        self.client.revisions[2] = 6
+        # when
+        tasks = self._create_provider().get_tasks()
+        # then
+        self.assertEqual([2], self.client.full_payload_ids)
+        self.assertEqual([2], self.client.get_updates_calls)
+        self.assertEqual(['1@3', '2@6'], [task.fields['System.Title'] for task in tasks])
+
+    def test_changed_item_gets_fresh_updates(self):
+        # given
+        self._create_provider().get_tasks()
+        self.client.revisions[1] = 4
+        # when
+        tasks = self._create_provider().get_tasks()
+        # then
+        updates = tasks[0].fields[AzureTaskProvider.WORK_ITEM_UPDATES_CUSTOM_FIELD_NAME]
+        self.assertEqual([4], [update.rev for update in updates])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -33,7 +33,7 @@ class StubAzureClient:
         # Return simple items with fields dict as provider expects
         return [SimpleNamespace(id=i, fields={}) for i in ids]
 
-    def get_updates(self, item_id: int):
+    def get_updates(self, item_id: int, top=None, skip=None):
         self.get_updates_calls.append(item_id)
         return [f"update_for_{item_id}"]
 
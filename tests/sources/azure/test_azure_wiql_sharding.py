@@ -0,0 +1,90 @@
+import re
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from sd_metrics_lib.sources.azure.tasks import AzureTaskProvider
+
+
+class StubWiqlAzureClient:
+    def __init__(self, work_item_ids):
+        self._ids = sorted(work_item_ids)
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def query_by_wiql(self, wiql, top=None):
+        with self._lock:
+            self.queries.append(wiql.query)
+        ids = list(self._ids)
+        lower_bound = re.search(r"\[System\.Id] > (\d+)", wiql.query)
+        if lower_bound:
+            ids = [i for i in ids if i > int(lower_bound.group(1))]
+        upper_bound = re.search(r"\[System\.Id] <= (\d+)", wiql.query)
+        if upper_bound:
+            ids = [i for i in ids if i <= int(upper_bound.group(1))]
+        if wiql.query.endswith("DESC"):
+            ids.reverse()
+        if top is not None:
+            ids = ids[:top]
+        return SimpleNamespace(work_items=[SimpleNamespace(id=i) for i in ids], work_item_relations=None)
+
+    def get_work_items(self, ids, fields):
+        return [SimpleNamespace(id=i, fields={}) for i in ids]
+
+
+class AzureWiqlShardingTestCase(unittest.TestCase):
+
+    @staticmethod
+    def _create_provider(azure_client, executor, wiql_shards):
+        provider = AzureTaskProvider(azure_client,
+                                     query="SELECT [System.Id] FROM WorkItems WHERE [System.TeamProject] = 'P'",
+                                     additional_fields=[],
+                                     thread_pool_executor=executor,
+                                     wiql_shards=wiql_shards)
+        provider.WIQL_RESULT_LIMIT_BEFORE_EXCEPTION_THROWING = 25
+        return provider
+
+    def test_sharded_ids_match_serial_ids(self):
+        # given
+        work_item_ids = [i * 3 for i in range(1, 400)] + list(range(5000, 5100))
+        azure = StubWiqlAzureClient(work_item_ids)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            serial_ids = self._create_provider(azure, None, 1)._fetch_task_ids_paginated()
+            # when
+            sharded_ids = self._create_provider(azure, executor, 4)._fetch_task_ids_sharded()
+        # then
+        self.assertEqual(serial_ids, sharded_ids)
+        self.assertEqual(sorted(work_item_ids), sharded_ids)
+
+    def test_dense_shard_is_split_further(self):
+        # given
+        azure = StubWiqlAzureClient(list(range(1, 201)))
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            provider = self._create_provider(azure, executor, 2)
+            # when
+            ids = provider._fetch_task_ids_sharded()
+        # then
+        self.assertEqual(list(range(1, 201)), ids)
+        range_queries = [q for q in azure.queries if "<=" in q]
+        self.assertGreater(len(range_queries), 2)
+
+    def test_sharding_returns_empty_list_for_empty_result(self):
+        # given
+        azure = StubWiqlAzureClient([])
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            provider = self._create_provider(azure, executor, 4)
+            # when
+            tasks = provider.get_tasks()
+        # then
+        self.assertEqual([], tasks)
+
+    def test_split_id_range_covers_range_without_overlap(self):
+        # when
+        shards = AzureTaskProvider._split_id_range(9, 20, 4)
+        # then
+        self.assertEqual([(9, 12), (12, 15), (15, 18), (18, 20)], shards)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import asyncio
+import unittest
+
+import httpx
+
+from sd_metrics_lib.sources.jira.async_tasks import AsyncJiraTaskProvider, AsyncJiraClient
+
+
+class StubAsyncJiraClient:
+    def __init__(self, total: int, subtasks_per_task: int = 0):
+        self.total = total
+        self.subtasks_per_task = subtasks_per_task
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.queries = []
+
+    async def jql(self, query, expand=None, limit=None, start=0):
+        self.queries.append(query)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        if query.startswith('key in'):
+            keys = query[len('key in ('):-1].split(', ')
+            return {'issues': [{'key': key, 'fields': {'child': True}} for key in keys], 'total': len(keys)}
+        issues = [
+            {'key': f'T-{i}',
+             'fields': {'subtasks': [{'key': f'T-{i}-{j}'} for j in range(self.subtasks_per_task)]}}
+            for i in range(start, min(start + limit, self.total))
+        ]
+        return {'issues': issues, 'total': self.total}
+
+
+class AsyncJiraTaskProviderTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def test_get_tasks_fetches_all_pages_in_order(self):
+        # given
+        jira = StubAsyncJiraClient(total=230)
+        provider = AsyncJiraTaskProvider(jira, 'project = X', page_size=50)
+        # when
+        tasks = await provider.get_tasks()
+        # then
+        self.assertEqual([f'T-{i}' for i in range(230)], [task['key'] for task in tasks])
+
+    async def test_get_tasks_respects_in_flight_limit(self):
+        # given
+        jira = StubAsyncJiraClient(total=1000)
+        provider = AsyncJiraTaskProvider(jira, 'project = X', page_size=50, max_in_flight_requests=3)
+        # when
+        await provider.get_tasks()
+        # then
+        self.assertLessEqual(jira.max_in_flight, 3)
+
+    async def test_get_tasks_replaces_subtasks_with_full_child_tasks(self):
+        # given
+        jira = StubAsyncJiraClient(total=2, subtasks_per_task=2)
+        provider = AsyncJiraTaskProvider(jira, 'project = X', additional_fields=['subtasks', 'changelog'])
+        # when
+        tasks = await provider.get_tasks()
+        # then
+        self.assertEqual([{'key': 'T-1-0', 'fields': {'child': True}}, {'key': 'T-1-1', 'fields': {'child': True}}],
+                         tasks[1]['fields']['subtasks'])
+
+
+class AsyncJiraClientTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def test_jql_sends_search_request_with_paging_params(self):
+        # given
+        captured = []
+
+        def handler(request: httpx.Request):
+            captured.append(request)
+            return httpx.Response(200, json={'issues': [], 'total': 0})
+
+        http_client = httpx.AsyncClient(base_url='https://jira.example.com', transport=httpx.MockTransport(handler))
+        async with AsyncJiraClient('https://jira.example.com', http_client=http_client) as client:
+            # when
+            await client.jql('project = X', start=50, limit=50, expand='changelog')
+        # then
+        self.assertEqual('/rest/api/2/search', captured[0].url.path)
+        self.assertEqual({'jql': 'project = X', 'fields': '*all', 'startAt': '50', 'maxResults': '50',
+                          'expand': 'changelog'}, dict(captured[0].url.params))
+
+
+if __name__ == "__main__":
+    unittest.main()
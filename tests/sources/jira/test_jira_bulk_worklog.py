@@ -0,0 +1,141 @@
+import pickle
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from sd_metrics_lib.sources.jira.worklog import JiraWorklogExtractor
+from sd_metrics_lib.utils.time import Duration, TimeUnit
+
+
+def _worklog(worklog_id: int, issue_id: str, account_id: str, seconds: int):
+    return {'id': str(worklog_id), 'issueId': issue_id, 'author': {'accountId': account_id},
+            'timeSpentSeconds': seconds}
+
+
+class StubJiraWorklogClient:
+    def __init__(self, worklogs):
+        self.worklogs = {int(w['id']): w for w in worklogs}
+        self.updated_requests = []
+        self.list_requests = []
+        self.issue_worklog_requests = []
+
+    def get(self, path, params=None):
+        self.updated_requests.append(params['since'])
+        ids = sorted(self.worklogs)
+        if params['since'] == 0:
+            return {'values': [{'worklogId': i} for i in ids[:2]], 'lastPage': False, 'until': 1}
+        return {'values': [{'worklogId': i} for i in ids[2:]], 'lastPage': True, 'until': 2}
+
+    def post(self, path, data=None):
+        self.list_requests.append(list(data['ids']))
+        return [self.worklogs[i] for i in data['ids']]
+
+    def issue_get_worklog(self, key):
+        self.issue_worklog_requests.append(key)
+        issue_id = {'T-1': '10', 'T-2': '11', 'T-3': '12'}[key]
+        return {'worklogs': [w for w in self.worklogs.values() if w['issueId'] == issue_id]}
+
+
+class JiraBulkWorklogTestCase(unittest.TestCase):
+
+    def _create_tasks(self):
+        return [
+            {'id': '10', 'key': 'T-1', 'fields': {'subtasks': [{'id': '12', 'key': 'T-3'}]}},
+            {'id': '11', 'key': 'T-2', 'fields': {'subtasks': []}},
+        ]
+
+    def _create_client(self):
+        return StubJiraWorklogClient([
+            _worklog(1, '10', 'alice', 3600),
+            _worklog(2, '11', 'bob', 1800),
+            _worklog(3, '12', 'alice', 600),
+            _worklog(4, '99', 'carol', 60),
+        ])
+
+    def test_prefetch_serves_lookups_without_per_issue_requests(self):
+        # given
+        client = self._create_client()
+        extractor = JiraWorklogExtractor(client, include_subtask_worklog=True)
+        tasks = self._create_tasks()
+        # when
+        extractor.prefetch_worklogs(tasks)
+        per_user = extractor.get_work_time_per_user(tasks[0])
+        # then
+        self.assertEqual([], client.issue_worklog_requests)
+        self.assertEqual(Duration.of(4200, TimeUnit.SECOND), per_user['alice'])
+
+    def test_prefetch_follows_updated_worklog_pages(self):
+        # given
+        client = self._create_client()
+        extractor = JiraWorklogExtractor(client)
+        # when
+        extractor.prefetch_worklogs(self._create_tasks())
+        # then
+        self.assertEqual([0, 1], client.updated_requests)
+
+    def test_prefetch_splits_worklog_list_requests_into_batches(self):
+        # given
+        client = self._create_client()
+        extractor = JiraWorklogExtractor(client, thread_pool_executor=ThreadPoolExecutor(max_workers=2))
+        extractor.WORKLOG_LIST_MAX_IDS = 3
+        # when
+        extractor.prefetch_worklogs(self._create_tasks())
+        # then
+        self.assertEqual([[1, 2, 3], [4]], client.list_requests)
+
+    def test_prefetched_result_matches_per_issue_result(self):
+        # given
+        tasks = self._create_tasks()
+        per_issue_extractor = JiraWorklogExtractor(self._create_client(), include_subtask_worklog=True)
+        bulk_extractor = JiraWorklogExtractor(self._create_client(), include_subtask_worklog=True)
+        bulk_extractor.prefetch_worklogs(tasks)
+        # when
+        per_issue = [per_issue_extractor.get_work_time_per_user(task) for task in tasks]
+        bulk = [bulk_extractor.get_work_time_per_user(task) for task in tasks]
+        # then
+        self.assertEqual(per_issue, bulk)
+
+    def test_batch_with_prefetch_matches_per_issue_result(self):
+        # given
+        tasks = self._create_tasks()
+        per_issue_extractor = JiraWorklogExtractor(self._create_client(), include_subtask_worklog=True)
+        client = self._create_client()
+        batch_extractor = JiraWorklogExtractor(client, include_subtask_worklog=True, prefetch_batches=True,
+                                               thread_pool_executor=ThreadPoolExecutor(max_workers=2))
+        # when
+        batch = batch_extractor.get_work_time_per_user_batch(tasks)
+        batch_extractor.get_work_time_per_user_batch(tasks)
+        # then
+        self.assertEqual([per_issue_extractor.get_work_time_per_user(task) for task in tasks], batch)
+        self.assertEqual([], client.issue_worklog_requests)
+        self.assertEqual([0, 1], client.updated_requests)
+
+    def test_batches_with_prefetch_reuse_one_updated_worklog_scan(self):
+        # given
+        tasks = self._create_tasks()
+        client = self._create_client()
+        batch_extractor = JiraWorklogExtractor(client, include_subtask_worklog=True, prefetch_batches=True)
+        # when
+        first_batch = batch_extractor.get_work_time_per_user_batch(tasks[:1])
+        second_batch = batch_extractor.get_work_time_per_user_batch(tasks[1:])
+        # then
+        self.assertEqual([0, 1], client.updated_requests)
+        self.assertEqual([[1, 2, 3, 4]], client.list_requests)
+        self.assertEqual(Duration.of(4200, TimeUnit.SECOND), first_batch[0]['alice'])
+        self.assertEqual(Duration.of(1800, TimeUnit.SECOND), second_batch[0]['bob'])
+
+    def test_extractor_survives_pickle_round_trip(self):
+        # given
+        tasks = self._create_tasks()
+        extractor = JiraWorklogExtractor(self._create_client(), include_subtask_worklog=True, prefetch_batches=True)
+        expected = extractor.get_work_time_per_user_batch(tasks)
+        # when
+        restored = pickle.loads(pickle.dumps(extractor))
+        # then
+        self.assertEqual(expected, restored.get_work_time_per_user_batch(tasks))
+        self.assertEqual([], restored.jira_client.issue_worklog_requests)
+        self.assertIsNone(restored._scanned_since_ms)
+        self.assertIsInstance(pickle.loads(pickle.dumps(JiraWorklogExtractor(None))), JiraWorklogExtractor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import re
+import unittest
+
+from sd_metrics_lib.calculators.velocity import UserVelocityCalculator
+from sd_metrics_lib.sources.jira.tasks import JiraTaskProvider
+from sd_metrics_lib.sources.story_points import FunctionStoryPointExtractor
+from sd_metrics_lib.sources.worklog import FunctionWorklogExtractor
+from sd_metrics_lib.utils.time import Duration, TimeUnit
+
+
+class FakeJiraClient:
+    def __init__(self, issues: dict, url: str = 'https://first.atlassian.net'):
+        self.issues = issues
+        self.url = url
+        self.full_payload_keys = []
+
+    def jql(self, query, expand=None, limit=None, start=0, fields='*all'):
+        keys_match = re.match(r"key in \((.*)\)", query)
+        keys = keys_match.group(1).split(", ") if keys_match else list(self.issues.keys())
+        page_keys = keys[start:start + limit]
+        if fields == 'updated':
+            issues = [{'key': key, 'fields': {'updated': self.issues[key]['updated']}} for key in page_keys]
+        else:
+            self.full_payload_keys.extend(page_keys)
+            issues = [{'key': key, 'fields': dict(self.issues[key])} for key in page_keys]
+        return {'issues': issues, 'total': len(keys)}
+
+
+class JiraTaskProviderItemCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeJiraClient({
+            'T-1': {'updated': '2024-01-01T10:00:00.000+0000', 'summary': 'one'},
+            'T-2': {'updated': '2024-01-01T10:00:00.000+0000', 'summary': 'two'},
+        })
+        self.item_cache = {}
+
+    def test_second_fetch_pulls_only_changed_items(self):
+        # given
+        JiraTaskProvider(self.client, 'project = X', ['changelog'], item_cache=self.item_cache).get_tasks()
+        self.client.full_payload_keys.clear()
+        self.client.issues['T-2'] = {'updated': '2024-01-02T10:00:00.000+0000', 'summary': 'two changed'}
+        # when
+        tasks = JiraTaskProvider(self.client, 'project = X', ['changelog'], item_cache=self.item_cache).get_tasks()
+        # then
+        self.assertEqual(['T-2'], self.client.full_payload_keys)
+        self.assertEqual(['one', 'two changed'], [task['fields']['summary'] for task in tasks])
+
+    def test_overlapping_queries_share_cached_items(self):
+        # given
+        JiraTaskProvider(self.client, 'project = X', item_cache=self.item_cache).get_tasks()
+        self.client.full_payload_keys.clear()
+        # when
+        tasks = JiraTaskProvider(self.client, 'project = X AND team = A', item_cache=self.item_cache).get_tasks()
+        # then
+        self.assertEqual([], self.client.full_payload_keys)
+        self.assertEqual(['T-1', 'T-2'], [task['key'] for task in tasks])
+
+    def test_items_are_not_shared_between_servers(self):
+        # given
+        JiraTaskProvider(self.client, 'project = X', item_cache=self.item_cache).get_tasks()
+        other_client = FakeJiraClient({
+            'T-1': {'updated': '2024-01-01T10:00:00.000+0000', 'summary': 'other one'},
+        }, url='https://second.atlassian.net')
+        # when
+        tasks = JiraTaskProvider(other_client, 'project = X', item_cache=self.item_cache).get_tasks()
+        # then
+        self.assertEqual(['T-1'], other_client.full_payload_keys)
+        self.assertEqual('other one', tasks[0]['fields']['summary'])
+
+    def test_returned_tasks_do_not_share_fields_with_cached_items(self):
+        # given
+        provider = JiraTaskProvider(self.client, 'project = X', item_cache=self.item_cache)
+        provider.get_tasks()[0]['fields']['summary'] = 'mutated'
+        # when
+        tasks = provider.get_tasks()
+        # then
+        self.assertEqual('one', tasks[0]['fields']['summary'])
+
+    def test_calculator_reads_tasks_through_item_cache(self):
+        # given
+        JiraTaskProvider(self.client, 'project = X', item_cache=self.item_cache).get_tasks()
+        self.client.full_payload_keys.clear()
+        self.client.issues['T-2'] = {'updated': '2024-01-02T10:00:00.000+0000', 'summary': 'two changed'}
+        calculator = UserVelocityCalculator(JiraTaskProvider(self.client, 'project = X', item_cache=self.item_cache),
+                                            FunctionStoryPointExtractor(lambda task: 1),
+                                            FunctionWorklogExtractor(
+                                                lambda task: {task['fields']['summary']: Duration.of(1, TimeUnit.HOUR)}))
+        # when
+        velocity = calculator.calculate()
+        # then
+        self.assertEqual(['T-2'], self.client.full_payload_keys)
+        self.assertEqual({'one', 'two changed'}, set(velocity))
+
+
+if __name__ == "__main__":
+    unittest.main()
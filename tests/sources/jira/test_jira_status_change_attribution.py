@@ -69,6 +69,19 @@ class JiraStatusChangeAttributionTestCase(unittest.TestCase):
         # then
         self.assertIsInstance(per_user['userB'], Duration)
 
+    def test_work_intervals_follow_assignee_changes(self):
+        # given
+        task = self._build_task_with_histories()
+        extractor = JiraStatusChangeWorklogExtractor(['12207'], use_status_codes=True,
+                                                      time_format='%Y-%m-%dT%H:%M:%S.%f%z')
+        # when
+        intervals_per_user = extractor.get_work_intervals_per_user(task)
+        # then
+        self.assertEqual([(datetime(2024, 2, 1, 10, tzinfo=timezone.utc), datetime(2024, 2, 1, 12, tzinfo=timezone.utc))],
+                         intervals_per_user['userA'])
+        self.assertEqual([(datetime(2024, 2, 1, 12, tzinfo=timezone.utc), datetime(2024, 2, 1, 14, tzinfo=timezone.utc))],
+                         intervals_per_user['userB'])
+
     def test_per_user_userA_value_is_two_hours(self):
         # when
         per_user = self._extract_per_user()
@@ -0,0 +1,68 @@
+import copy
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from sd_metrics_lib.sources.jira.worklog import JiraStatusChangeWorklogExtractor
+from sd_metrics_lib.utils.time import Duration, TimeUnit
+from sd_metrics_lib.utils.worktime import WorkTimeExtractor
+
+
+class SlowCalendarWorkTimeExtractor(WorkTimeExtractor):
+
+    def extract_time_from_period(self, start_time_period, end_time_period):
+        time.sleep(0.001)
+        if end_time_period <= start_time_period:
+            return None
+        return Duration.of((end_time_period - start_time_period).total_seconds(), TimeUnit.SECOND)
+
+
+class JiraStatusChangeThreadSafetyTestCase(unittest.TestCase):
+
+    @staticmethod
+    def _build_task(hours_in_progress: int, user: str):
+        end_hour = 8 + hours_in_progress
+        return {
+            'fields': {'status': {'id': '1', 'name': 'Done'}},
+            'changelog': {'histories': [
+                {
+                    'created': f'2024-02-01T{end_hour:02d}:00:00.000+0000',
+                    'author': {'accountId': user},
+                    'items': [{'fieldId': 'status', 'to': '1', 'from': '12207'}],
+                },
+                {
+                    'created': '2024-02-01T08:00:00.000+0000',
+                    'author': {'accountId': user},
+                    'items': [{'fieldId': 'status', 'to': '12207', 'from': '1'},
+                              {'fieldId': 'assignee', 'to': user, 'toString': user}],
+                },
+            ]}
+        }
+
+    def _create_extractor(self):
+        return JiraStatusChangeWorklogExtractor(['12207'], use_status_codes=True,
+                                                worktime_extractor=SlowCalendarWorkTimeExtractor())
+
+    def test_shared_extractor_gives_serial_results_when_used_concurrently(self):
+        # given
+        tasks = [self._build_task(1 + i % 10, f'user{i % 7}') for i in range(200)]
+        serial_results = [self._create_extractor().get_work_time_per_user(task) for task in tasks]
+        shared_extractor = self._create_extractor()
+        # when
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            concurrent_results = list(executor.map(shared_extractor.get_work_time_per_user, tasks))
+        # then
+        self.assertEqual(serial_results, concurrent_results)
+
+    def test_extraction_does_not_modify_task_changelog(self):
+        # given
+        task = self._build_task(3, 'userA')
+        original_task = copy.deepcopy(task)
+        # when
+        self._create_extractor().get_work_time_per_user(task)
+        # then
+        self.assertEqual(original_task, task)
+
+
+if __name__ == "__main__":
+    unittest.main()
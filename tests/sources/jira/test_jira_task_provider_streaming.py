@@ -0,0 +1,67 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from sd_metrics_lib.sources.jira.tasks import JiraTaskProvider
+
+
+class StubJiraClient:
+    def __init__(self, total: int):
+        self.total = total
+        self.requested_starts = []
+        self._lock = threading.Lock()
+
+    def jql(self, query, expand=None, limit=None, start=0):
+        with self._lock:
+            self.requested_starts.append(start)
+        issues = [{'key': f'T-{i}', 'fields': {}} for i in range(start, min(start + limit, self.total))]
+        return {'issues': issues, 'total': self.total}
+
+
+class JiraTaskProviderStreamingTestCase(unittest.TestCase):
+
+    def test_iter_tasks_sync_yields_all_tasks_in_order(self):
+        # given
+        jira = StubJiraClient(total=250)
+        provider = JiraTaskProvider(jira, 'project = X')
+        # when
+        keys = [task['key'] for task in provider.iter_tasks()]
+        # then
+        self.assertEqual([f'T-{i}' for i in range(250)], keys)
+
+    def test_iter_tasks_concurrent_yields_all_tasks_in_order(self):
+        # given
+        jira = StubJiraClient(total=420)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            provider = JiraTaskProvider(jira, 'project = X', thread_pool_executor=executor, prefetch_pages=2)
+            # when
+            keys = [task['key'] for task in provider.iter_tasks()]
+        # then
+        self.assertEqual([f'T-{i}' for i in range(420)], keys)
+
+    def test_iter_tasks_concurrent_bounds_prefetched_pages(self):
+        # given
+        jira = StubJiraClient(total=1000)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            provider = JiraTaskProvider(jira, 'project = X', thread_pool_executor=executor, prefetch_pages=2)
+            # when
+            tasks = provider.iter_tasks()
+            for _ in range(60):
+                next(tasks)
+            tasks.close()
+        # then
+        self.assertLessEqual(len(jira.requested_starts), 1 + 2 + 1)
+
+    def test_get_tasks_returns_same_tasks_as_iter_tasks(self):
+        # given
+        jira = StubJiraClient(total=130)
+        provider = JiraTaskProvider(jira, 'project = X')
+        # when
+        streamed = list(provider.iter_tasks())
+        fetched = provider.get_tasks()
+        # then
+        self.assertEqual(streamed, fetched)
+
+
+if __name__ == "__main__":
+    unittest.main()
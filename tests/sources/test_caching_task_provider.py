@@ -28,6 +28,16 @@ class FakeDjangoCache(CacheProtocol):
         self._store[key] = value
 
 
+class RecordingCache(FakeDjangoCache):
+    def __init__(self):
+        super().__init__()
+        self.read_keys = []
+
+    def get(self, key: str):
+        self.read_keys.append(key)
+        return super().get(key)
+
+
 class CachingTaskProviderTestCase(unittest.TestCase):
 
     def _run_exact_hit(self):
@@ -109,6 +119,21 @@ class CachingTaskProviderTestCase(unittest.TestCase):
         self.assertEqual(result, [{"id": 7, "a": 10, "b": 20}])
         self.assertEqual(subset_provider.calls, 0)
 
+    def test_should_reuse_smallest_superset(self):
+        # given
+        cache = {}
+        CachingTaskProvider(CountingProvider(tasks=["wide"], query="Q4", additional_fields=["a", "b", "c"]),
+                            cache).get_tasks()
+        CachingTaskProvider(CountingProvider(tasks=["narrow"], query="Q4", additional_fields=["a", "d"]),
+                            cache).get_tasks()
+
+        # when
+        result = CachingTaskProvider(CountingProvider(tasks=[], query="Q4", additional_fields=["a"]),
+                                     cache).get_tasks()
+
+        # then
+        self.assertEqual(result, ["narrow"])
+
     def test_should_work_with_none_query_and_empty_fields(self):
         # given
         cache = {}
@@ -143,6 +168,75 @@ class CachingTaskProviderTestCase(unittest.TestCase):
         self.assertEqual(provider2.calls, 0)
         self.assertEqual(provider.calls, 1)
 
+    def test_should_migrate_legacy_base64_entries(self):
+        # given
+        cache = {}
+        legacy_partial = CacheKeyBuilder.create_legacy_query_only_key_partial("L")
+        cache[CacheKeyBuilder.create_legacy_full_data_key(legacy_partial, ["a"])] = [{"id": 5}]
+        provider = CountingProvider(tasks=[{"id": 999}], query="L", additional_fields=["a"])
+
+        # when
+        result = CachingTaskProvider(provider, cache).get_tasks()
+
+        # then
+        self.assertEqual(result, [{"id": 5}])
+        self.assertEqual(provider.calls, 0)
+        compact_key = CacheKeyBuilder.create_full_data_key(CacheKeyBuilder.create_query_only_key_partial("L"), ["a"])
+        self.assertEqual(cache[compact_key], [{"id": 5}])
+
+    def test_should_reuse_legacy_superset_entries(self):
+        # given
+        cache = {}
+        legacy_partial = CacheKeyBuilder.create_legacy_query_only_key_partial("L2")
+        cache[CacheKeyBuilder.create_legacy_full_data_key(legacy_partial, ["a", "b"])] = [{"id": 6}]
+        cache[CacheKeyBuilder.create_meta_data_key(legacy_partial)] = [["a", "b"]]
+        provider = CountingProvider(tasks=[{"id": 999}], query="L2", additional_fields=["a"])
+
+        # when
+        result = CachingTaskProvider(provider, cache).get_tasks()
+
+        # then
+        self.assertEqual(result, [{"id": 6}])
+        self.assertEqual(provider.calls, 0)
+
+    def test_should_hit_cache_for_equivalent_queries(self):
+        # given
+        cache = {}
+        provider1 = CountingProvider(tasks=[1], query='project in ("B", "A") and status = Done', additional_fields=["a"])
+        CachingTaskProvider(provider1, cache).get_tasks()
+        provider2 = CountingProvider(tasks=[2], query='status = Done AND project IN ("A", "B")', additional_fields=["a"])
+
+        # when
+        result = CachingTaskProvider(provider2, cache).get_tasks()
+
+        # then
+        self.assertEqual(result, [1])
+        self.assertEqual(provider2.calls, 0)
+
+    def test_cold_miss_checks_only_current_and_legacy_data_keys(self):
+        # given
+        cache = RecordingCache()
+        provider = CountingProvider(tasks=[1], query="project = COLD", additional_fields=["a"])
+
+        # when
+        CachingTaskProvider(provider, cache, single_flight=None).get_tasks()
+
+        # then
+        data_key_reads = [key for key in cache.read_keys if key.startswith(CacheKeyBuilder.DATA_PREFIX)]
+        self.assertEqual(2, len(data_key_reads))
+
+    def test_should_store_key_lookup_when_enabled(self):
+        # given
+        cache = {}
+        provider = CountingProvider(tasks=[1], query="project = LOOKUP", additional_fields=["a"])
+
+        # when
+        CachingTaskProvider(provider, cache, store_key_lookup=True).get_tasks()
+
+        # then
+        partial = CacheKeyBuilder.create_query_only_key_partial("project = LOOKUP")
+        self.assertEqual(cache[CacheKeyBuilder.create_key_lookup_key(partial)], "project = LOOKUP")
+
 
 if __name__ == "__main__":
     unittest.main()
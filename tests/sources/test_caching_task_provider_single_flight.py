@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from sd_metrics_lib.sources.tasks import TaskProvider, AsyncTaskProvider, CachingTaskProvider, \
+    AsyncCachingTaskProvider
+from sd_metrics_lib.utils.concurrency import SingleFlight, AsyncSingleFlight
+
+
+class SlowProvider(TaskProvider):
+    def __init__(self, query: str, delay: float = 0.05):
+        self.query = query
+        self.additional_fields = None
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get_tasks(self) -> list:
+        with self._lock:
+            self.calls += 1
+            call_number = self.calls
+        time.sleep(self.delay)
+        return [call_number]
+
+
+class SlowAsyncProvider(AsyncTaskProvider):
+    def __init__(self, query: str):
+        self.query = query
+        self.additional_fields = None
+        self.calls = 0
+
+    async def get_tasks(self) -> list:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return [self.calls]
+
+
+class CachingTaskProviderSingleFlightTestCase(unittest.TestCase):
+
+    def test_concurrent_cold_cache_requests_fetch_once(self):
+        # given
+        cache = {}
+        provider = SlowProvider("Q")
+        single_flight = SingleFlight()
+        # when
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            results = list(executor.map(
+                lambda _: CachingTaskProvider(provider, cache, single_flight=single_flight).get_tasks(), range(10)))
+        # then
+        self.assertEqual([[1]] * 10, results)
+        self.assertEqual(1, provider.calls)
+
+    def test_same_query_on_different_servers_is_not_coalesced(self):
+        # given
+        cache = {}
+        first_server = SlowProvider("Q")
+        first_server.cache_namespace = 'https://first.atlassian.net'
+        second_server = SlowProvider("Q")
+        second_server.cache_namespace = 'https://second.atlassian.net'
+        single_flight = SingleFlight()
+        # when
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda provider: CachingTaskProvider(provider, cache,
+                                                                   single_flight=single_flight).get_tasks(),
+                              [first_server, second_server]))
+        # then
+        self.assertEqual(1, first_server.calls)
+        self.assertEqual(1, second_server.calls)
+
+    def test_same_query_with_different_caches_is_not_coalesced(self):
+        # given
+        provider = SlowProvider("Q")
+        single_flight = SingleFlight()
+        # when
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda cache: CachingTaskProvider(provider, cache,
+                                                                single_flight=single_flight).get_tasks(),
+                              [{}, {}]))
+        # then
+        self.assertEqual(2, provider.calls)
+
+    def test_stale_value_is_served_while_one_refresh_runs(self):
+        # given
+        cache = {}
+        provider = SlowProvider("Q", delay=0)
+        single_flight = SingleFlight()
+        with ThreadPoolExecutor(max_workers=1) as refresh_executor:
+            caching = CachingTaskProvider(provider, cache, single_flight=single_flight,
+                                          stale_after=timedelta(seconds=-1), refresh_executor=refresh_executor)
+            caching.get_tasks()
+            # when
+            stale_result = caching.get_tasks()
+        refreshed_result = CachingTaskProvider(provider, cache).get_tasks()
+        # then
+        self.assertEqual([1], stale_result)
+        self.assertEqual([2], refreshed_result)
+        self.assertEqual(2, provider.calls)
+
+    def test_fresh_value_does_not_trigger_refresh(self):
+        # given
+        cache = {}
+        provider = SlowProvider("Q", delay=0)
+        caching = CachingTaskProvider(provider, cache, stale_after=timedelta(hours=1))
+        caching.get_tasks()
+        # when
+        caching.get_tasks()
+        # then
+        self.assertEqual(1, provider.calls)
+
+
+class AsyncCachingTaskProviderTestCase(unittest.TestCase):
+
+    def test_concurrent_cold_cache_requests_fetch_once(self):
+        # given
+        cache = {}
+        provider = SlowAsyncProvider("Q")
+        single_flight = AsyncSingleFlight()
+
+        async def run():
+            return await asyncio.gather(*[
+                AsyncCachingTaskProvider(provider, cache, single_flight=single_flight).get_tasks()
+                for _ in range(5)])
+
+        # when
+        results = asyncio.run(run())
+        # then
+        self.assertEqual([[1]] * 5, results)
+        self.assertEqual(1, provider.calls)
+
+    def test_stale_value_is_served_and_refreshed_in_background(self):
+        # given
+        cache = {}
+        provider = SlowAsyncProvider("Q")
+        caching = AsyncCachingTaskProvider(provider, cache, stale_after=timedelta(seconds=-1))
+
+        async def run():
+            await caching.get_tasks()
+            stale = await caching.get_tasks()
+            await asyncio.sleep(0.05)
+            return stale
+
+        # when
+        stale_result = asyncio.run(run())
+        # then
+        self.assertEqual([1], stale_result)
+        self.assertEqual(2, provider.calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from sd_metrics_lib.sources.jira.query import JiraSearchQueryBuilder
+from sd_metrics_lib.sources.tasks import TaskProvider, IncrementalCachingTaskProvider
+
+
+class QueryRecordingProvider(TaskProvider):
+    def __init__(self, query: str, responses: dict, requested_queries: list):
+        self.query = query
+        self.additional_fields = None
+        self._responses = responses
+        self._requested_queries = requested_queries
+
+    def get_tasks(self) -> list:
+        self._requested_queries.append(self.query)
+        if 'updated >=' in self.query:
+            return list(self._responses['delta'])
+        return list(self._responses['full'])
+
+
+class IncrementalCachingTaskProviderTestCase(unittest.TestCase):
+
+    def _create_provider(self, cache, responses, requested_queries, query_builder=None,
+                         full_refresh_after=timedelta(days=1)):
+        return IncrementalCachingTaskProvider(
+            query_builder or JiraSearchQueryBuilder(projects=['X']),
+            lambda query: QueryRecordingProvider(query, responses, requested_queries),
+            cache,
+            full_refresh_after=full_refresh_after
+        )
+
+    @staticmethod
+    def _age_full_refresh(cache, age):
+        for key in cache:
+            if 'full_refresh' in key:
+                cache[key] = (datetime.now(timezone.utc) - age).isoformat()
+
+    def _run_two_refreshes(self):
+        cache = {}
+        requested_queries = []
+        responses = {
+            'full': [{'key': 'X-1', 'v': 1}, {'key': 'X-2', 'v': 1}],
+            'delta': [{'key': 'X-2', 'v': 2}, {'key': 'X-3', 'v': 1}],
+        }
+        self._create_provider(cache, responses, requested_queries).get_tasks()
+        tasks = self._create_provider(cache, responses, requested_queries).get_tasks()
+        return tasks, requested_queries, cache, responses
+
+    def test_first_refresh_fetches_full_query(self):
+        # when
+        tasks, requested_queries, cache, responses = self._run_two_refreshes()
+        # then
+        self.assertEqual('project IN ("X")', requested_queries[0])
+
+    def test_second_refresh_fetches_only_updated_since_watermark(self):
+        # when
+        tasks, requested_queries, cache, responses = self._run_two_refreshes()
+        # then
+        since = (datetime.now(timezone.utc) - timedelta(days=1)).strftime('%Y-%m-%d')
+        self.assertEqual(f'project IN ("X") AND updated >= \'{since}\'', requested_queries[1])
+
+    def test_second_refresh_merges_updated_tasks_by_key(self):
+        # when
+        tasks, requested_queries, cache, responses = self._run_two_refreshes()
+        # then
+        self.assertEqual([{'key': 'X-1', 'v': 1}, {'key': 'X-2', 'v': 2}, {'key': 'X-3', 'v': 1}], tasks)
+
+    def test_third_refresh_starts_from_merged_cached_set(self):
+        # given
+        tasks, requested_queries, cache, responses = self._run_two_refreshes()
+        responses['delta'] = [{'key': 'X-1', 'v': 3}]
+        # when
+        result = self._create_provider(cache, responses, requested_queries).get_tasks()
+        # then
+        self.assertEqual([{'key': 'X-1', 'v': 3}, {'key': 'X-2', 'v': 2}, {'key': 'X-3', 'v': 1}], result)
+
+    def test_delta_query_keeps_requested_last_modified_end(self):
+        # given
+        cache = {}
+        requested_queries = []
+        responses = {'full': [{'key': 'X-1', 'v': 1}], 'delta': []}
+        end = datetime.now(timezone.utc) + timedelta(days=30)
+        self._create_provider(cache, responses, requested_queries,
+                              JiraSearchQueryBuilder(projects=['X'], last_modified_dates=(None, end))).get_tasks()
+        # when
+        self._create_provider(cache, responses, requested_queries,
+                              JiraSearchQueryBuilder(projects=['X'], last_modified_dates=(None, end))).get_tasks()
+        # then
+        self.assertIn(f"updated <= '{end.strftime('%Y-%m-%d')}'", requested_queries[1])
+        self.assertIn("updated >= ", requested_queries[1])
+
+    def test_watermark_after_requested_end_skips_delta_query(self):
+        # given
+        cache = {}
+        requested_queries = []
+        responses = {'full': [{'key': 'X-1', 'v': 1}], 'delta': [{'key': 'X-2', 'v': 1}]}
+        end = datetime(2020, 1, 31, tzinfo=timezone.utc)
+        query_builder = JiraSearchQueryBuilder(projects=['X'], last_modified_dates=(None, end))
+        self._create_provider(cache, responses, requested_queries, query_builder).get_tasks()
+        # when
+        tasks = self._create_provider(cache, responses, requested_queries, query_builder).get_tasks()
+        # then
+        self.assertEqual(1, len(requested_queries))
+        self.assertEqual([{'key': 'X-1', 'v': 1}], tasks)
+
+    def test_watermark_is_saved_in_utc(self):
+        # when
+        tasks, requested_queries, cache, responses = self._run_two_refreshes()
+        # then
+        watermarks = [value for key, value in cache.items() if 'watermark' in key]
+        self.assertEqual(1, len(watermarks))
+        self.assertEqual(timedelta(0), datetime.fromisoformat(watermarks[0]).utcoffset())
+
+    def test_task_that_left_the_query_is_dropped_on_full_refresh(self):
+        # given
+        tasks, requested_queries, cache, responses = self._run_two_refreshes()
+        responses['full'] = [{'key': 'X-2', 'v': 2}, {'key': 'X-3', 'v': 1}]
+        responses['delta'] = []
+        self._age_full_refresh(cache, timedelta(days=2))
+        # when
+        result = self._create_provider(cache, responses, requested_queries).get_tasks()
+        # then
+        self.assertEqual('project IN ("X")', requested_queries[-1])
+        self.assertEqual([{'key': 'X-2', 'v': 2}, {'key': 'X-3', 'v': 1}], result)
+
+    def test_full_refresh_can_be_disabled(self):
+        # given
+        tasks, requested_queries, cache, responses = self._run_two_refreshes()
+        self._age_full_refresh(cache, timedelta(days=30))
+        # when
+        self._create_provider(cache, responses, requested_queries, full_refresh_after=None).get_tasks()
+        # then
+        self.assertIn('updated >= ', requested_queries[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import datetime
+import unittest
+from types import SimpleNamespace
+
+from sd_metrics_lib.sources.azure.query import AzureSearchQueryBuilder, AzureTaskFilterEvaluator
+from sd_metrics_lib.sources.jira.query import JiraSearchQueryBuilder, JiraTaskFilterEvaluator
+from sd_metrics_lib.sources.query import QuerySubsumptionResolver
+from sd_metrics_lib.sources.tasks import TaskProvider, CachingTaskProvider
+
+
+class CountingProvider(TaskProvider):
+    def __init__(self, tasks: list, query: str):
+        self._tasks = tasks
+        self.calls = 0
+        self.query = query
+        self.additional_fields = None
+
+    def get_tasks(self) -> list:
+        self.calls += 1
+        return list(self._tasks)
+
+
+def _jira_task(key, issue_type, resolution_date):
+    return {'key': key, 'fields': {'project': {'key': 'X'},
+                                   'issuetype': {'name': issue_type},
+                                   'resolutiondate': resolution_date}}
+
+
+class QuerySubsumptionResolverTestCase(unittest.TestCase):
+
+    def test_broader_query_subsumes_narrower_query(self):
+        # given
+        cached = JiraSearchQueryBuilder(projects=['X', 'Y']).build_descriptor()
+        requested = JiraSearchQueryBuilder(projects=['X'], task_types=['Bug']).build_descriptor()
+        # when
+        local_filters = QuerySubsumptionResolver.find_local_filters(cached, requested)
+        # then
+        self.assertEqual({'projects': frozenset(['X']), 'task_types': frozenset(['Bug'])},
+                         local_filters.value_filters)
+
+    def test_narrower_query_does_not_subsume_broader_query(self):
+        # given
+        cached = JiraSearchQueryBuilder(projects=['X'], task_types=['Bug']).build_descriptor()
+        requested = JiraSearchQueryBuilder(projects=['X']).build_descriptor()
+        # when
+        local_filters = QuerySubsumptionResolver.find_local_filters(cached, requested)
+        # then
+        self.assertIsNone(local_filters)
+
+    def test_date_range_outside_cached_range_is_not_subsumed(self):
+        # given
+        cached = JiraSearchQueryBuilder(resolution_dates=(datetime.date(2024, 1, 1), None)).build_descriptor()
+        requested = JiraSearchQueryBuilder(resolution_dates=(datetime.date(2023, 12, 1), None)).build_descriptor()
+        # when
+        local_filters = QuerySubsumptionResolver.find_local_filters(cached, requested)
+        # then
+        self.assertIsNone(local_filters)
+
+    def test_different_raw_queries_are_not_subsumed(self):
+        # given
+        cached = JiraSearchQueryBuilder(projects=['X'], raw_queries=['labels = a']).build_descriptor()
+        requested = JiraSearchQueryBuilder(projects=['X'], raw_queries=['labels = b']).build_descriptor()
+        # when
+        local_filters = QuerySubsumptionResolver.find_local_filters(cached, requested)
+        # then
+        self.assertIsNone(local_filters)
+
+    def test_descriptor_survives_dict_round_trip(self):
+        # given
+        descriptor = AzureSearchQueryBuilder(projects=['P'],
+                                             last_modified_dates=(datetime.date(2024, 1, 1),
+                                                                  datetime.date(2024, 2, 1))).build_descriptor()
+        # when
+        restored = type(descriptor).from_dict(descriptor.to_dict())
+        # then
+        self.assertEqual(descriptor, restored)
+
+
+class CachingTaskProviderSubsumptionTestCase(unittest.TestCase):
+
+    def test_narrower_jira_query_is_served_by_local_filtering(self):
+        # given
+        cache = {}
+        tasks = [_jira_task('X-1', 'Bug', '2024-01-10T10:00:00.000+0000'),
+                 _jira_task('X-2', 'Story', '2024-01-11T10:00:00.000+0000'),
+                 _jira_task('X-3', 'Bug', '2023-12-10T10:00:00.000+0000')]
+        broad_builder = JiraSearchQueryBuilder(projects=['X'])
+        broad_provider = CountingProvider(tasks, broad_builder.build_query())
+        CachingTaskProvider(broad_provider, cache, query_descriptor=broad_builder.build_descriptor(),
+                            task_filter_evaluator=JiraTaskFilterEvaluator()).get_tasks()
+        narrow_builder = JiraSearchQueryBuilder(projects=['X'], task_types=['bug'],
+                                                resolution_dates=(datetime.date(2024, 1, 1), None))
+        narrow_provider = CountingProvider([], narrow_builder.build_query())
+        # when
+        result = CachingTaskProvider(narrow_provider, cache, query_descriptor=narrow_builder.build_descriptor(),
+                                     task_filter_evaluator=JiraTaskFilterEvaluator()).get_tasks()
+        # then
+        self.assertEqual(['X-1'], [task['key'] for task in result])
+        self.assertEqual(0, narrow_provider.calls)
+
+    def test_azure_query_is_refetched_when_filter_field_was_not_cached(self):
+        # given
+        cache = {}
+        tasks = [SimpleNamespace(id=1, fields={'System.TeamProject': 'P'})]
+        broad_builder = AzureSearchQueryBuilder(projects=['P'])
+        broad_provider = CountingProvider(tasks, broad_builder.build_query())
+        broad_provider.additional_fields = ['System.TeamProject']
+        CachingTaskProvider(broad_provider, cache, query_descriptor=broad_builder.build_descriptor(),
+                            task_filter_evaluator=AzureTaskFilterEvaluator()).get_tasks()
+        narrow_builder = AzureSearchQueryBuilder(projects=['P'], statuses=['Done'])
+        narrow_provider = CountingProvider([], narrow_builder.build_query())
+        narrow_provider.additional_fields = ['System.TeamProject']
+        # when
+        CachingTaskProvider(narrow_provider, cache, query_descriptor=narrow_builder.build_descriptor(),
+                            task_filter_evaluator=AzureTaskFilterEvaluator()).get_tasks()
+        # then
+        self.assertEqual(1, narrow_provider.calls)
+
+    def test_azure_query_is_served_by_local_filtering_with_day_precision(self):
+        # given
+        cache = {}
+        fields = ['System.State', 'Microsoft.VSTS.Common.ClosedDate']
+        tasks = [SimpleNamespace(id=1, fields={'System.State': 'Done',
+                                               'Microsoft.VSTS.Common.ClosedDate': '2024-02-01T18:00:00.000Z'}),
+                 SimpleNamespace(id=2, fields={'System.State': 'Done',
+                                               'Microsoft.VSTS.Common.ClosedDate': '2024-02-02T08:00:00.000Z'})]
+        broad_builder = AzureSearchQueryBuilder(statuses=['Done'])
+        broad_provider = CountingProvider(tasks, broad_builder.build_query())
+        broad_provider.additional_fields = fields
+        CachingTaskProvider(broad_provider, cache, query_descriptor=broad_builder.build_descriptor(),
+                            task_filter_evaluator=AzureTaskFilterEvaluator()).get_tasks()
+        narrow_builder = AzureSearchQueryBuilder(statuses=['Done'],
+                                                 resolution_dates=(None, datetime.date(2024, 2, 1)))
+        narrow_provider = CountingProvider([], narrow_builder.build_query())
+        narrow_provider.additional_fields = fields
+        # when
+        result = CachingTaskProvider(narrow_provider, cache, query_descriptor=narrow_builder.build_descriptor(),
+                                     task_filter_evaluator=AzureTaskFilterEvaluator()).get_tasks()
+        # then
+        self.assertEqual([1], [task.id for task in result])
+        self.assertEqual(0, narrow_provider.calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
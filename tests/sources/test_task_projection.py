@@ -0,0 +1,116 @@
+import unittest
+from types import SimpleNamespace
+
+from sd_metrics_lib.sources.jira.worklog import JiraWorklogExtractor
+from sd_metrics_lib.sources.projection import ProjectionMode, TaskProjector
+from sd_metrics_lib.sources.tasks import TaskProvider, CachingTaskProvider
+
+
+class CountingProvider(TaskProvider):
+    def __init__(self, tasks: list, query: str, additional_fields: list):
+        self._tasks = tasks
+        self.calls = 0
+        self.query = query
+        self.additional_fields = additional_fields
+
+    def get_tasks(self) -> list:
+        self.calls += 1
+        return list(self._tasks)
+
+
+class StubJiraWorklogClient:
+    def __init__(self, worklogs_per_key):
+        self.worklogs_per_key = worklogs_per_key
+
+    def issue_get_worklog(self, key):
+        return {'worklogs': self.worklogs_per_key.get(key, [])}
+
+
+class TaskProjectionTestCase(unittest.TestCase):
+
+    def test_view_hides_unrequested_top_level_keys_of_dict_tasks(self):
+        # given
+        task = {'key': 'X-1', 'fields': {'summary': 's'}, 'changelog': {'histories': []}}
+        projector = TaskProjector(['changelog'], ProjectionMode.VIEW)
+        # when
+        projected = projector.project(task)
+        # then
+        self.assertEqual({'key': 'X-1', 'fields': {'summary': 's'}}, projected)
+        self.assertIs(task['fields'], projected['fields'])
+        self.assertIn('changelog', task)
+
+    def test_copy_does_not_share_nested_objects(self):
+        # given
+        task = {'key': 'X-1', 'fields': {'summary': 's'}, 'changelog': {}}
+        projector = TaskProjector(['changelog'], ProjectionMode.COPY)
+        # when
+        projected = projector.project(task)
+        # then
+        self.assertEqual({'key': 'X-1', 'fields': {'summary': 's'}}, projected)
+        self.assertIsNot(task['fields'], projected['fields'])
+
+    def test_object_tasks_are_projected_by_fields(self):
+        # given
+        task = SimpleNamespace(id=1, fields={'System.State': 'Done', 'CustomExpand.WorkItemUpdate': [1, 2]})
+        projector = TaskProjector(['CustomExpand.WorkItemUpdate'], ProjectionMode.VIEW)
+        # when
+        projected = projector.project(task)
+        # then
+        self.assertEqual({'System.State': 'Done'}, projected.fields)
+        self.assertEqual(1, projected.id)
+        self.assertIn('CustomExpand.WorkItemUpdate', task.fields)
+
+    def test_protected_keys_are_never_hidden(self):
+        # given
+        projector = TaskProjector(['fields', 'key'], ProjectionMode.VIEW)
+        task = {'key': 'X-1', 'fields': {}}
+        # when
+        projected = projector.project(task)
+        # then
+        self.assertIs(task, projected)
+
+    def test_view_reduces_unrequested_expand_data_inside_jira_fields_to_stubs(self):
+        # given
+        subtask = {'id': '2', 'key': 'X-2', 'fields': {'summary': 'sub', 'timetracking': {}}, 'changelog': {}}
+        task = {'key': 'X-1', 'fields': {'summary': 's', 'subtasks': [subtask]}}
+        projector = TaskProjector(['subtasks'], ProjectionMode.VIEW)
+        # when
+        projected = projector.project(task)
+        # then
+        self.assertEqual({'key': 'X-1', 'fields': {'summary': 's', 'subtasks': [
+            {'id': '2', 'key': 'X-2', 'fields': {'summary': 'sub'}}]}}, projected)
+        self.assertIs(subtask, task['fields']['subtasks'][0])
+
+    def test_projected_subtask_hit_works_with_jira_worklog_extractor(self):
+        # given
+        cache = {}
+        subtask = {'id': '2', 'key': 'X-2', 'fields': {}, 'changelog': {'histories': []}}
+        tasks = [{'id': '1', 'key': 'X-1', 'fields': {'subtasks': [subtask]}, 'changelog': {'histories': []}}]
+        CachingTaskProvider(CountingProvider(tasks, 'Q', ['changelog', 'subtasks']), cache).get_tasks()
+        provider = CountingProvider([], 'Q', ['changelog'])
+        client = StubJiraWorklogClient({'X-1': [{'author': {'accountId': 'a'}, 'timeSpentSeconds': 60}],
+                                        'X-2': [{'author': {'accountId': 'a'}, 'timeSpentSeconds': 120}]})
+        extractor = JiraWorklogExtractor(client, include_subtask_worklog=True)
+        projected = CachingTaskProvider(provider, cache, superset_projection=ProjectionMode.VIEW).get_tasks()
+        # when
+        work_time = extractor.get_work_time_per_user(projected[0])
+        # then
+        self.assertEqual(0, provider.calls)
+        self.assertEqual(180, work_time['a'].to_seconds())
+
+    def test_caching_provider_projects_superset_hit(self):
+        # given
+        cache = {}
+        tasks = [{'key': 'X-1', 'fields': {}, 'changelog': {'histories': []}}]
+        CachingTaskProvider(CountingProvider(tasks, 'Q', ['changelog', 'names']), cache).get_tasks()
+        provider = CountingProvider([], 'Q', ['names'])
+        # when
+        result = CachingTaskProvider(provider, cache, superset_projection=ProjectionMode.VIEW).get_tasks()
+        # then
+        self.assertIsInstance(result, list)
+        self.assertEqual([{'key': 'X-1', 'fields': {}}], result)
+        self.assertEqual(0, provider.calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import datetime
+import unittest
+
+from sd_metrics_lib.utils.time import Duration, TimeUnit, TimePolicy
+from sd_metrics_lib.utils.worktime import BusinessCalendarWorkTimeExtractor, SimpleWorkTimeExtractor
+
+
+class BusinessCalendarWorkTimeExtractorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.calendar = BusinessCalendarWorkTimeExtractor(
+            datetime.date(2024, 1, 1),
+            datetime.date(2024, 12, 31),
+            holidays=[datetime.date(2024, 1, 3)]
+        )
+
+    def test_counts_working_days_excluding_weekend_and_holidays(self):
+        # when
+        working_days = self.calendar.count_working_days(datetime.date(2024, 1, 1), datetime.date(2024, 1, 14))
+        # then
+        self.assertEqual(9, working_days)
+
+    def test_counts_working_days_outside_precomputed_range(self):
+        # when
+        working_days = self.calendar.count_working_days(datetime.date(2023, 12, 25), datetime.date(2025, 1, 5))
+        # then
+        expected = sum(1 for offset in range(377)
+                       if self.calendar.is_working_day(datetime.date(2023, 12, 25) + datetime.timedelta(days=offset)))
+        self.assertEqual(expected, working_days)
+
+    def test_supports_custom_weekend_mask(self):
+        # given
+        calendar = BusinessCalendarWorkTimeExtractor(datetime.date(2024, 1, 1), datetime.date(2024, 1, 31),
+                                                     weekend_days=(4, 5))
+        # when
+        working_days = calendar.count_working_days(datetime.date(2024, 1, 1), datetime.date(2024, 1, 7))
+        # then
+        self.assertEqual(5, working_days)
+
+    def test_multi_day_period_skips_holiday(self):
+        # given
+        start = datetime.datetime(2024, 1, 2, 10, 0)
+        end = datetime.datetime(2024, 1, 4, 10, 0)
+        # when
+        duration = self.calendar.extract_time_from_period(start, end, result_unit=TimeUnit.DAY)
+        # then
+        self.assertEqual(Duration.of(2, TimeUnit.DAY), duration)
+
+    def test_period_on_holiday_only_is_not_counted(self):
+        # given
+        start = datetime.datetime(2024, 1, 3, 9, 0)
+        end = datetime.datetime(2024, 1, 3, 17, 0)
+        # when
+        duration = self.calendar.extract_time_from_period(start, end)
+        # then
+        self.assertIsNone(duration)
+
+    def test_matches_simple_extractor_without_holidays(self):
+        # given
+        calendar = BusinessCalendarWorkTimeExtractor(datetime.date(2024, 1, 1), datetime.date(2024, 3, 31))
+        start = datetime.datetime(2024, 1, 5, 9, 0)
+        end = datetime.datetime(2024, 1, 16, 12, 0)
+        # when
+        duration = calendar.extract_time_from_period(start, end, TimePolicy.BUSINESS_HOURS)
+        # then
+        expected = SimpleWorkTimeExtractor().extract_time_from_period(start, end, TimePolicy.BUSINESS_HOURS)
+        self.assertEqual(expected, duration)
+
+    def test_period_crossing_midnight_is_capped_like_simple_extractor(self):
+        # given
+        calendar = BusinessCalendarWorkTimeExtractor(datetime.date(2024, 1, 1), datetime.date(2024, 3, 31))
+        start = datetime.datetime(2024, 1, 8, 23, 0)
+        end = datetime.datetime(2024, 1, 10, 1, 0)
+        # when
+        duration = calendar.extract_time_from_period(start, end, result_unit=TimeUnit.DAY)
+        # then
+        expected = SimpleWorkTimeExtractor().extract_time_from_period(start, end, result_unit=TimeUnit.DAY)
+        self.assertEqual(Duration.of(2, TimeUnit.DAY), duration)
+        self.assertEqual(expected, duration)
+
+    def test_batch_extraction_matches_single_extraction(self):
+        # given
+        starts = [datetime.datetime(2024, 1, 2, 9, 0), datetime.datetime(2024, 1, 6, 9, 0),
+                  datetime.datetime(2024, 1, 3, 9, 0), datetime.datetime(2024, 1, 8, 23, 0),
+                  datetime.datetime(2023, 12, 20, 10, 0), datetime.datetime(2024, 1, 2, 9, 0),
+                  datetime.datetime(2024, 12, 30, 9, 0)]
+        ends = [datetime.datetime(2024, 1, 2, 12, 0), datetime.datetime(2024, 1, 9, 9, 0),
+                datetime.datetime(2024, 1, 3, 17, 0), datetime.datetime(2024, 1, 10, 1, 0),
+                datetime.datetime(2024, 1, 5, 10, 0), datetime.datetime(2024, 1, 2, 9, 5),
+                datetime.datetime(2025, 1, 3, 9, 0)]
+        for time_policy in [TimePolicy.BUSINESS_HOURS, TimePolicy.ALL_HOURS]:
+            with self.subTest(time_policy=time_policy):
+                # when
+                durations = self.calendar.extract_time_from_periods(starts, ends, time_policy)
+                # then
+                expected = [self.calendar.extract_time_from_period(start, end, time_policy)
+                             for start, end in zip(starts, ends)]
+                self.assertEqual([duration.to_seconds() if duration is not None else 0.0 for duration in expected],
+                                 durations.seconds.tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import tempfile
+import unittest
+import urllib.request
+
+from sd_metrics_lib.sources.tasks import CachingTaskProvider, TaskProvider
+from sd_metrics_lib.utils.cache import SqliteCache
+from sd_metrics_lib.utils.instrumentation import (
+    InMemoryCacheMetrics,
+    PrometheusTextExporter,
+    CACHE_EXACT_HITS,
+    CACHE_SUPERSET_HITS,
+    CACHE_MISSES,
+    CACHE_STORES,
+    CACHE_EVICTIONS,
+    CACHE_STORED_BYTES,
+    CACHE_GET_SECONDS,
+    CACHE_SET_SECONDS,
+    PROVIDER_FETCH_SECONDS
+)
+
+
+class FieldsProvider(TaskProvider):
+    def __init__(self, tasks: list, query: str, fields: list):
+        self._tasks = tasks
+        self.query = query
+        self.additional_fields = fields
+
+    def get_tasks(self) -> list:
+        return list(self._tasks)
+
+
+class InMemoryCacheMetricsTestCase(unittest.TestCase):
+
+    def test_counters_are_tracked_per_label_set(self):
+        # given
+        metrics = InMemoryCacheMetrics()
+        # when
+        metrics.increment(CACHE_MISSES, labels={'provider': 'A'})
+        metrics.increment(CACHE_MISSES, 2, labels={'provider': 'A'})
+        metrics.increment(CACHE_MISSES, labels={'provider': 'B'})
+        # then
+        self.assertEqual(3, metrics.get_counter(CACHE_MISSES, {'provider': 'A'}))
+        self.assertEqual(1, metrics.get_counter(CACHE_MISSES, {'provider': 'B'}))
+
+    def test_histogram_places_observations_into_buckets(self):
+        # given
+        metrics = InMemoryCacheMetrics(buckets=(0.1, 1.0))
+        # when
+        metrics.observe(CACHE_GET_SECONDS, 0.05)
+        metrics.observe(CACHE_GET_SECONDS, 0.5)
+        metrics.observe(CACHE_GET_SECONDS, 5.0)
+        # then
+        histogram = metrics.get_histogram(CACHE_GET_SECONDS)
+        self.assertEqual([1, 2], histogram.cumulative_counts())
+        self.assertEqual(3, histogram.count)
+        self.assertAlmostEqual(5.55, histogram.sum)
+
+
+class CachingTaskProviderMetricsTestCase(unittest.TestCase):
+
+    def test_provider_records_miss_store_exact_and_superset_hits(self):
+        # given
+        cache = {}
+        metrics = InMemoryCacheMetrics()
+        labels = {'provider': 'FieldsProvider'}
+        # when
+        CachingTaskProvider(FieldsProvider([{'key': 'T-1'}], 'Q', ['a', 'b']), cache, metrics=metrics).get_tasks()
+        CachingTaskProvider(FieldsProvider([], 'Q', ['a', 'b']), cache, metrics=metrics).get_tasks()
+        CachingTaskProvider(FieldsProvider([], 'Q', ['a']), cache, metrics=metrics).get_tasks()
+        # then
+        self.assertEqual(1, metrics.get_counter(CACHE_MISSES, labels))
+        self.assertEqual(1, metrics.get_counter(CACHE_STORES, labels))
+        self.assertEqual(1, metrics.get_counter(CACHE_EXACT_HITS, labels))
+        self.assertEqual(1, metrics.get_counter(CACHE_SUPERSET_HITS, labels))
+        self.assertEqual(1, metrics.get_histogram(PROVIDER_FETCH_SECONDS, labels).count)
+        self.assertGreater(metrics.get_histogram(CACHE_GET_SECONDS).count, 0)
+        self.assertGreater(metrics.get_histogram(CACHE_SET_SECONDS).count, 0)
+
+
+class SqliteCacheMetricsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'cache.sqlite3')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_stored_bytes_and_evictions_are_recorded(self):
+        # given
+        metrics = InMemoryCacheMetrics()
+        cache = SqliteCache(self.path, max_size_bytes=1, metrics=metrics)
+        # when
+        cache.set('a', 'value')
+        cache.set('b', 'value')
+        # then
+        self.assertGreater(metrics.get_counter(CACHE_STORED_BYTES), 0)
+        self.assertEqual(2, metrics.get_counter(CACHE_EVICTIONS))
+        cache.close()
+
+
+class PrometheusTextExporterTestCase(unittest.TestCase):
+
+    def test_render_outputs_counters_and_histograms(self):
+        # given
+        metrics = InMemoryCacheMetrics(buckets=(0.5,))
+        metrics.increment(CACHE_MISSES, labels={'provider': 'P'})
+        metrics.observe(PROVIDER_FETCH_SECONDS, 0.25, labels={'provider': 'P'})
+        # when
+        text = PrometheusTextExporter(metrics).render()
+        # then
+        self.assertIn('# TYPE sd_metrics_cache_misses_total counter', text)
+        self.assertIn('sd_metrics_cache_misses_total{provider="P"} 1', text)
+        self.assertIn('sd_metrics_provider_fetch_seconds_bucket{provider="P",le="0.5"} 1', text)
+        self.assertIn('sd_metrics_provider_fetch_seconds_bucket{provider="P",le="+Inf"} 1', text)
+        self.assertIn('sd_metrics_provider_fetch_seconds_count{provider="P"} 1', text)
+
+    def test_serve_exposes_metrics_over_http(self):
+        # given
+        metrics = InMemoryCacheMetrics()
+        metrics.increment(CACHE_STORES)
+        server = PrometheusTextExporter(metrics).serve(port=0)
+        try:
+            # when
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                body = response.read().decode('utf-8')
+            # then
+            self.assertIn('sd_metrics_cache_stores_total 1', body)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
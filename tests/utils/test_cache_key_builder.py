@@ -0,0 +1,65 @@
+import unittest
+from types import SimpleNamespace
+
+from sd_metrics_lib.utils.cache import CacheKeyBuilder
+
+
+class CacheKeyBuilderTestCase(unittest.TestCase):
+
+    def test_data_key_stays_compact_for_long_queries(self):
+        # given
+        query = "key in (" + ", ".join(f"PRJ-{i}" for i in range(5000)) + ")"
+        fields = [f"customfield_{i}" for i in range(200)]
+        # when
+        data_key = CacheKeyBuilder.create_full_data_key(CacheKeyBuilder.create_query_only_key_partial(query), fields)
+        # then
+        self.assertLess(len(data_key), 100)
+
+    def test_query_partial_is_versioned(self):
+        # when
+        partial = CacheKeyBuilder.create_query_only_key_partial("project = X")
+        # then
+        self.assertTrue(partial.startswith(CacheKeyBuilder.KEY_VERSION + "||"))
+
+    def test_whitespace_outside_quotes_does_not_change_key(self):
+        # when
+        compact = CacheKeyBuilder.create_query_only_key_partial("project = X AND status = 'In  Progress'")
+        spaced = CacheKeyBuilder.create_query_only_key_partial("  project =  X\n AND status = 'In  Progress' ")
+        # then
+        self.assertEqual(compact, spaced)
+
+    def test_whitespace_inside_quotes_changes_key(self):
+        # when
+        single_space = CacheKeyBuilder.create_query_only_key_partial("status = 'In Progress'")
+        double_space = CacheKeyBuilder.create_query_only_key_partial("status = 'In  Progress'")
+        # then
+        self.assertNotEqual(single_space, double_space)
+
+    def test_field_order_does_not_change_key(self):
+        # given
+        partial = CacheKeyBuilder.create_query_only_key_partial("Q")
+        # when
+        first = CacheKeyBuilder.create_full_data_key(partial, ["b", "a", "a"])
+        second = CacheKeyBuilder.create_full_data_key(partial, ["a", "b"])
+        # then
+        self.assertEqual(first, second)
+
+    def test_non_ascii_query_has_no_legacy_key(self):
+        # when
+        legacy_partial = CacheKeyBuilder.create_legacy_query_only_key_partial("summary ~ 'Überprüfung'")
+        # then
+        self.assertIsNone(legacy_partial)
+
+    def test_descriptor_registry_key_differs_per_provider_server(self):
+        # given
+        first_server = SimpleNamespace(cache_namespace='https://first.atlassian.net')
+        second_server = SimpleNamespace(cache_namespace='https://second.atlassian.net')
+        # when
+        first_key = CacheKeyBuilder.create_descriptor_registry_key(first_server)
+        second_key = CacheKeyBuilder.create_descriptor_registry_key(second_server)
+        # then
+        self.assertNotEqual(first_key, second_key)
+
+
+if __name__ == "__main__":
+    unittest.main()
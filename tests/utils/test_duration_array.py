@@ -0,0 +1,69 @@
+import unittest
+from unittest import mock
+
+from sd_metrics_lib.utils.time import DurationArray, Duration, TimeUnit, TimePolicy
+
+
+class DurationArrayTestCase(unittest.TestCase):
+
+    def test_of_stores_values_in_seconds(self):
+        # when
+        durations = DurationArray.of([1, 2], TimeUnit.HOUR)
+        # then
+        self.assertEqual([3600.0, 7200.0], durations.seconds.tolist())
+
+    def test_sum_converts_with_policy(self):
+        # given
+        durations = DurationArray.of([4, 4, 8], TimeUnit.HOUR)
+        # when
+        total = durations.sum(TimeUnit.DAY, TimePolicy.BUSINESS_HOURS)
+        # then
+        self.assertEqual(Duration.of(2, TimeUnit.DAY), total)
+
+    def test_convert_returns_values_in_requested_unit(self):
+        # given
+        durations = DurationArray.of([1, 2], TimeUnit.DAY, TimePolicy.BUSINESS_HOURS)
+        # when
+        hours = durations.convert(TimeUnit.HOUR, TimePolicy.BUSINESS_HOURS)
+        # then
+        self.assertEqual([8.0, 16.0], hours.tolist())
+
+    def test_comparison_with_duration_is_elementwise(self):
+        # given
+        durations = DurationArray.of([10, 60, 90], TimeUnit.SECOND)
+        # when
+        mask = durations >= Duration.of(60, TimeUnit.SECOND)
+        # then
+        self.assertEqual([False, True, True], mask.tolist())
+
+    def test_group_sum_reduces_per_user(self):
+        # given
+        durations = DurationArray.of([1, 2, 3, 4], TimeUnit.HOUR)
+        users = ['alice', 'bob', 'alice', 'carol']
+        # when
+        per_user = durations.group_sum(users, TimeUnit.HOUR)
+        # then
+        self.assertEqual({'alice': Duration.of(4, TimeUnit.HOUR),
+                          'bob': Duration.of(2, TimeUnit.HOUR),
+                          'carol': Duration.of(4, TimeUnit.HOUR)}, per_user)
+
+    def test_from_durations_matches_duration_sum(self):
+        # given
+        durations = [Duration.of(1, TimeUnit.HOUR), Duration.of(30, TimeUnit.SECOND), Duration.of(1, TimeUnit.DAY)]
+        # when
+        total = DurationArray.from_durations(durations).sum()
+        # then
+        self.assertEqual(Duration.sum(durations), total)
+
+    def test_of_raises_import_error_without_numpy(self):
+        # given
+        with mock.patch('sd_metrics_lib.utils.time.np', None):
+            # when / then
+            with self.assertRaises(ImportError):
+                DurationArray.of([1, 2], TimeUnit.HOUR)
+            with self.assertRaises(ImportError):
+                DurationArray.from_durations([Duration.of(1, TimeUnit.HOUR)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from unittest import mock
+
+from sd_metrics_lib.utils.cache import FieldsetIndex, SupersetResolver
+
+
+class FieldsetIndexTestCase(unittest.TestCase):
+
+    def test_returns_smallest_superset(self):
+        # given
+        index = FieldsetIndex()
+        index.sync([["a", "b", "c", "d"], ["a", "b"], ["a", "b", "c"]])
+        # when
+        fieldset = index.find_smallest_superset(["b", "a"])
+        # then
+        self.assertEqual(("a", "b"), fieldset)
+
+    def test_returns_none_for_unknown_field(self):
+        # given
+        index = FieldsetIndex()
+        index.sync([["a", "b"]])
+        # when
+        fieldset = index.find_smallest_superset(["a", "z"])
+        # then
+        self.assertIsNone(fieldset)
+
+    def test_sync_adds_only_new_entries(self):
+        # given
+        index = FieldsetIndex()
+        index.sync([["a", "b", "c"]])
+        # when
+        index.sync([["a", "b", "c"], ["a"]])
+        # then
+        self.assertEqual(2, len(index))
+        self.assertEqual(("a",), index.find_smallest_superset(["a"]))
+
+    def test_sync_converts_only_new_tail(self):
+        # given
+        index = FieldsetIndex()
+        raw = [["a", "b", "c"], ["a"]]
+        index.sync(raw)
+        raw.append(["b"])
+        # when
+        with mock.patch.object(index, 'add', wraps=index.add) as add:
+            index.sync(raw)
+            index.sync(raw)
+        # then
+        add.assert_called_once_with(["b"])
+
+    def test_sync_rebuilds_when_stored_list_was_rewritten(self):
+        # given
+        index = FieldsetIndex()
+        index.sync([["a", "b"], ["c"]])
+        # when
+        index.sync([["d"], ["e"]])
+        # then
+        self.assertEqual(2, len(index))
+        self.assertFalse(index.contains(["a", "b"]))
+        self.assertTrue(index.contains(["e"]))
+
+    def test_contains_ignores_field_order(self):
+        # given
+        index = FieldsetIndex()
+        index.add(["b", "a"])
+        # when
+        contains = index.contains(["a", "b"])
+        # then
+        self.assertTrue(contains)
+
+    def test_superset_resolver_prefers_smallest_fieldset(self):
+        # when
+        fieldset = SupersetResolver.find_superset_fieldset(["a"], [("a", "b", "c"), ("a", "c")])
+        # then
+        self.assertEqual(("a", "c"), fieldset)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from datetime import datetime
+
+from sd_metrics_lib.utils.time import parse_timestamp, parse_timestamp_with_fraction_fallback, ISO_TIMESTAMP_FORMAT
+
+
+class ParseTimestampTestCase(unittest.TestCase):
+
+    def test_matches_strptime_for_jira_timestamps(self):
+        # given
+        value = '2024-02-01T14:00:00.123+0200'
+        # when
+        parsed = parse_timestamp(value, ISO_TIMESTAMP_FORMAT)
+        # then
+        self.assertEqual(datetime.strptime(value, ISO_TIMESTAMP_FORMAT), parsed)
+
+    def test_parses_azure_timestamp_with_short_fraction_and_zulu_offset(self):
+        # given
+        value = '2024-02-01T14:00:00.87Z'
+        # when
+        parsed = parse_timestamp(value, ISO_TIMESTAMP_FORMAT)
+        # then
+        self.assertEqual(datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f%z'), parsed)
+
+    def test_parses_timestamp_without_fraction(self):
+        # given
+        value = '2024-02-01T14:00:00Z'
+        # when
+        parsed = parse_timestamp(value)
+        # then
+        self.assertEqual(datetime.strptime(value, '%Y-%m-%dT%H:%M:%S%z'), parsed)
+
+    def test_uses_custom_format_when_given(self):
+        # when
+        parsed = parse_timestamp('01/02/2024 14:00', '%d/%m/%Y %H:%M')
+        # then
+        self.assertEqual(datetime(2024, 2, 1, 14, 0), parsed)
+
+    def test_memoizes_repeated_values(self):
+        # given
+        value = '2023-07-01T10:00:00.000+0000'
+        parse_timestamp(value)
+        hits_before = parse_timestamp.cache_info().hits
+        # when
+        parse_timestamp(value)
+        # then
+        self.assertEqual(hits_before + 1, parse_timestamp.cache_info().hits)
+
+    def test_fraction_fallback_parses_timestamp_without_fraction_in_fraction_format(self):
+        # when
+        parsed = parse_timestamp_with_fraction_fallback('2024-02-01T14:00:00Z', '%Y-%m-%dT%H:%M:%S.%fZ')
+        # then
+        self.assertEqual(datetime.strptime('2024-02-01T14:00:00Z', '%Y-%m-%dT%H:%M:%S%z'), parsed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import datetime
+import unittest
+
+from sd_metrics_lib.sources.azure.query import AzureSearchQueryBuilder
+from sd_metrics_lib.sources.jira.query import JiraSearchQueryBuilder
+from sd_metrics_lib.utils.query import canonicalize_query, are_queries_equivalent
+
+
+class QueryCanonicalizationTestCase(unittest.TestCase):
+
+    def test_in_list_values_are_sorted(self):
+        # when
+        canonical = canonicalize_query('project IN ("B", "A")')
+        # then
+        self.assertEqual('project IN ("A", "B")', canonical)
+
+    def test_keyword_case_and_whitespace_are_normalized(self):
+        # when
+        canonical = canonicalize_query('status  =Done and project in ("A")\n order by created desc')
+        # then
+        self.assertEqual('project IN ("A") AND status = Done ORDER BY created DESC', canonical)
+
+    def test_quoted_values_are_preserved(self):
+        # when
+        canonical = canonicalize_query("[System.Title] = 'O''Brien  and co'")
+        # then
+        self.assertEqual("[System.Title] = 'O''Brien  and co'", canonical)
+
+    def test_top_level_clauses_are_not_reordered_when_or_present(self):
+        # when
+        canonical = canonicalize_query('b = 1 AND a = 2 OR c = 3')
+        # then
+        self.assertEqual('b = 1 AND a = 2 OR c = 3', canonical)
+
+    def test_clauses_inside_parentheses_are_sorted(self):
+        # when
+        canonical = canonicalize_query('(b = 1 AND a = 2) AND NOT c = 3')
+        # then
+        self.assertEqual('(a = 2 AND b = 1) AND NOT c = 3', canonical)
+
+    def test_order_by_is_kept_in_place(self):
+        # when
+        equivalent = are_queries_equivalent('a = 1 ORDER BY b ASC, c DESC', 'a = 1 ORDER BY c DESC, b ASC')
+        # then
+        self.assertFalse(equivalent)
+
+    def test_jira_builder_queries_with_different_value_order_are_equivalent(self):
+        # given
+        first = JiraSearchQueryBuilder(projects=['A', 'B'], statuses=['Done'])
+        second = JiraSearchQueryBuilder(statuses=['Done'], projects=['B', 'A'])
+        # when
+        equivalent = are_queries_equivalent(first.build_query(), second.build_query())
+        # then
+        self.assertTrue(equivalent)
+
+    def test_azure_builder_canonical_query_ignores_value_and_clause_order(self):
+        # given
+        dates = (datetime.date(2024, 1, 1), datetime.date(2024, 2, 1))
+        first = AzureSearchQueryBuilder(projects=['A', 'B'], task_types=['Bug', 'Story'], resolution_dates=dates)
+        second = AzureSearchQueryBuilder(projects=['B', 'A'], task_types=['Story', 'Bug'])
+        second.with_resolution_dates(dates)
+        # when
+        first_canonical = first.build_canonical_query()
+        second_canonical = second.build_canonical_query()
+        # then
+        self.assertEqual(first_canonical, second_canonical)
+        self.assertTrue(first_canonical.startswith('SELECT [System.Id] FROM workitems WHERE '))
+
+
+if __name__ == "__main__":
+    unittest.main()
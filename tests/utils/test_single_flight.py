@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from sd_metrics_lib.utils.concurrency import SingleFlight, AsyncSingleFlight
+
+
+class SingleFlightTestCase(unittest.TestCase):
+
+    def test_concurrent_callers_share_one_call(self):
+        # given
+        single_flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            release.wait(5)
+            return "value"
+
+        # when
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(single_flight.do, "key", fetch) for _ in range(8)]
+            while not single_flight.is_in_flight("key"):
+                time.sleep(0.001)
+            time.sleep(0.05)
+            release.set()
+            results = [future.result() for future in futures]
+        # then
+        self.assertEqual(["value"] * 8, results)
+        self.assertEqual(1, len(calls))
+
+    def test_exception_is_raised_for_all_waiters_and_key_is_released(self):
+        # given
+        single_flight = SingleFlight()
+
+        def fail():
+            raise ValueError("boom")
+
+        # when / then
+        with self.assertRaises(ValueError):
+            single_flight.do("key", fail)
+        self.assertFalse(single_flight.is_in_flight("key"))
+        self.assertEqual("ok", single_flight.do("key", lambda: "ok"))
+
+    def test_submit_skips_key_already_in_flight(self):
+        # given
+        single_flight = SingleFlight()
+        release = threading.Event()
+        single_flight.submit("key", lambda: release.wait(5))
+        # when
+        submitted = single_flight.submit("key", lambda: None)
+        release.set()
+        # then
+        self.assertFalse(submitted)
+
+
+class AsyncSingleFlightTestCase(unittest.TestCase):
+
+    def test_concurrent_coroutines_share_one_call(self):
+        # given
+        single_flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "value"
+
+        async def run():
+            return await asyncio.gather(*[single_flight.do("key", fetch) for _ in range(5)])
+
+        # when
+        results = asyncio.run(run())
+        # then
+        self.assertEqual(["value"] * 5, results)
+        self.assertEqual(1, len(calls))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+from sd_metrics_lib.sources.tasks import CachingTaskProvider, ProxyTaskProvider
+from sd_metrics_lib.utils.cache import SqliteCache
+
+
+class QueryProxyTaskProvider(ProxyTaskProvider):
+    def __init__(self, tasks: list, query: str):
+        super().__init__(tasks)
+        self.query = query
+
+
+class SqliteCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'cache.sqlite3')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_returns_stored_nested_value(self):
+        # given
+        cache = SqliteCache(self.path)
+        value = [{'key': 'T-1', 'fields': {'status': {'name': 'Done'}}, 'changelog': {'histories': []}}]
+        # when
+        cache.set('k', value)
+        # then
+        self.assertEqual(value, cache.get('k'))
+
+    def test_get_returns_none_on_miss(self):
+        # given
+        cache = SqliteCache(self.path)
+        # when
+        result = cache.get('missing')
+        # then
+        self.assertIsNone(result)
+
+    def test_values_survive_reopening_the_cache(self):
+        # given
+        SqliteCache(self.path).set('k', {'a': 1})
+        # when
+        result = SqliteCache(self.path).get('k')
+        # then
+        self.assertEqual({'a': 1}, result)
+
+    def test_evicts_least_recently_used_entries_when_over_size_limit(self):
+        # given
+        payload = os.urandom(4000)
+        cache = SqliteCache(self.path, max_size_bytes=10000)
+        cache.set('first', payload)
+        cache.set('second', payload)
+        cache.get('first')
+        # when
+        cache.set('third', payload)
+        # then
+        self.assertIsNone(cache.get('second'))
+        self.assertIsNotNone(cache.get('first'))
+        self.assertIsNotNone(cache.get('third'))
+
+    def test_size_is_tracked_across_replace_delete_and_reopen(self):
+        # given
+        cache = SqliteCache(self.path, max_size_bytes=None)
+        cache.set('a', os.urandom(1000))
+        cache.set('b', os.urandom(2000))
+        cache.set('a', os.urandom(500))
+        cache.delete('b')
+        cache.delete('missing')
+        # when
+        reopened_size = SqliteCache(self.path).size_in_bytes()
+        # then
+        stored_size = cache._connection.execute("SELECT SUM(size) FROM cache_entries").fetchone()[0]
+        self.assertEqual(stored_size, cache.size_in_bytes())
+        self.assertEqual(stored_size, reopened_size)
+
+    def test_set_does_not_sum_the_whole_table(self):
+        # given
+        cache = SqliteCache(self.path, max_size_bytes=10000)
+        statements = []
+        cache._connection.set_trace_callback(statements.append)
+        # when
+        cache.set('k', os.urandom(100))
+        # then
+        self.assertFalse([statement for statement in statements if 'SUM(' in statement])
+
+    def test_can_back_caching_task_provider(self):
+        # given
+        CachingTaskProvider(QueryProxyTaskProvider([{'id': 1}], 'project = X'), SqliteCache(self.path)).get_tasks()
+        # when
+        result = CachingTaskProvider(QueryProxyTaskProvider([], 'project = X'), SqliteCache(self.path)).get_tasks()
+        # then
+        self.assertEqual([{'id': 1}], result)
+
+
+if __name__ == "__main__":
+    unittest.main()